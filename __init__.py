@@ -9,6 +9,7 @@ __email__ = "haseebkaloya@gmail.com"
 __license__ = "MIT"
 
 from .downloader import YouTubeChannelDownloader, DownloadProgress
+from .catalog import ChannelCatalog
 from . import config, utils
 
-__all__ = ['YouTubeChannelDownloader', 'DownloadProgress', 'config', 'utils']
+__all__ = ['YouTubeChannelDownloader', 'DownloadProgress', 'ChannelCatalog', 'config', 'utils']
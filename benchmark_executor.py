@@ -0,0 +1,97 @@
+"""
+Executor Benchmark
+
+Compares the thread and process executors (--executor) on CPU-bound work
+shaped like yt-dlp info extraction: JavaScript interpretation with yt-dlp's
+own JSInterpreter (as used for signature / n-parameter decoding), then JSON
+parsing and sorting of a large format list. Runs offline.
+
+Usage:
+    python benchmark_executor.py [--jobs 64] [--workers N]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from yt_dlp.jsinterp import JSInterpreter
+
+from workers import EXECUTORS
+
+
+JS_CODE = """
+function descramble(a) {
+    var b = a.split("");
+    for (var i = 0; i < 60; i++) {
+        var j = (i * 7 + b.length) % b.length;
+        var c = b[0];
+        b[0] = b[j];
+        b[j] = c;
+        b.reverse();
+    }
+    return b.join("");
+}
+"""
+
+
+def _player_response(seed: int) -> str:
+    rng = random.Random(seed)
+    formats = [{
+        'format_id': str(rng.randint(100, 999)),
+        'ext': rng.choice(['mp4', 'webm', 'm4a']),
+        'height': rng.choice([None, 144, 360, 720, 1080, 2160]),
+        'tbr': rng.uniform(50, 20000),
+        'url': 'https://example.invalid/' + ''.join(rng.choices('abcdef0123456789', k=400)),
+    } for _ in range(400)]
+    return json.dumps({'streamingData': {'adaptiveFormats': formats}})
+
+
+def extraction_workload(seed: int) -> int:
+    """One job's worth of extraction-like CPU work"""
+    signature = JSInterpreter(JS_CODE).call_function('descramble', f"{seed:08d}" * 8)
+
+    formats = json.loads(_player_response(seed))['streamingData']['adaptiveFormats']
+    formats.sort(key=lambda f: (f['height'] or 0, f['tbr'], f['ext'] == 'mp4'))
+    return len(signature) + len(formats)
+
+
+def run(executor: str, jobs: int, workers: int) -> float:
+    """Wall-clock seconds for `jobs` workloads on `workers` threads or processes"""
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        # Start the workers before timing (spawn re-imports this module)
+        list(pool.map(abs, range(workers)))
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    with pool:
+        started = time.perf_counter()
+        list(pool.map(extraction_workload, range(jobs)))
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare thread and process executors on CPU-bound work')
+    parser.add_argument('--jobs', type=int, default=64, help='Workloads per executor (default: 64)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help=f'Threads / processes (default: CPU count, {os.cpu_count()})')
+    args = parser.parse_args()
+
+    single = time.perf_counter()
+    extraction_workload(0)
+    single = time.perf_counter() - single
+    print(f"{args.jobs} jobs, {args.workers} workers, {single * 1000:.0f} ms per job serially\n")
+
+    results = {}
+    for executor in EXECUTORS:
+        results[executor] = run(executor, args.jobs, args.workers)
+        print(f"  {executor:<8} {results[executor]:>7.2f}s  {args.jobs / results[executor]:>7.1f} jobs/s")
+
+    print(f"\nprocess / thread speedup: {results['thread'] / results['process']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+"""
+Columnar Channel Catalog
+
+Keeps the metadata returned by channel enumeration on disk, one directory per
+channel, so archive-wide questions ("how many hours of audio are still
+missing?") can be answered without touching the network. Each column is a
+fixed-width .npy file that is memory-mapped on load, so filters and
+aggregates run vectorized over millions of entries.
+
+Layout of data/catalog/{channel_id}/:
+    id.npy           S11    video ID
+    duration.npy     int32  seconds (-1 = unknown)
+    upload_date.npy  int32  YYYYMMDD (0 = unknown)
+    flags.npy        uint8  FLAG_* bits from the progress store
+    titles.json             titles, in row order (loaded lazily)
+    meta.json               channel ID, row count, last update
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import config
+from utils import atomic_write
+
+
+# Status flag bits
+FLAG_VIDEO_DONE = 1
+FLAG_AUDIO_DONE = 2
+FLAG_VIDEO_FAILED = 4
+FLAG_AUDIO_FAILED = 8
+
+ID_WIDTH = 11
+COLUMNS = {
+    'id': f'S{ID_WIDTH}',
+    'duration': 'int32',
+    'upload_date': 'int32',
+    'flags': 'uint8',
+}
+
+
+def progress_flags(channel_progress: Dict, video_ids: List[str],
+                   audio_formats: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Compute FLAG_* bits for each video from a channel's progress entry
+
+    Args:
+        channel_progress: Entry returned by DownloadProgress.get_channel_progress
+        video_ids: Video IDs in catalog row order
+        audio_formats: Audio formats that count (default: OUTPUT_AUDIO_FORMAT);
+            audio is done only when every one of them is completed
+
+    Returns:
+        uint8 array of flags
+    """
+    formats = [fmt.lower() for fmt in (audio_formats or [config.OUTPUT_AUDIO_FORMAT])]
+    sets = {
+        FLAG_VIDEO_DONE: set(channel_progress.get('completed_videos') or []),
+        FLAG_VIDEO_FAILED: set(channel_progress.get('failed_videos') or []),
+        FLAG_AUDIO_DONE: set.intersection(
+            *(set(channel_progress.get(f'completed_audio_{fmt}') or []) for fmt in formats)
+        ),
+        FLAG_AUDIO_FAILED: set().union(
+            *(channel_progress.get(f'failed_audio_{fmt}') or [] for fmt in formats)
+        ),
+    }
+
+    id_column = np.array(video_ids, dtype=COLUMNS['id'])
+    flags = np.zeros(len(video_ids), dtype=COLUMNS['flags'])
+    for flag, ids in sets.items():
+        if ids:
+            hits = np.isin(id_column, np.array(sorted(ids), dtype=COLUMNS['id']))
+            flags[hits] |= flag
+    return flags
+
+
+class ChannelCatalog:
+    """Memory-mapped columnar metadata for one channel"""
+
+    def __init__(self, channel_id: str, catalog_dir: Path = config.CATALOG_DIR):
+        self.channel_id = channel_id
+        self.path = Path(catalog_dir) / channel_id
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        self.meta: Dict = {}
+        self._titles: Optional[List[str]] = None
+
+    @classmethod
+    def from_videos(cls, channel_id: str, videos: List[Dict],
+                    channel_progress: Optional[Dict] = None,
+                    catalog_dir: Path = config.CATALOG_DIR,
+                    audio_formats: Optional[List[str]] = None) -> 'ChannelCatalog':
+        """Build a catalog from the entries returned by get_channel_videos"""
+        catalog = cls(channel_id, catalog_dir)
+        video_ids = [video['id'] for video in videos]
+
+        catalog.columns = {
+            'id': np.array(video_ids, dtype=COLUMNS['id']),
+            'duration': np.array(
+                [int(video['duration']) if video.get('duration') is not None else -1 for video in videos],
+                dtype=COLUMNS['duration'],
+            ),
+            'upload_date': np.array(
+                [int(video['upload_date']) if video.get('upload_date') else 0 for video in videos],
+                dtype=COLUMNS['upload_date'],
+            ),
+            'flags': progress_flags(channel_progress or {}, video_ids, audio_formats),
+        }
+        catalog._titles = [video.get('title') or '' for video in videos]
+        return catalog
+
+    def prepend(self, new: 'ChannelCatalog') -> int:
+        """
+        Add the rows of another catalog that are not in this one, in front
+        (enumeration order is newest first). Used by watch mode to merge a
+        channel's newest page without enumerating the whole channel.
+
+        Args:
+            new: Catalog built from the new entries (from_videos)
+
+        Returns:
+            Number of rows added
+        """
+        fresh = ~np.isin(new.ids, self.ids)
+        added = int(np.count_nonzero(fresh))
+        if not added:
+            return 0
+        titles = [title for title, keep in zip(new.titles, fresh) if keep] + list(self.titles)
+        self.columns = {
+            name: np.concatenate([new.columns[name][fresh], np.asarray(self.columns[name])])
+            for name in COLUMNS
+        }
+        self._titles = titles
+        return added
+
+    def exists(self) -> bool:
+        """Check whether this catalog has been written to disk"""
+        return (self.path / 'meta.json').exists()
+
+    def save(self):
+        """Write all columns to disk"""
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        for name, column in self.columns.items():
+            atomic_write(self.path / f'{name}.npy', lambda f, c=column: np.save(f, np.ascontiguousarray(c)))
+
+        atomic_write(
+            self.path / 'titles.json',
+            lambda f: f.write(json.dumps(self.titles, ensure_ascii=False).encode('utf-8')),
+        )
+
+        self.meta = {
+            'channel_id': self.channel_id,
+            'count': len(self),
+            'updated': datetime.now().isoformat(),
+        }
+        # meta.json goes last: its presence marks a complete catalog
+        atomic_write(self.path / 'meta.json', lambda f: f.write(json.dumps(self.meta, indent=2).encode('utf-8')))
+
+    def load(self, mmap: bool = True) -> 'ChannelCatalog':
+        """Load the columns from disk, memory-mapped by default"""
+        with open(self.path / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+
+        mmap_mode = 'r' if mmap else None
+        for name in COLUMNS:
+            self.columns[name] = np.load(self.path / f'{name}.npy', mmap_mode=mmap_mode)
+        self._titles = None
+        return self
+
+    def update_flags(self, channel_progress: Dict, audio_formats: Optional[List[str]] = None):
+        """Recompute status flags from the progress store and write them"""
+        video_ids = [video_id.decode('ascii') for video_id in self.columns['id']]
+        self.columns['flags'] = progress_flags(channel_progress, video_ids, audio_formats)
+        self.path.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path / 'flags.npy', lambda f: np.save(f, self.columns['flags']))
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.columns['id']
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.columns['duration']
+
+    @property
+    def upload_dates(self) -> np.ndarray:
+        return self.columns['upload_date']
+
+    @property
+    def flags(self) -> np.ndarray:
+        return self.columns['flags']
+
+    @property
+    def titles(self) -> List[str]:
+        """Video titles in row order (read from disk on first use)"""
+        if self._titles is None:
+            titles_file = self.path / 'titles.json'
+            if titles_file.exists():
+                with open(titles_file, 'r', encoding='utf-8') as f:
+                    self._titles = json.load(f)
+            else:
+                self._titles = [''] * len(self)
+        return self._titles
+
+    def select(self, missing: Optional[str] = None, failed: Optional[str] = None,
+               min_duration: Optional[int] = None, max_duration: Optional[int] = None,
+               date_after: Optional[str] = None, date_before: Optional[str] = None) -> np.ndarray:
+        """
+        Build a boolean row mask from the given filters
+
+        Args:
+            missing: 'video' or 'audio' - only rows not yet downloaded
+            failed: 'video' or 'audio' - only rows that failed
+            min_duration: Minimum duration in seconds
+            max_duration: Maximum duration in seconds
+            date_after: Only uploads on/after this date (YYYYMMDD)
+            date_before: Only uploads on/before this date (YYYYMMDD)
+
+        Returns:
+            Boolean mask, one entry per row
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if missing:
+            done = FLAG_VIDEO_DONE if missing == 'video' else FLAG_AUDIO_DONE
+            mask &= (self.flags & done) == 0
+        if failed:
+            bit = FLAG_VIDEO_FAILED if failed == 'video' else FLAG_AUDIO_FAILED
+            mask &= (self.flags & bit) != 0
+        if min_duration is not None:
+            mask &= self.durations >= min_duration
+        if max_duration is not None:
+            mask &= (self.durations >= 0) & (self.durations <= max_duration)
+        if date_after:
+            mask &= self.upload_dates >= int(date_after)
+        if date_before:
+            mask &= (self.upload_dates > 0) & (self.upload_dates <= int(date_before))
+
+        return mask
+
+    def completed_mask(self, completed_ids: List[str]) -> np.ndarray:
+        """Rows whose video ID is in the given list (e.g. a progress completed_* list)"""
+        if not completed_ids:
+            return np.zeros(len(self), dtype=bool)
+        return np.isin(self.ids, np.array(completed_ids, dtype=COLUMNS['id']))
+
+    def count(self, mask: Optional[np.ndarray] = None) -> int:
+        """Number of rows matching a mask"""
+        return len(self) if mask is None else int(np.count_nonzero(mask))
+
+    def total_duration(self, mask: Optional[np.ndarray] = None) -> int:
+        """Total known duration in seconds of the rows matching a mask"""
+        durations = self.durations if mask is None else self.durations[mask]
+        return int(durations[durations > 0].sum(dtype=np.int64))
+
+    def entries(self, mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Materialize rows as video dicts in the get_channel_videos shape"""
+        rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+        titles = self.titles
+
+        videos = []
+        for row in rows:
+            video_id = self.ids[row].decode('ascii')
+            duration = int(self.durations[row])
+            upload_date = int(self.upload_dates[row])
+            videos.append({
+                'id': video_id,
+                'title': titles[row],
+                'url': f"https://www.youtube.com/watch?v={video_id}",
+                'duration': duration if duration >= 0 else None,
+                'upload_date': str(upload_date) if upload_date else None,
+            })
+        return videos
+
+    def stats(self, mask: Optional[np.ndarray] = None) -> Dict:
+        """Aggregate counts and durations, optionally within a mask"""
+        base = np.ones(len(self), dtype=bool) if mask is None else mask
+        missing_video = base & ((self.flags & FLAG_VIDEO_DONE) == 0)
+        missing_audio = base & ((self.flags & FLAG_AUDIO_DONE) == 0)
+
+        return {
+            'channel_id': self.channel_id,
+            'videos': self.count(base),
+            'duration': self.total_duration(base),
+            'unknown_duration': int(np.count_nonzero(base & (self.durations < 0))),
+            'missing_video': self.count(missing_video),
+            'missing_video_duration': self.total_duration(missing_video),
+            'missing_audio': self.count(missing_audio),
+            'missing_audio_duration': self.total_duration(missing_audio),
+            'failed_video': int(np.count_nonzero(base & ((self.flags & FLAG_VIDEO_FAILED) != 0))),
+            'failed_audio': int(np.count_nonzero(base & ((self.flags & FLAG_AUDIO_FAILED) != 0))),
+            'updated': self.meta.get('updated'),
+        }
+
+
+def config_filters() -> Dict:
+    """select() filters from the FILTERING settings in config.py"""
+    return {
+        'date_after': config.DATE_AFTER,
+        'date_before': config.DATE_BEFORE,
+        'min_duration': config.MIN_DURATION,
+        'max_duration': config.MAX_DURATION,
+    }
+
+
+def list_catalogs(catalog_dir: Path = config.CATALOG_DIR) -> List[str]:
+    """List channel IDs that have a catalog on disk"""
+    catalog_dir = Path(catalog_dir)
+    if not catalog_dir.exists():
+        return []
+    return sorted(p.name for p in catalog_dir.iterdir() if (p / 'meta.json').exists())
+
+
+def load_catalog(channel_id: str, catalog_dir: Path = config.CATALOG_DIR) -> Optional[ChannelCatalog]:
+    """Load a channel's catalog if one exists"""
+    catalog = ChannelCatalog(channel_id, catalog_dir)
+    if not catalog.exists():
+        return None
+    return catalog.load()
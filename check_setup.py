@@ -158,6 +158,7 @@ def main():
         ('colorama', 'colorama'),
         ('requests', 'requests'),
         ('pydub', 'pydub'),
+        ('numpy', 'numpy'),
     ]
     
     for module_name, import_name in modules:
@@ -203,7 +204,7 @@ def main():
             print("  Windows: choco install ffmpeg")
             print("  Or download from: https://ffmpeg.org/download.html\n")
         
-        if any(module in failed_items for module in ['yt-dlp', 'colorama', 'requests', 'pydub']):
+        if any(module in failed_items for module in ['yt-dlp', 'colorama', 'requests', 'pydub', 'numpy']):
             print(f"{Fore.YELLOW}To install missing Python modules:{Style.RESET_ALL}")
             print("  Run: pip install -r requirements.txt\n")
 
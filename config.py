@@ -20,6 +20,112 @@ MAX_RETRIES = 5
 RETRY_DELAY = 3  # seconds
 CONCURRENT_DOWNLOADS = 3
 DOWNLOAD_TIMEOUT = 600  # seconds
+PARTIAL_SAVE_INTERVAL = 5  # seconds between checkpoints of in-flight transfers
+EXECUTOR = "thread"  # thread, process (download attempts in a process pool, see workers.py)
+
+RATE_LIMIT = None  # KB/s per download (None = unlimited)
+
+# Network paths for download attempts (see egress.py). Each entry is a dict
+# with 'proxy' and/or 'source_address', optional 'max_jobs', 'rate_limit'
+# (KB/s shared by the egress's jobs) and 'name'. Empty = PROXY / FORCE_IPV.
+EGRESSES = []
+EGRESS_EJECT_AFTER = 3  # consecutive throttling errors before an egress is ejected
+EGRESS_EJECT_SECONDS = 300  # first ejection; doubles on each repeated ejection
+EGRESS_MAX_EJECT_SECONDS = 3600
+EGRESS_HEALTHY_RUN = 10  # successes in a row after which an egress's ejection back-off starts over
+PROXY = None  # e.g. "http://127.0.0.1:8080"
+FORCE_IPV = None  # None (auto), 4 or 6
+
+# Scheduler: how often admission limits are re-checked while jobs run
+ADMISSION_POLL_INTERVAL = 1.0  # seconds
+
+# Graceful shutdown: after SIGTERM / Ctrl-C, running downloads get this long
+# to finish before they are aborted (their partial state is kept)
+DRAIN_TIMEOUT = 120  # seconds
+
+# Runtime control file, re-read when it changes or on SIGHUP (see control.py)
+CONTROL_FILE = DATA_DIR / "control.json"
+CONTROL_POLL_INTERVAL = 2.0  # seconds between checks of the control file
+MAX_CONCURRENT_DOWNLOADS = 32  # upper bound for concurrent_downloads set at runtime
+
+# Memory instrumentation and soft budget (see memory.py)
+MEMORY_REPORT = False  # periodic tracemalloc snapshots by subsystem (slows the run)
+MEMORY_BUDGET_MB = None  # fewer jobs are admitted while RSS is above this
+MEMORY_RECOVER_RATIO = 0.85  # admit more again once RSS is below budget * ratio
+MEMORY_SAMPLE_INTERVAL = 2.0  # seconds between RSS samples
+MEMORY_REPORT_INTERVAL = 300  # seconds between tracemalloc snapshots
+MEMORY_TRACE_FRAMES = 25  # traceback depth used to attribute allocations
+
+# Live progress display (see renderer.py)
+PROGRESS_DISPLAY = "auto"  # auto, bars, plain, off (auto: bars on a terminal, plain otherwise)
+RENDER_INTERVAL = 0.5  # seconds between redraws of the bars
+RENDER_TITLE_WIDTH = 30  # characters of the title shown per job bar
+PROGRESS_SUMMARY_INTERVAL = 30  # seconds between summary lines in plain mode
+PROGRESS_EVENT_INTERVAL = 0.5  # seconds between progress events from one job
+
+# Channel tabs enumerated per channel, e.g. ['videos', 'shorts', 'streams']
+# (None = only the URL as given). Tabs are fetched concurrently.
+CHANNEL_TABS = None
+TAB_WORKERS = 3
+
+# Side artifacts (see sidecar.py): own lane, tracked as their own progress kinds
+DOWNLOAD_SUBTITLES = False
+SUBTITLE_LANGUAGES = ['en', 'en-US']
+DOWNLOAD_THUMBNAIL = False
+DOWNLOAD_DESCRIPTION = False
+SIDECAR_WORKERS = 16  # concurrent side artifact jobs, independent of media downloads
+SIDECAR_RATE_LIMIT = 256  # KB/s per side artifact job (None = unlimited)
+
+# Multi-channel runs: channels enumerated at once, independent of download workers
+ENUMERATION_WORKERS = 4
+ENUMERATION_REPORT_TOP = 10  # slowest channels listed in the summary
+
+# Watch mode: long-running sync that polls each channel's newest page (see watch.py)
+WATCH_STATE_FILE = DATA_DIR / "watch_state.json"
+WATCH_PAGE_SIZE = 30  # newest entries fetched per poll
+WATCH_INTERVAL = 3600  # seconds between polls of a channel at first
+WATCH_MIN_INTERVAL = 600  # seconds, for channels that upload often
+WATCH_MAX_INTERVAL = 24 * 3600  # seconds, for dormant channels
+WATCH_SPEEDUP = 2.0  # interval divided by this after a poll with new uploads
+WATCH_BACKOFF = 1.5  # interval multiplied by this after a poll without
+WATCH_JITTER = 0.1  # +/- fraction of the interval, so channels drift apart
+WATCH_TICK = 5.0  # seconds between checks for due channels
+
+# Server mode: local HTTP/JSON job API sharing one downloader (see server.py)
+SERVER_HOST = "127.0.0.1"  # only reachable from this machine by default
+SERVER_PORT = 8750
+SERVER_EVENT_BUFFER = 10000  # progress events kept for /events (oldest dropped first)
+SERVER_STREAM_TIMEOUT = 15.0  # seconds between keep-alive lines of a followed event stream
+
+# Output striping when several output directories are given (see volumes.py)
+VOLUME_POLICY = "round-robin"  # round-robin, free-space, hash
+VOLUME_MAX_WRITES = None  # concurrent jobs writing to one volume (None = no cap)
+
+# Scratch directory for partial files, fragments and merges (see staging.py)
+STAGING_DIR = None  # e.g. Path("/mnt/nvme/yt-staging"); None = work in the output directory
+STAGING_MAX_MB = None  # jobs are admitted while their estimated sizes fit (None = no cap)
+
+# Circuit breaker for server-side throttling (HTTP 429 / bot checks)
+BREAKER_THRESHOLD = 3  # consecutive throttling errors before pausing all workers
+BREAKER_COOLDOWN = 60  # seconds to pause before sending a single probe
+BREAKER_MAX_COOLDOWN = 900  # cool-down doubles on each failed probe up to this
+
+# How long to wait before retrying a failed video, per failure class
+# (see failures.py). None = permanent, never retried automatically.
+FAILURE_RETRY_POLICY = {
+    'unavailable': None,
+    'private': None,
+    'members_only': None,
+    'age_restricted': None,
+    'geo_blocked': None,
+    'copyright': None,
+    'upcoming': 6 * 3600,
+    'throttled': 3600,
+    'network': 600,
+    'corrupt': 0,
+    'postprocess': 0,
+    'unknown': 3600,
+}
 
 # File formats
 VIDEO_FORMAT = "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best"
@@ -30,9 +136,25 @@ OUTPUT_AUDIO_FORMAT = "wav"  # Default format, can be changed via CLI: wav, mp3,
 PROGRESS_FILE = DATA_DIR / "download_progress.json"
 CHANNEL_CACHE_FILE = DATA_DIR / "channel_cache.json"
 
+# Cache of extracted video info shared by retries and the video / audio passes (see infocache.py)
+INFO_CACHE = True
+INFO_CACHE_DIR = DATA_DIR / "info_cache"
+INFO_CACHE_TTL = 4 * 3600  # seconds, when the format URLs carry no expiry
+INFO_CACHE_MARGIN = 900  # drop entries this many seconds before their URLs expire
+
+# Per-channel columnar metadata catalogs (see catalog.py)
+CATALOG_DIR = DATA_DIR / "catalog"
+
+# Filters applied to enumerated videos (None = no limit)
+DATE_AFTER = None  # YYYYMMDD, uploads on/after this date
+DATE_BEFORE = None  # YYYYMMDD, uploads on/before this date
+MIN_DURATION = None  # seconds
+MAX_DURATION = None  # seconds
+
 # Logging
 LOG_FILE = LOGS_DIR / "downloader.log"
 LOG_LEVEL = "INFO"
+LOG_JSON_FILE = None  # e.g. LOGS_DIR / "downloader.jsonl": JSON lines with channel_id, video_id, kind, ...
 
 # Video quality preferences
 VIDEO_QUALITY = "best"  # best, 1080p, 720p, 480p, etc.
@@ -41,3 +163,32 @@ VIDEO_QUALITY = "best"  # best, 1080p, 720p, 480p, etc.
 AUDIO_BITRATE = "320k"
 AUDIO_SAMPLE_RATE = 48000  # Hz
 AUDIO_CHANNELS = 2  # Stereo
+AUDIO_STREAMING = False  # pipe the audio source into ffmpeg instead of writing it to disk first
+
+# Post-download verification (see verify.py)
+VERIFY_DOWNLOADS = True  # check every finished file in the background
+VERIFY_PROBE = True  # ffprobe stream / duration check (needs ffprobe)
+VERIFY_WORKERS = 4  # parallel verifications
+VERIFY_DURATION_TOLERANCE = 2.0  # seconds (or 1% of the duration if larger)
+VERIFY_MAX_REQUEUES = 1  # re-download passes for files that fail verification
+MANIFEST_DIR = DATA_DIR / "manifests"
+
+# Download history used for size / ETA estimates (see history.py)
+HISTORY_FILE = DATA_DIR / "download_history.jsonl"
+HISTORY_MAX_RECORDS = 20000  # most recent jobs used to fit the model
+HISTORY_MIN_SAMPLES = 3  # jobs needed before a channel/profile estimate is trusted
+ETA_LOG_INTERVAL = 30  # seconds between ETA log lines
+
+# Estimates used until enough history exists
+DEFAULT_VIDEO_DURATION = 600  # seconds, for entries without a duration
+DEFAULT_CONTENT_RATE = {'video': 20.0, 'audio': 40.0}  # content s per wall s per worker
+DEFAULT_BYTES_PER_SECOND = {  # bytes per second of content
+    'download:video': 250_000,
+    'download:audio': 16_000,
+    'output:mp4': 250_000,
+    'output:wav': AUDIO_SAMPLE_RATE * AUDIO_CHANNELS * 2,  # 16-bit PCM
+    'output:mp3': 40_000,
+    'output:m4a': 32_000,
+    'output:flac': 100_000,
+    'output:opus': 16_000,
+}
@@ -21,6 +21,103 @@ RETRY_DELAY = 3  # Default: 3
 # Download timeout (in seconds)
 DOWNLOAD_TIMEOUT = 600  # Default: 600 (10 minutes)
 
+# How often the state of in-flight transfers (bytes received, format ID,
+# fragment index) is written to the progress file, in seconds.
+# Interrupted downloads continue from their saved offset on the next run.
+PARTIAL_SAVE_INTERVAL = 5  # Default: 5
+
+# Where download attempts run: "thread" (default) or "process".
+# yt-dlp's extraction is CPU-heavy Python; with many workers on a many-core
+# machine "process" avoids the GIL. Only the main process writes the
+# progress file. Compare both with: python benchmark_executor.py
+EXECUTOR = "thread"  # Options: thread, process
+
+# Cache extracted video info (compressed, in data/info_cache/) so retries and
+# the audio pass after the video pass skip the watch page / player fetch.
+# Entries are dropped INFO_CACHE_MARGIN seconds before the format URLs
+# expire, or after INFO_CACHE_TTL if the URLs carry no expiry.
+INFO_CACHE = True
+INFO_CACHE_TTL = 14400     # Default: 14400 (4 hours)
+INFO_CACHE_MARGIN = 900    # Default: 900 (15 minutes)
+
+# Memory instrumentation for long runs. MEMORY_REPORT (--memory-report) logs
+# tracemalloc snapshots grouped by subsystem every MEMORY_REPORT_INTERVAL
+# seconds and peak RSS per stage in the summary; tracing costs CPU, so it is
+# off by default. MEMORY_BUDGET_MB (--memory-budget) is a soft limit: while
+# RSS is above it, fewer downloads are admitted at once.
+MEMORY_REPORT = False
+MEMORY_BUDGET_MB = None        # Example: 2048
+MEMORY_REPORT_INTERVAL = 300   # Default: 300 (5 minutes)
+
+# Live progress display (--progress). 'bars' draws one overall bar (jobs,
+# throughput, ETA) plus one bar per running download and keeps yt-dlp's own
+# output off the console; 'plain' logs a summary line every
+# PROGRESS_SUMMARY_INTERVAL seconds instead, which suits cron and log files;
+# 'off' lets yt-dlp print as before. 'auto' picks bars on a terminal.
+PROGRESS_DISPLAY = "auto"      # Default: "auto"
+RENDER_INTERVAL = 0.5          # Default: 0.5 (seconds between redraws)
+PROGRESS_SUMMARY_INTERVAL = 30 # Default: 30
+
+# Channel tabs to enumerate: any of 'videos', 'shorts', 'streams'.
+# The tabs are fetched concurrently (TAB_WORKERS at a time) and merged into
+# one list without duplicates. None only enumerates the URL as given.
+# Override with --tabs videos,shorts,streams
+CHANNEL_TABS = None  # Example: ['videos', 'shorts', 'streams']
+TAB_WORKERS = 3      # Default: 3
+
+# Channels enumerated at once when several channels are downloaded in one
+# run (separate from CONCURRENT_DOWNLOADS). Downloads of a channel start as
+# soon as it is enumerated; the summary lists the slowest enumerations.
+ENUMERATION_WORKERS = 4      # Default: 4
+ENUMERATION_REPORT_TOP = 10  # Default: 10
+
+# Watch mode (--watch): the process keeps running and polls each channel's
+# newest page (WATCH_PAGE_SIZE entries), downloading only new uploads. Each
+# channel has its own interval: divided by WATCH_SPEEDUP when a poll finds
+# new uploads, multiplied by WATCH_BACKOFF when it finds none, kept between
+# WATCH_MIN_INTERVAL and WATCH_MAX_INTERVAL (seconds). The learned intervals
+# are kept in data/watch_state.json.
+WATCH_PAGE_SIZE = 30            # Default: 30
+WATCH_INTERVAL = 3600           # Default: 3600 (first interval of a channel)
+WATCH_MIN_INTERVAL = 600        # Default: 600
+WATCH_MAX_INTERVAL = 24 * 3600  # Default: 86400
+WATCH_SPEEDUP = 2.0             # Default: 2.0
+WATCH_BACKOFF = 1.5             # Default: 1.5
+
+# Server mode (python main.py server): one long-running downloader takes
+# jobs over a small HTTP/JSON API instead of one process per channel. Jobs
+# share the worker pool, circuit breaker and staging directory and run one
+# after another. There is no authentication: keep SERVER_HOST on loopback.
+SERVER_HOST = "127.0.0.1"       # Default: "127.0.0.1"
+SERVER_PORT = 8750              # Default: 8750
+SERVER_EVENT_BUFFER = 10000     # Default: 10000 (progress events kept for /events)
+
+# Circuit breaker for throttling (HTTP 429, "confirm you're not a bot")
+# After BREAKER_THRESHOLD throttling errors in a row all workers pause for
+# BREAKER_COOLDOWN seconds, then a single probe download is tried. If the
+# probe is throttled again the pause doubles, up to BREAKER_MAX_COOLDOWN.
+BREAKER_THRESHOLD = 3     # Default: 3
+BREAKER_COOLDOWN = 60     # Default: 60
+BREAKER_MAX_COOLDOWN = 900  # Default: 900 (15 minutes)
+
+# Retry policy per failure class, in seconds to wait after the last attempt.
+# None means the failure is permanent (deleted, private, members-only, ...)
+# and the video is skipped on later runs. Use --retry-failed to override.
+FAILURE_RETRY_POLICY = {
+    'unavailable': None,
+    'private': None,
+    'members_only': None,
+    'age_restricted': None,   # Set to 0 if you download with cookies
+    'geo_blocked': None,
+    'copyright': None,
+    'upcoming': 6 * 3600,     # Premieres / scheduled live streams
+    'throttled': 3600,        # HTTP 429, bot checks
+    'network': 600,
+    'corrupt': 0,             # Failed post-download verification
+    'postprocess': 0,         # FFmpeg errors: retry on the next run
+    'unknown': 3600,
+}
+
 
 # ============================================
 # VIDEO QUALITY SETTINGS
@@ -49,6 +146,8 @@ AUDIO_FORMAT = "bestaudio/best"
 
 # Output audio format after conversion
 OUTPUT_AUDIO_FORMAT = "wav"  # Options: wav, mp3, m4a, flac, opus
+# Several formats can be produced in one pass from the CLI:
+#   python main.py <url> --audio-format wav,mp3
 
 # Audio bitrate (for compressed formats like mp3)
 AUDIO_BITRATE = "320k"  # Options: 128k, 192k, 256k, 320k
@@ -60,6 +159,14 @@ AUDIO_SAMPLE_RATE = 48000  # Options: 44100, 48000, 96000
 # Number of audio channels
 AUDIO_CHANNELS = 2  # 1 = Mono, 2 = Stereo
 
+# Stream the audio source straight into ffmpeg instead of downloading it to
+# a file, transcoding it and deleting it: only the final files are written,
+# which saves two passes of disk I/O per track on slow disks. Formats that
+# cannot be piped (fragmented DASH / HLS) and failed streams fall back to
+# the file-based path. The bytes written per track are in the download
+# history ("disk_bytes") and the summary. Also: --stream-audio
+AUDIO_STREAMING = False  # Default: False
+
 
 # ============================================
 # FILE ORGANIZATION
@@ -74,14 +181,64 @@ VIDEO_OUTPUT_TEMPLATE = "%(title)s.%(ext)s"
 AUDIO_OUTPUT_TEMPLATE = "%(title)s.%(ext)s"
 
 
+# Several output directories can be given with -o (e.g. one per disk).
+# Each job is placed on one of them by this policy:
+# - "round-robin": cycle through the directories
+# - "free-space": the directory with the most free space
+# - "hash": always the same directory for a given video ID
+VOLUME_POLICY = "round-robin"
+
+# Maximum number of jobs writing to one output directory at the same time
+# None = no cap (limited only by CONCURRENT_DOWNLOADS)
+VOLUME_MAX_WRITES = None  # Example: 2
+
+# Fast scratch directory (local NVMe, tmpfs) for .part files, fragments,
+# the separate video / audio streams and their merge. Only the finished
+# file is moved to the output directory - a rename on the same file
+# system, a streamed copy otherwise - so slow or network storage only
+# sees one sequential write per video. Also: --staging-dir
+STAGING_DIR = None  # Example: "/mnt/nvme/yt-staging"
+
+# Size cap for the staging directory in MB. Each job reserves its
+# estimated size when it starts; no more jobs start while the cap is
+# reached (one job always runs). Also: --staging-max
+STAGING_MAX_MB = None  # Example: 20480
+
+
+# Check every finished file in the background (ffprobe stream and duration
+# check, SHA-256 checksum). Files that fail are deleted and downloaded again
+# up to VERIFY_MAX_REQUEUES times. Results are kept in data/manifests/.
+VERIFY_DOWNLOADS = True
+VERIFY_PROBE = True              # Needs ffprobe (installed with FFmpeg)
+VERIFY_WORKERS = 4
+VERIFY_DURATION_TOLERANCE = 2.0  # Seconds (or 1% of the duration if larger)
+VERIFY_MAX_REQUEUES = 1
+
+
 # ============================================
 # BANDWIDTH & SIZE LIMITS
 # ============================================
 
-# Limit download speed (in KB/s)
+# Limit download speed (in KB/s, per download)
 # Set to None for unlimited
 RATE_LIMIT = None  # Example: 1024 for 1MB/s
 
+# Graceful shutdown. On SIGTERM or Ctrl-C no new downloads start; running
+# ones get DRAIN_TIMEOUT seconds to finish, then they are aborted with their
+# .part files and checkpoints kept, and the run exits cleanly (exit code 0).
+# A second signal aborts running downloads at once.
+DRAIN_TIMEOUT = 120            # Default: 120
+
+# Runtime control: a running download re-reads CONTROL_FILE when it changes
+# (checked every CONTROL_POLL_INTERVAL seconds) or on SIGHUP, and applies
+# concurrent_downloads, rate_limit, retry_delay, video_format, audio_format
+# and paused from the next job on. Edit it with `python main.py control`.
+# With --executor process the process pool keeps the size it started with.
+# A control file left by an earlier run is removed when a run starts.
+# CONTROL_FILE defaults to data/control.json
+CONTROL_POLL_INTERVAL = 2.0    # Default: 2.0
+MAX_CONCURRENT_DOWNLOADS = 32  # Default: 32 (upper bound for runtime resizing)
+
 # Maximum file size to download (in MB)
 # Set to None for no limit
 MAX_FILESIZE = None  # Example: 500 for 500MB
@@ -107,6 +264,12 @@ MAX_DURATION = None  # Example: 3600 (skip videos longer than 1 hour)
 # ADVANCED FEATURES
 # ============================================
 
+# Subtitles, thumbnails and descriptions are fetched in a separate lane
+# (SIDECAR_WORKERS jobs at once, SIDECAR_RATE_LIMIT KB/s each) alongside the
+# media downloads, next to the video files, and tracked as their own kinds in
+# the progress file. --side-artifacts selects them on the command line;
+# --metadata-only fetches only them, e.g. to refresh an existing archive.
+
 # Download subtitles
 DOWNLOAD_SUBTITLES = False
 SUBTITLE_LANGUAGES = ['en', 'en-US']  # Preferred subtitle languages
@@ -117,6 +280,9 @@ DOWNLOAD_THUMBNAIL = False
 # Download video description
 DOWNLOAD_DESCRIPTION = False
 
+SIDECAR_WORKERS = 16           # Default: 16
+SIDECAR_RATE_LIMIT = 256       # Default: 256 (KB/s per job, None = unlimited)
+
 # Embed metadata in files
 EMBED_METADATA = True
 
@@ -142,6 +308,29 @@ FORCE_IPV = None
 # Example: "http://127.0.0.1:8080"
 PROXY = None
 
+# Egress pool: spread downloads over several proxies and/or local source
+# addresses (--egress) so per-IP throttling does not cap the run. Each egress
+# takes at most 'max_jobs' downloads and shares 'rate_limit' KB/s between
+# them: each download gets rate_limit / max_jobs (CONCURRENT_DOWNLOADS when
+# max_jobs is not set), so the egress never exceeds its cap. After
+# EGRESS_EJECT_AFTER throttling errors in a row an egress is ejected for
+# EGRESS_EJECT_SECONDS (doubling, up to EGRESS_MAX_EJECT_SECONDS); the
+# doubling only starts over after EGRESS_HEALTHY_RUN successes in a row, so
+# a single lucky request between bursts of 429s does not reset it;
+# the circuit breaker only pauses everything once no healthy egress is left.
+# When EGRESSES is empty, PROXY and FORCE_IPV above are used.
+EGRESSES = []
+# Example:
+# EGRESSES = [
+#     {'proxy': 'socks5://10.0.0.2:1080', 'max_jobs': 2},
+#     {'proxy': 'http://10.0.0.3:3128', 'max_jobs': 2, 'rate_limit': 4096},
+#     {'source_address': '192.0.2.10'},
+# ]
+EGRESS_EJECT_AFTER = 3         # Default: 3
+EGRESS_EJECT_SECONDS = 300     # Default: 300
+EGRESS_MAX_EJECT_SECONDS = 3600  # Default: 3600
+EGRESS_HEALTHY_RUN = 10        # Default: 10
+
 
 # ============================================
 # LOGGING & DEBUG
@@ -151,6 +340,12 @@ PROXY = None
 # Options: DEBUG, INFO, WARNING, ERROR, CRITICAL
 LOG_LEVEL = "INFO"
 
+# Structured log (--log-json): one JSON object per line with time, level,
+# message and, where known, channel_id, video_id, kind, attempt, bytes and
+# elapsed, for log shippers. Written by the same background thread as the
+# text log, so workers never wait on disk.
+LOG_JSON_FILE = None           # Example: "logs/downloader.jsonl"
+
 # Enable verbose output
 VERBOSE = False
 
@@ -0,0 +1,218 @@
+"""
+Runtime Control
+
+Settings a long run picks up without a restart. The run watches a JSON
+control file (data/control.json by default) and re-reads it when it changes
+or on SIGHUP:
+
+    {
+        "concurrent_downloads": 6,     # worker pool size
+        "rate_limit": 2048,            # KB/s per download, null = unlimited
+        "retry_delay": 10,             # seconds, multiplied by the attempt
+        "video_format": "...",         # yt-dlp format selectors
+        "audio_format": "...",
+        "paused": true                 # stop admitting new jobs
+    }
+
+Keys that are absent keep their current value. Changes take effect at job
+boundaries: running downloads finish with the settings they started with,
+the next admitted job uses the new ones. `python main.py control` edits
+the file.
+
+The file only holds changes made during a run: one left behind by an
+earlier run is removed when a run starts, so its pause or pool size never
+carries over into a run started with other settings.
+"""
+import json
+import logging
+import signal
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import config
+from utils import atomic_write_text
+
+
+def _positive_int(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError("must be a positive integer")
+    return min(value, config.MAX_CONCURRENT_DOWNLOADS)
+
+
+def _rate_limit(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError("must be a positive number of KB/s or null")
+    return value
+
+
+def _seconds(value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError("must be a number of seconds")
+    return value
+
+
+def _format(value: Any) -> str:
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("must be a yt-dlp format selector")
+    return value
+
+
+# control key -> (config attribute, validator)
+SETTINGS: Dict[str, Tuple[str, Callable[[Any], Any]]] = {
+    'concurrent_downloads': ('CONCURRENT_DOWNLOADS', _positive_int),
+    'rate_limit': ('RATE_LIMIT', _rate_limit),
+    'retry_delay': ('RETRY_DELAY', _seconds),
+    'video_format': ('VIDEO_FORMAT', _format),
+    'audio_format': ('AUDIO_FORMAT', _format),
+}
+
+
+def read_control(path: Path = config.CONTROL_FILE) -> Dict:
+    """
+    Contents of a control file
+
+    Args:
+        path: Control file
+
+    Returns:
+        The settings in the file ({} if it does not exist)
+
+    Raises:
+        ValueError: If the file is not a JSON object
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path} is not valid JSON: {e}")
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must contain a JSON object")
+    return data
+
+
+def write_control(updates: Dict, path: Path = config.CONTROL_FILE) -> Dict:
+    """Merge settings into a control file (written atomically); returns the new contents"""
+    for key, value in updates.items():
+        if key == 'paused':
+            if not isinstance(value, bool):
+                raise ValueError("paused must be true or false")
+        elif key in SETTINGS:
+            SETTINGS[key][1](value)
+        else:
+            raise ValueError(f"Unknown control setting '{key}'")
+
+    data = dict(read_control(path), **updates)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(data, indent=2))
+    return data
+
+
+class RunControl:
+    """Watches the control file (and SIGHUP) and applies its settings to config"""
+
+    def __init__(self, path: Path = config.CONTROL_FILE, logger: Optional[logging.Logger] = None):
+        self.path = Path(path)
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        self.lock = threading.Lock()
+        self.paused = False
+        self._mtime: Optional[float] = None
+        self._reload = threading.Event()
+        self._stop = threading.Event()
+        self._previous_handler = None
+
+        self._discard_stale()
+        self._install_sighup()
+        self.thread = threading.Thread(target=self._run, name='run-control', daemon=True)
+        self.thread.start()
+
+    def _discard_stale(self):
+        """Remove a control file left by an earlier run; this run starts with its own settings"""
+        try:
+            stale = read_control(self.path)
+        except (OSError, ValueError):
+            stale = None
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            self.logger.warning(f"Could not remove old control file {self.path}: {e}")
+            return
+        self.logger.info(f"Control: discarded {self.path} from an earlier run"
+                         + (f" ({json.dumps(stale)})" if stale else ""))
+
+    def _install_sighup(self):
+        # Signal handlers can only be set from the main thread, and not on Windows
+        if not hasattr(signal, 'SIGHUP') or threading.current_thread() is not threading.main_thread():
+            return
+        self._previous_handler = signal.signal(signal.SIGHUP, lambda signum, frame: self._reload.set())
+
+    def _run(self):
+        while not self._stop.is_set():
+            forced = self._reload.wait(config.CONTROL_POLL_INTERVAL)
+            if self._stop.is_set():
+                return
+            self._reload.clear()
+            try:
+                mtime = self.path.stat().st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if forced or mtime != self._mtime:
+                self.reload()
+
+    def reload(self):
+        """Read the control file and apply what changed"""
+        try:
+            self._mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            self._mtime = None
+        try:
+            data = read_control(self.path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring control file: {e}")
+            return
+
+        with self.lock:
+            for key, value in data.items():
+                if key == 'paused':
+                    if not isinstance(value, bool):
+                        self.logger.warning("Ignoring control setting paused: must be true or false")
+                    elif value != self.paused:
+                        self.paused = value
+                        self.logger.warning(
+                            "Control: job admission paused (running downloads continue)" if value
+                            else "Control: job admission resumed"
+                        )
+                    continue
+                if key not in SETTINGS:
+                    self.logger.warning(f"Ignoring unknown control setting '{key}'")
+                    continue
+
+                attribute, validate = SETTINGS[key]
+                try:
+                    value = validate(value)
+                except ValueError as e:
+                    self.logger.warning(f"Ignoring control setting {key}: {e}")
+                    continue
+                current = getattr(config, attribute)
+                if value != current:
+                    setattr(config, attribute, value)
+                    self.logger.warning(f"Control: {key} {current} -> {value}")
+
+    def is_paused(self) -> bool:
+        with self.lock:
+            return self.paused
+
+    def stop(self):
+        """Stop watching and restore the previous SIGHUP handler"""
+        self._stop.set()
+        self._reload.set()
+        self.thread.join(timeout=5)
+        if self._previous_handler is not None and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, self._previous_handler)
+            self._previous_handler = None
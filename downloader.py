@@ -5,361 +5,1259 @@ This module handles the downloading of YouTube videos and audio files from entir
 It includes robust error handling, automatic retry logic, and progress tracking to ensure
 reliable downloads even with unstable connections.
 """
-import json
 import logging
+import signal
+import threading
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 import yt_dlp
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
+from threading import Event, Lock
 
 import config
-
-
-class DownloadProgress:
-    """Manages download progress and persistence"""
-    
-    def __init__(self, progress_file: Path = config.PROGRESS_FILE):
-        self.progress_file = progress_file
-        self.lock = Lock()
-        self.data = self._load_progress()
-    
-    def _load_progress(self) -> Dict:
-        """Load progress from file"""
-        if self.progress_file.exists():
-            try:
-                with open(self.progress_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logging.error(f"Failed to load progress file: {e}")
-                return {}
-        return {}
-    
-    def _save_progress(self):
-        """Save progress to file"""
-        try:
-            with open(self.progress_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logging.error(f"Failed to save progress: {e}")
-    
-    def get_channel_progress(self, channel_id: str) -> Dict:
-        """Get progress for a specific channel"""
-        with self.lock:
-            return self.data.get(channel_id, {
-                'completed_videos': [],
-                'failed_videos': [],
-                'completed_audio': [],
-                'failed_audio': [],
-                'last_updated': None
-            })
-    
-    def mark_video_completed(self, channel_id: str, video_id: str, video_type: str = 'video'):
-        """Mark a video as completed"""
-        with self.lock:
-            if channel_id not in self.data:
-                self.data[channel_id] = {
-                    'completed_videos': [],
-                    'failed_videos': [],
-                    'completed_audio': [],
-                    'failed_audio': [],
-                    'last_updated': None
-                }
-            
-            if video_type == 'video':
-                if video_id not in self.data[channel_id]['completed_videos']:
-                    self.data[channel_id]['completed_videos'].append(video_id)
-                # Remove from failed if it was there
-                if video_id in self.data[channel_id]['failed_videos']:
-                    self.data[channel_id]['failed_videos'].remove(video_id)
-            else:  # audio
-                if video_id not in self.data[channel_id]['completed_audio']:
-                    self.data[channel_id]['completed_audio'].append(video_id)
-                if video_id in self.data[channel_id]['failed_audio']:
-                    self.data[channel_id]['failed_audio'].remove(video_id)
-            
-            self.data[channel_id]['last_updated'] = datetime.now().isoformat()
-            self._save_progress()
-    
-    def mark_video_failed(self, channel_id: str, video_id: str, video_type: str = 'video'):
-        """Mark a video as failed"""
-        with self.lock:
-            if channel_id not in self.data:
-                self.data[channel_id] = {
-                    'completed_videos': [],
-                    'failed_videos': [],
-                    'completed_audio': [],
-                    'failed_audio': [],
-                    'last_updated': None
-                }
-            
-            if video_type == 'video':
-                if video_id not in self.data[channel_id]['failed_videos']:
-                    self.data[channel_id]['failed_videos'].append(video_id)
-            else:
-                if video_id not in self.data[channel_id]['failed_audio']:
-                    self.data[channel_id]['failed_audio'].append(video_id)
-            
-            self.data[channel_id]['last_updated'] = datetime.now().isoformat()
-            self._save_progress()
-    
-    def is_completed(self, channel_id: str, video_id: str, video_type: str = 'video') -> bool:
-        """Check if a video is already completed"""
-        with self.lock:
-            if channel_id not in self.data:
-                return False
-            if video_type == 'video':
-                return video_id in self.data[channel_id]['completed_videos']
-            else:
-                return video_id in self.data[channel_id]['completed_audio']
+from catalog import ChannelCatalog, config_filters, load_catalog
+from control import RunControl
+from egress import Egress, EgressPool
+from failures import classify_error, is_permanent, retry_status
+from history import DownloadHistory, RunEstimator, ThroughputModel
+from infocache import InfoCache
+from memory import MemoryMonitor
+from progress import ChannelCache, DownloadProgress
+from renderer import ProgressRenderer, create_renderer
+from sidecar import SideArtifactLane, configured_side_kinds
+from staging import StagingArea
+from throttle import CircuitBreaker
+from utils import channel_tab_url, format_bytes, format_duration, log_fields, setup_logging
+from verify import VerificationError, Verifier
+from volumes import VolumeSet
+from transcode import parse_audio_formats
+from watch import NewestPageFetcher, WatchSchedule
+from workers import EXECUTORS, ProcessAttemptPool, create_attempt_pool, run_attempt
 
 
 class YouTubeChannelDownloader:
     """Main YouTube Channel Downloader with robust error handling"""
     
-    def __init__(self, download_videos: bool = True, download_audio: bool = True, audio_format: str = 'wav'):
+    def __init__(self, download_videos: bool = True, download_audio: bool = True,
+                 audio_format: Union[str, List[str]] = 'wav', retry_failed: bool = False,
+                 filters: Optional[Dict] = None, tabs: Optional[List[str]] = None,
+                 executor: Optional[str] = None, egresses: Optional[List[Dict]] = None,
+                 side_artifacts: Optional[List[str]] = None):
         self.download_videos = download_videos
         self.download_audio = download_audio
-        self.audio_format = audio_format.lower()
+        # Channel tabs to enumerate (None = only the URL as given)
+        self.tabs = tabs if tabs is not None else config.CHANNEL_TABS
+        # Date / duration filters (ChannelCatalog.select keywords), default from config
+        self.filters = filters if filters is not None else config_filters()
+        # Ignore failure retry policies and retry every earlier failure
+        self.retry_failed = retry_failed
+        # Several formats may be requested; each source is decoded once for all of them
+        if isinstance(audio_format, str):
+            audio_format = parse_audio_formats(audio_format)
+        self.audio_formats = [fmt.lower() for fmt in audio_format]
         self.progress = DownloadProgress()
+        self.channel_cache = ChannelCache()
         self.logger = self._setup_logger()
+        # Shared by all workers: throttling pauses every new attempt at once
+        self.breaker = CircuitBreaker(logger=self.logger)
+        # Proxies / source addresses attempts are spread over (see egress.py)
+        self.egresses = EgressPool(egresses, logger=self.logger)
+        # Scratch directory for partial files and merges, capped in size (see staging.py)
+        self.staging: Optional[StagingArea] = None
+        if config.STAGING_DIR:
+            max_bytes = config.STAGING_MAX_MB * 2**20 if config.STAGING_MAX_MB else None
+            self.staging = StagingArea(config.STAGING_DIR, max_bytes,
+                                       sample_interval=config.ADMISSION_POLL_INTERVAL, logger=self.logger)
+            # Job directories of transfers that will not be resumed are dead weight
+            self.staging.prune(StagingArea.job_name(*job) for job in self.progress.resumable_partials())
+        # Subtitles / thumbnails / descriptions, fetched in their own lane (see sidecar.py)
+        self.side_kinds = side_artifacts if side_artifacts is not None else configured_side_kinds()
+        self.side_lane: Optional[SideArtifactLane] = None
+        # Per-job bytes and timings feed the size / ETA model
+        self.history = DownloadHistory()
+        self.model = ThroughputModel.from_history(self.history)
+        # Finished files are checked in the background; bad ones are re-queued
+        self.verifier = Verifier(on_failure=self._on_verify_failed) if config.VERIFY_DOWNLOADS else None
+        if config.INFO_CACHE:
+            InfoCache().prune()
+        self.reset_stats()
+        # 'process' runs download attempts in a process pool (see workers.py)
+        self.executor = executor or config.EXECUTOR
+        if self.executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{self.executor}' (choose from: {', '.join(EXECUTORS)})")
+        self._attempt_pool: Optional[ProcessAttemptPool] = None
+        self._in_flight: Set[Tuple[str, str, str]] = set()
+        self._in_flight_lock = Lock()
+        # RSS per stage, tracemalloc report and soft budget (see memory.py)
+        self.memory: Optional[MemoryMonitor] = None
+        # Live multi-job progress display (see renderer.py)
+        self.renderer: Optional[ProgressRenderer] = None
+        # Control file / SIGHUP watcher for runtime settings (see control.py)
+        self.control: Optional[RunControl] = None
+        # Graceful shutdown: SIGTERM / Ctrl-C stop admission, then running
+        # transfers get DRAIN_TIMEOUT seconds before they are aborted
+        self._draining = Event()
+        self._cancel = Event()
+        self._drain_deadline: Optional[float] = None
+        self._previous_signal_handlers: Dict[int, object] = {}
+        # Nesting depth of session(); the outermost one starts and stops the shared machinery
+        self._sessions = 0
+        # Receive run events (channel, attempt, progress, downloaded, failed); see server.py
+        self.listeners: List[Callable[[Dict], None]] = []
+    
+    def reset_stats(self):
+        """Start a new set of run counters (each server job reports its own)"""
         self.stats = {
             'total_videos': 0,
             'downloaded_videos': 0,
             'failed_videos': 0,
             'downloaded_audio': 0,
             'failed_audio': 0,
-            'skipped': 0
+            'skipped': 0,
+            'skipped_failed': 0,
+            'filtered': 0,
+            'verify_failed': 0,
+            'info_cache_hits': 0,
+            'staging_renamed': 0,
+            'staging_copied': 0,
+            'audio_streamed': 0,
+            'audio_disk_bytes': 0,
+            'interrupted': 0
         }
+        # Per-channel enumeration latency of multi-channel runs
+        self.enumeration: List[Dict] = []
+        if self.side_lane:
+            self.side_lane.reset_stats()
+    
+    def configure(self, download_videos: bool = True, download_audio: bool = True,
+                  audio_format: Union[str, List[str]] = 'wav', retry_failed: bool = False,
+                  filters: Optional[Dict] = None, tabs: Optional[List[str]] = None,
+                  side_artifacts: Optional[List[str]] = None):
+        """
+        Replace the run options of a long-lived downloader between runs
+        (server jobs); the arguments mean the same as in __init__
+        """
+        self.download_videos = download_videos
+        self.download_audio = download_audio
+        self.tabs = tabs if tabs is not None else config.CHANNEL_TABS
+        self.filters = filters if filters is not None else config_filters()
+        if isinstance(audio_format, str):
+            audio_format = parse_audio_formats(audio_format)
+        self.audio_formats = [fmt.lower() for fmt in audio_format]
+        side_kinds = side_artifacts if side_artifacts is not None else configured_side_kinds()
+        if side_kinds != self.side_kinds or retry_failed != self.retry_failed:
+            # The side lane was built for the previous kinds / retry policy
+            self._close_side_lane()
+        self.side_kinds = side_kinds
+        self.retry_failed = retry_failed
+    
+    def add_listener(self, listener: Callable[[Dict], None]):
+        """Call `listener` with every run event (a dict with 'type' and 'time')"""
+        self.listeners.append(listener)
+    
+    def _notify(self, event_type: str, **fields):
+        """Pass a run event to the listeners; their errors are logged, never fatal"""
+        if not self.listeners:
+            return
+        event = dict(fields, type=event_type, time=time.time())
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                self.logger.warning(f"Event listener failed: {e}")
     
     def _setup_logger(self) -> logging.Logger:
-        """Setup logging configuration"""
-        logger = logging.getLogger('YouTubeDownloader')
-        logger.setLevel(getattr(logging, config.LOG_LEVEL))
+        """Setup logging configuration (shared by all instances, see utils.setup_logging)"""
+        return setup_logging(config.LOG_FILE, config.LOG_LEVEL, json_file=config.LOG_JSON_FILE)
+    
+    def get_channel_videos(self, channel_url: str) -> List[Dict]:
+        """Fetch all videos from a YouTube channel"""
+        return self.resolve_channel(channel_url)[1]
+    
+    def resolve_channel(self, channel_url: str) -> Tuple[str, List[Dict]]:
+        """
+        Resolve the canonical channel ID and fetch all videos from a single
+        flat extraction. The ID is cached for handle / custom URLs. With
+        tabs selected, each tab is enumerated concurrently and the entries
+        are merged.
+        """
+        if self.tabs:
+            return self._resolve_channel_tabs(channel_url, self.tabs)
         
-        # File handler
-        fh = logging.FileHandler(config.LOG_FILE, encoding='utf-8')
-        fh.setLevel(logging.DEBUG)
+        self.logger.info(f"Fetching videos from channel: {channel_url}")
         
-        # Console handler
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.INFO)
+        try:
+            info = self._extract_flat(channel_url)
+            channel_id = self._channel_id_from_info(channel_url, info)
+            
+            if 'entries' not in info:
+                self.logger.error("No videos found in channel")
+                return channel_id, []
+            
+            videos = self._flat_videos(info)
+            self.logger.info(f"Found {len(videos)} videos in channel {channel_id}")
+            return channel_id, videos
+            
+        except Exception as e:
+            self.logger.error(f"Error fetching channel videos: {e}")
+            raise
+    
+    def _resolve_channel_tabs(self, channel_url: str, tabs: List[str]) -> Tuple[str, List[Dict]]:
+        """Enumerate several channel tabs in a small pool and merge them, de-duplicated by video ID"""
+        self.logger.info(f"Fetching {', '.join(tabs)} from channel: {channel_url}")
         
-        # Formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        fh.setFormatter(formatter)
-        ch.setFormatter(formatter)
+        def enumerate_tab(tab: str):
+            started = time.monotonic()
+            info = self._extract_flat(channel_tab_url(channel_url, tab))
+            return info, time.monotonic() - started
         
-        logger.addHandler(fh)
-        logger.addHandler(ch)
+        results = {}
+        errors = {}
+        with ThreadPoolExecutor(max_workers=min(len(tabs), config.TAB_WORKERS)) as executor:
+            futures = {executor.submit(enumerate_tab, tab): tab for tab in tabs}
+            for future in as_completed(futures):
+                tab = futures[future]
+                try:
+                    results[tab] = future.result()
+                except Exception as e:
+                    # Channels without shorts or streams have no such tab
+                    errors[tab] = e
+                    self.logger.warning(f"Could not enumerate {tab} tab: {e}")
         
-        return logger
-    
-    def get_channel_videos(self, channel_url: str) -> List[Dict]:
-        """Fetch all videos from a YouTube channel"""
-        self.logger.info(f"Fetching videos from channel: {channel_url}")
+        if not results:
+            self.logger.error(f"Error fetching channel videos: {errors[tabs[0]]}")
+            raise errors[tabs[0]]
         
+        channel_id = None
+        videos = []
+        seen = set()
+        # Merge in the requested tab order so the result does not depend on timing
+        for tab in tabs:
+            if tab not in results:
+                continue
+            info, elapsed = results[tab]
+            channel_id = channel_id or self._channel_id_from_info(channel_url, info)
+            tab_videos = self._flat_videos(info)
+            added = 0
+            for video in tab_videos:
+                if video['id'] not in seen:
+                    seen.add(video['id'])
+                    videos.append(video)
+                    added += 1
+            self.logger.info(f"  {tab}: {len(tab_videos)} entries ({added} new) in {elapsed:.1f}s")
+        
+        self.logger.info(f"Found {len(videos)} videos in channel {channel_id}")
+        return channel_id, videos
+    
+    def _extract_flat(self, url: str) -> Dict:
+        """Flat extraction of a channel or tab URL (entry metadata only)"""
         ydl_opts = {
             'quiet': True,
             'extract_flat': True,
             'skip_download': True,
             'no_warnings': True,
         }
-        
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(channel_url, download=False)
-                
-                if 'entries' not in info:
-                    self.logger.error("No videos found in channel")
-                    return []
-                
-                videos = []
-                for entry in info['entries']:
-                    if entry:
-                        videos.append({
-                            'id': entry.get('id'),
-                            'title': entry.get('title'),
-                            'url': f"https://www.youtube.com/watch?v={entry.get('id')}",
-                            'duration': entry.get('duration'),
-                            'upload_date': entry.get('upload_date')
-                        })
-                
-                self.logger.info(f"Found {len(videos)} videos in channel")
-                return videos
-                
-        except Exception as e:
-            self.logger.error(f"Error fetching channel videos: {e}")
-            raise
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return ydl.extract_info(url, download=False)
+    
+    def _channel_id_from_info(self, channel_url: str, info: Dict) -> str:
+        """Canonical channel ID from an extraction result; cached for later offline lookups"""
+        channel_id = (
+            info.get('channel_id')
+            or self._extract_channel_id(channel_url)
+            or info.get('id')
+        )
+        self.channel_cache.set(channel_url, channel_id, info.get('channel') or info.get('title'))
+        return channel_id
+    
+    def _flat_videos(self, info: Dict) -> List[Dict]:
+        """Video entries of a flat extraction result"""
+        videos = []
+        for entry in info.get('entries') or []:
+            if entry:
+                videos.append({
+                    'id': entry.get('id'),
+                    'title': entry.get('title'),
+                    'url': f"https://www.youtube.com/watch?v={entry.get('id')}",
+                    'duration': entry.get('duration'),
+                    'upload_date': entry.get('upload_date')
+                })
+        return videos
     
     def _download_video_with_retry(self, video_info: Dict, channel_id: str, 
-                                   output_path: Path, is_audio: bool = False) -> bool:
+                                   volumes: VolumeSet, is_audio: bool = False) -> bool:
         """Download a single video with retry logic"""
         video_id = video_info['id']
         video_title = video_info['title']
         video_url = video_info['url']
         
-        # Check if already completed
+        # Check if already completed. Audio is tracked per output format, so
+        # only the formats still missing are produced.
         video_type = 'audio' if is_audio else 'video'
-        if self.progress.is_completed(channel_id, video_id, video_type):
+        if is_audio:
+            pending_formats = [
+                fmt for fmt in self.audio_formats
+                if not self.progress.is_completed(channel_id, video_id, f'audio_{fmt}')
+            ]
+            already_done = not pending_formats
+        else:
+            pending_formats = []
+            already_done = self.progress.is_completed(channel_id, video_id, video_type)
+        
+        if already_done:
             self.logger.info(f"Skipping already downloaded {video_type}: {video_title}")
             self.stats['skipped'] += 1
             return True
         
+        # Earlier failures are only retried when their failure class allows it
+        if not self.retry_failed:
+            kinds = [f'audio_{fmt}' for fmt in pending_formats] if is_audio else [video_type]
+            blocked = {}
+            for kind in kinds:
+                record = self.progress.get_failure(channel_id, video_id, kind)
+                if record:
+                    allowed, reason = retry_status(record)
+                    if not allowed:
+                        blocked[kind] = reason
+            
+            if len(blocked) == len(kinds):
+                self.logger.info(f"Skipping {video_type} ({next(iter(blocked.values()))}): {video_title}")
+                self.stats['skipped_failed'] += 1
+                return False
+            if is_audio:
+                pending_formats = [fmt for fmt in pending_formats if f'audio_{fmt}' not in blocked]
+        
         for attempt in range(1, config.MAX_RETRIES + 1):
+            if self._draining.is_set():
+                # Shutting down: no new attempts, the job stays pending for the next run
+                self.stats['interrupted'] += 1
+                return False
+            # Blocks while the circuit breaker is open after throttling
+            probe = self.breaker.acquire()
+            fields = {'channel_id': channel_id, 'video_id': video_id, 'kind': video_type, 'attempt': attempt}
+            egress = None
             try:
-                self.logger.info(f"Downloading {video_type} (attempt {attempt}/{config.MAX_RETRIES}): {video_title}")
-                
-                if is_audio:
-                    # Audio download options with format conversion
-                    ydl_opts = {
-                        'format': config.AUDIO_FORMAT,
-                        'outtmpl': str(output_path / f'{video_title}.%(ext)s'),
-                        'postprocessors': [{
-                            'key': 'FFmpegExtractAudio',
-                            'preferredcodec': self.audio_format,
-                            'preferredquality': config.AUDIO_BITRATE,
-                        }],
-                        'postprocessor_args': [
-                            '-ar', str(config.AUDIO_SAMPLE_RATE),
-                            '-ac', str(config.AUDIO_CHANNELS),
-                        ],
-                        'quiet': False,
-                        'no_warnings': False,
-                        'socket_timeout': config.DOWNLOAD_TIMEOUT,
-                        'retries': 3,
-                        'fragment_retries': 3,
-                        'ignoreerrors': False,
-                    }
-                else:
-                    # Video download options
-                    ydl_opts = {
-                        'format': config.VIDEO_FORMAT,
-                        'outtmpl': str(output_path / f'{video_title}.%(ext)s'),
-                        'merge_output_format': 'mp4',
-                        'quiet': False,
-                        'no_warnings': False,
-                        'socket_timeout': config.DOWNLOAD_TIMEOUT,
-                        'retries': 3,
-                        'fragment_retries': 3,
-                        'ignoreerrors': False,
-                    }
-                
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([video_url])
+                self.logger.info(f"Downloading {video_type} (attempt {attempt}/{config.MAX_RETRIES}): {video_title}",
+                                 extra=log_fields(**fields))
+                self._notify('attempt', title=video_title, **fields)
                 
-                # Mark as completed
-                self.progress.mark_video_completed(channel_id, video_id, video_type)
+                # Jobs resumed from an earlier attempt go back to the volume
+                # holding their partial files
+                location = self.progress.get_location(channel_id, video_id, video_type)
+                with volumes.slot(video_id, preferred=location) as volume, self.egresses.slot() as egress:
+                    fields['egress'] = egress.name
+                    output_path = volume.root / f"{channel_id}_{'audio' if is_audio else 'videos'}"
+                    output_path.mkdir(parents=True, exist_ok=True)
+                    self.progress.set_location(channel_id, video_id, video_type, str(volume.root))
+                    record = self._download_attempt(video_info, channel_id, output_path, is_audio,
+                                                    pending_formats, egress)
                 
-                if is_audio:
-                    self.stats['downloaded_audio'] += 1
-                else:
-                    self.stats['downloaded_videos'] += 1
-                
-                self.logger.info(f"Successfully downloaded {video_type}: {video_title}")
+                self.egresses.record_success(egress)
+                self.breaker.record_success(probe)
+                self.logger.info(f"Successfully downloaded {video_type}: {video_title}",
+                                 extra=log_fields(bytes=record['downloaded_bytes'], elapsed=record['elapsed'],
+                                                  **fields))
+                self._notify('downloaded', title=video_title, bytes=record['downloaded_bytes'],
+                             elapsed=record['elapsed'], **fields)
                 return True
                 
             except Exception as e:
-                self.logger.warning(f"Attempt {attempt} failed for {video_title}: {e}")
+                if self._draining.is_set():
+                    # Interrupted by the shutdown (or failed during it): not a failure of
+                    # the video; the partial state is kept and the next run resumes it
+                    self.breaker.record_failure(False, probe)
+                    self.logger.warning(f"Stopped {video_type} for shutdown, resumes next run: {video_title}",
+                                        extra=log_fields(**fields))
+                    self.stats['interrupted'] += 1
+                    return False
+                error_class = classify_error(e)
+                throttled = error_class == 'throttled'
+                if egress is not None:
+                    # With several egresses, throttling ejects the egress first;
+                    # the breaker only hears about it when no healthy one is left
+                    throttled = self.egresses.record_failure(egress, throttled)
+                self.breaker.record_failure(throttled, probe)
+                self.logger.warning(f"Attempt {attempt} failed for {video_title} ({error_class}): {e}",
+                                    extra=log_fields(**fields))
                 
-                if attempt < config.MAX_RETRIES:
+                # Deleted, private, members-only etc. will not succeed on retry
+                permanent = is_permanent(error_class)
+                
+                if attempt < config.MAX_RETRIES and not permanent:
                     time.sleep(config.RETRY_DELAY * attempt)  # Exponential backoff
                 else:
-                    self.logger.error(f"Failed to download {video_type} after {config.MAX_RETRIES} attempts: {video_title}")
-                    self.progress.mark_video_failed(channel_id, video_id, video_type)
+                    if permanent:
+                        self.logger.error(f"Not retrying {video_type} ({error_class}): {video_title}",
+                                          extra=log_fields(**fields))
+                        # Nothing will resume it, so its staging directory goes too
+                        self.progress.clear_partial(channel_id, video_id, video_type)
+                    else:
+                        self.logger.error(f"Failed to download {video_type} after {config.MAX_RETRIES} attempts: {video_title}",
+                                          extra=log_fields(**fields))
                     
                     if is_audio:
-                        self.stats['failed_audio'] += 1
+                        for fmt in pending_formats:
+                            self.progress.mark_video_failed(channel_id, video_id, f'audio_{fmt}',
+                                                            error=e, attempts=attempt)
+                        self.stats['failed_audio'] += len(pending_formats)
                     else:
+                        self.progress.mark_video_failed(channel_id, video_id, video_type,
+                                                        error=e, attempts=attempt)
                         self.stats['failed_videos'] += 1
+                    self._notify('failed', title=video_title, error_class=error_class, error=str(e), **fields)
                     return False
         
         return False
     
-    def download_channel(self, channel_url: str, output_dir: Optional[Path] = None):
-        """Download all videos from a channel"""
-        if output_dir is None:
-            output_dir = config.DOWNLOADS_DIR
+    def _download_attempt(self, video_info: Dict, channel_id: str, output_path: Path,
+                          is_audio: bool, pending_formats: List[str], egress: Optional[Egress] = None):
+        """Run one download attempt and return its history record; raises on failure"""
+        video_id = video_info['id']
+        video_title = video_info['title']
+        video_type = 'audio' if is_audio else 'video'
+        
+        # A previous run (or attempt) may have left a .part file behind
+        partial = self.progress.get_partial(channel_id, video_id, video_type)
+        if partial and partial.get('format_id'):
+            self.logger.info(
+                f"Resuming {video_type} at {partial.get('downloaded_bytes') or 0} bytes "
+                f"(format {partial['format_id']}, fragment {partial.get('fragment_index')}): {video_title}"
+            )
         
-        output_dir = Path(output_dir)
+        spec = {
+            'channel_id': channel_id,
+            'video_id': video_id,
+            'video_type': video_type,
+            'title': video_title,
+            'url': video_info['url'],
+            'output_path': str(output_path),
+            'is_audio': is_audio,
+            'formats': pending_formats,
+            'format_id': partial.get('format_id') if partial else None,
+            'info_cache': config.INFO_CACHE,
+            'quiet': self.renderer is not None,
+            # Read per job so runtime control changes apply at job boundaries
+            'video_format': config.VIDEO_FORMAT,
+            'audio_format': config.AUDIO_FORMAT,
+            'rate_limit': config.RATE_LIMIT,
+            'stream_audio': config.AUDIO_STREAMING,
+            'staging_dir': str(self.staging.job_dir(channel_id, video_id, video_type)) if self.staging else None,
+        }
+        if egress:
+            options = egress.job_options()
+            rate_limits = [limit for limit in (config.RATE_LIMIT, options.pop('rate_limit', None)) if limit]
+            spec.update(options, rate_limit=min(rate_limits) if rate_limits else None)
         
+        started = time.monotonic()
+        key = (channel_id, video_id, video_type)
+        with self._in_flight_lock:
+            self._in_flight.add(key)
+        if self.renderer:
+            self.renderer.start_job(key, video_title)
         try:
-            # Get channel ID from URL
-            channel_id = self._extract_channel_id(channel_url)
-            
-            # Get all videos
-            videos = self.get_channel_videos(channel_url)
-            
-            if not videos:
-                self.logger.warning("No videos found to download")
+            pool = self._get_attempt_pool()
+            if pool:
+                result = pool.run(spec)
+            else:
+                result = run_attempt(spec, self._apply_worker_event, self._cancel)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.discard(key)
+            if self.renderer:
+                self.renderer.finish_job(key)
+        finished = time.monotonic()
+        outputs = {fmt: Path(path) for fmt, path in result['outputs'].items()}
+        if result['info_cached']:
+            self.stats['info_cache_hits'] += 1
+        if result['moved']:
+            self.stats[f"staging_{'renamed' if result['moved'] == 'rename' else 'copied'}"] += 1
+        
+        if is_audio:
+            self.progress.clear_partial(channel_id, video_id, video_type)
+            for fmt in pending_formats:
+                self.progress.mark_video_completed(channel_id, video_id, f'audio_{fmt}')
+            self.stats['downloaded_audio'] += len(pending_formats)
+            self.stats['audio_disk_bytes'] += result['disk_bytes'] or 0
+            if result['streamed']:
+                self.stats['audio_streamed'] += 1
+        else:
+            # Mark as completed
+            self.progress.mark_video_completed(channel_id, video_id, video_type)
+            self.stats['downloaded_videos'] += 1
+        
+        record = {
+            'channel_id': channel_id,
+            'video_id': video_id,
+            'kind': video_type,
+            'duration': video_info.get('duration') or result['duration'],
+            'downloaded_bytes': result['downloaded_bytes'],
+            'elapsed': round(finished - started, 3),
+            'stages': {
+                'download': result['download'],
+                'transcode': result['transcode'],
+            },
+            'outputs': {
+                fmt: path.stat().st_size for fmt, path in outputs.items() if path.exists()
+            },
+        }
+        if is_audio:
+            # Source file + outputs, or only the outputs when the source was streamed
+            record['disk_bytes'] = result['disk_bytes']
+            record['streamed'] = result['streamed']
+        self.history.record(record)
+        
+        if self.verifier:
+            expected_duration = video_info.get('duration') or result['duration']
+            for fmt, path in outputs.items():
+                kind = f'audio_{fmt}' if is_audio else video_type
+                self.verifier.submit(channel_id, video_id, kind, path, expected_duration)
+        
+        return record
+    
+    def _apply_worker_event(self, event: Dict):
+        """Apply a progress event from a download worker (thread or process)"""
+        if event.get('type') == 'log':
+            # yt-dlp warnings / errors while the live display owns the console
+            self.logger.log(event['level'], event['message'])
+            return
+        if event.get('type') != 'partial':
+            return
+        key = (event['channel_id'], event['video_id'], event['video_type'])
+        with self._in_flight_lock:
+            # Events from a process can arrive after its attempt has finished
+            if key not in self._in_flight:
                 return
+        self.progress.update_partial(*key, event['fields'])
+        fields = event['fields']
+        if self.renderer:
+            self.renderer.update_job(key, fields.get('downloaded_bytes'), fields.get('total_bytes'),
+                                     event.get('speed'))
+        self._notify('progress', channel_id=key[0], video_id=key[1], kind=key[2],
+                     downloaded_bytes=fields.get('downloaded_bytes'), total_bytes=fields.get('total_bytes'),
+                     speed=event.get('speed'))
+    
+    def _get_attempt_pool(self) -> Optional[ProcessAttemptPool]:
+        """Process pool for --executor process (created on first use)"""
+        if self.executor != 'process':
+            return None
+        with self._in_flight_lock:
+            if self._attempt_pool is None:
+                self._attempt_pool = create_attempt_pool(
+                    self.executor, config.CONCURRENT_DOWNLOADS, self._apply_worker_event
+                )
+            elif self._attempt_pool.workers < config.CONCURRENT_DOWNLOADS:
+                # Runtime control raised the concurrency above the pool size
+                self._attempt_pool.resize(config.CONCURRENT_DOWNLOADS)
+            return self._attempt_pool
+    
+    def _close_attempt_pool(self):
+        with self._in_flight_lock:
+            pool, self._attempt_pool = self._attempt_pool, None
+        if pool:
+            pool.shutdown()
+    
+    @contextmanager
+    def session(self):
+        """
+        Keep the shared machinery of a run up: memory monitor, progress
+        display, control file watcher, signal handlers and, once created,
+        the attempt pool and side lane. Sessions nest and only the
+        outermost one tears down, so the server keeps one warm pool for
+        all of its jobs.
+        """
+        self._sessions += 1
+        if self._sessions == 1:
+            self._start_memory_monitor()
+            self._start_renderer()
+            self._start_control()
+            self._install_signal_handlers()
+        
+        try:
+            yield self
+        
+        finally:
+            self._sessions -= 1
+            if not self._sessions:
+                self._restore_signal_handlers()
+                self._close_attempt_pool()
+                self._close_side_lane()
+                self._stop_control()
+                self._stop_renderer()
+                self._stop_memory_monitor()
+            # Persist the latest partial-transfer checkpoints, even on Ctrl-C
+            self.progress.flush()
+    
+    def download_channel(self, channel_url: str,
+                         output_dir: Optional[Union[Path, List[Path]]] = None,
+                         volume_policy: Optional[str] = None):
+        """
+        Download all videos from a channel. output_dir may be a list of
+        directories; jobs are then striped across them by volume_policy.
+        """
+        volumes = self._volume_set(output_dir, volume_policy)
+        
+        with self.session():
+            try:
+                # Canonical channel ID and all videos from one extraction
+                with self._stage('enumeration'):
+                    channel_id, videos = self.resolve_channel(channel_url)
+                self._download_resolved(channel_url, channel_id, videos, volumes)
+                
+                # Print summary
+                self._print_summary()
             
-            self.stats['total_videos'] = len(videos)
-            
-            # Create output directories
-            video_dir = output_dir / f"{channel_id}_videos"
-            audio_dir = output_dir / f"{channel_id}_audio"
-            
-            if self.download_videos:
-                video_dir.mkdir(parents=True, exist_ok=True)
-            if self.download_audio:
-                audio_dir.mkdir(parents=True, exist_ok=True)
+            except Exception as e:
+                self.logger.error(f"Error downloading channel: {e}")
+                raise
+    
+    def download_channels(self, channel_urls: List[str],
+                          output_dir: Optional[Union[Path, List[Path]]] = None,
+                          volume_policy: Optional[str] = None):
+        """
+        Download several channels. Enumeration runs in its own pool
+        (ENUMERATION_WORKERS) and each channel's downloads start as soon as
+        it is resolved, while the remaining channels are still enumerated.
+        """
+        volumes = self._volume_set(output_dir, volume_policy)
+        
+        def enumerate_channel(channel_url: str):
+            started = time.monotonic()
+            channel_id, videos = self.resolve_channel(channel_url)
+            return channel_id, videos, time.monotonic() - started
+        
+        with self.session():
+            executor = ThreadPoolExecutor(max_workers=config.ENUMERATION_WORKERS, thread_name_prefix='enumerate')
+            futures = {executor.submit(enumerate_channel, url): url for url in channel_urls}
+            self.logger.info(
+                f"Enumerating {len(channel_urls)} channels ({config.ENUMERATION_WORKERS} at a time)"
+            )
             
-            # Download videos
-            if self.download_videos:
-                self.logger.info(f"Starting video downloads for {len(videos)} videos...")
-                self._download_batch(videos, channel_id, video_dir, is_audio=False)
+            try:
+                for future in as_completed(futures):
+                    if self._draining.is_set():
+                        break
+                    channel_url = futures[future]
+                    try:
+                        channel_id, videos, seconds = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Enumeration failed for {channel_url}: {e}")
+                        self.enumeration.append({'url': channel_url, 'channel_id': None, 'videos': 0,
+                                                 'seconds': None, 'error': str(e)})
+                        continue
+                    
+                    self.enumeration.append({'url': channel_url, 'channel_id': channel_id,
+                                             'videos': len(videos), 'seconds': seconds, 'error': None})
+                    self.logger.info(f"Enumerated {channel_id}: {len(videos)} videos in {seconds:.1f}s")
+                    
+                    try:
+                        self._download_resolved(channel_url, channel_id, videos, volumes)
+                    except Exception as e:
+                        self.logger.error(f"Error downloading channel {channel_url}: {e}")
+                
+                # Print summary
+                self._print_summary()
             
-            # Download audio
-            if self.download_audio:
-                self.logger.info(f"Starting audio downloads for {len(videos)} videos...")
-                self._download_batch(videos, channel_id, audio_dir, is_audio=True)
+            finally:
+                # Python 3.8 has no cancel_futures; drop the enumerations not started yet
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=False)
+    
+    def watch_channels(self, channel_urls: List[str],
+                       output_dir: Optional[Union[Path, List[Path]]] = None,
+                       volume_policy: Optional[str] = None):
+        """
+        Keep channels in sync until a shutdown request (SIGTERM / Ctrl-C).
+        Each channel is polled on its own adaptive interval and only the
+        uploads on its newest page that are new or unfinished are
+        downloaded (see watch.py). Downloads run one channel at a time on a
+        separate queue, so the other channels keep being polled meanwhile;
+        a channel's next poll is scheduled once its download is done.
+        """
+        volumes = self._volume_set(output_dir, volume_policy)
+        schedule = WatchSchedule(channel_urls, logger=self.logger)
+        fetcher = NewestPageFetcher()
+        # Catalogs and their ID sets stay loaded between polls
+        catalogs: Dict[str, ChannelCatalog] = {}
+        known: Dict[str, Set[str]] = {}
+        
+        with self.session():
+            executor = ThreadPoolExecutor(max_workers=config.ENUMERATION_WORKERS, thread_name_prefix='watch')
+            # Shared download queue; each job uses the full attempt pool itself
+            download_queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix='watch-download')
+            polls = {}
+            downloads = {}
+            self.logger.info(f"Watching {len(channel_urls)} channels (SIGTERM or Ctrl-C to stop)")
             
-            # Print summary
-            self._print_summary()
+            try:
+                while not self._draining.is_set():
+                    for url in schedule.due():
+                        schedule.start_poll(url)
+                        future = executor.submit(self._poll_channel, url, schedule.channel_id(url),
+                                                 fetcher, catalogs, known)
+                        polls[future] = url
+                    
+                    next_due = schedule.seconds_until_next()
+                    timeout = min(next_due if next_due is not None else config.WATCH_TICK, config.WATCH_TICK)
+                    if not polls and not downloads:
+                        self._draining.wait(timeout)
+                        continue
+                    done, _ = wait(list(polls) + list(downloads), timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in downloads:
+                            url, channel_id, videos, new_count, catalog = downloads.pop(future)
+                            try:
+                                future.result()
+                            except Exception as e:
+                                self.logger.error(f"Error downloading channel {url}: {e}")
+                            if catalog is None:
+                                # First (full) sync wrote a new catalog; keep it loaded
+                                catalog = self._load_watch_catalog(channel_id)
+                                if catalog is not None:
+                                    catalogs[channel_id] = catalog
+                                    known[channel_id] = {video_id.decode('ascii') for video_id in catalog.ids}
+                            else:
+                                known[channel_id].update(video['id'] for video in videos)
+                            schedule.record_poll(url, channel_id, new_count)
+                            continue
+                        
+                        url = polls.pop(future)
+                        try:
+                            channel_id, videos, new_count, catalog = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Watch: polling {url} failed: {e}")
+                            schedule.record_poll(url, None, 0, failed=True)
+                            continue
+                        
+                        if videos and not self._draining.is_set():
+                            # The channel stays out of the schedule until its download is done
+                            download = download_queue.submit(self._download_resolved, url, channel_id, videos,
+                                                             volumes, catalog=catalog)
+                            downloads[download] = (url, channel_id, videos, new_count, catalog)
+                        else:
+                            schedule.record_poll(url, channel_id, new_count)
+                
+                # Shutting down: the running download drains, queued ones wait for the next run
+                for future in downloads:
+                    future.cancel()
+                download_queue.shutdown(wait=True)
+                self._print_summary()
             
+            finally:
+                for future in polls:
+                    future.cancel()
+                executor.shutdown(wait=False)
+                download_queue.shutdown(wait=False)
+    
+    def _load_watch_catalog(self, channel_id: str) -> Optional[ChannelCatalog]:
+        """A channel's stored catalog, read into memory so watch mode can extend it"""
+        catalog = load_catalog(channel_id)
+        if catalog is None:
+            return None
+        # Not memory-mapped: the files are rewritten when new uploads are merged
+        return catalog.load(mmap=False)
+    
+    def _poll_channel(self, channel_url: str, channel_id: Optional[str], fetcher: NewestPageFetcher,
+                      catalogs: Dict[str, ChannelCatalog], known: Dict[str, Set[str]]
+                      ) -> Tuple[str, List[Dict], int, Optional[ChannelCatalog]]:
+        """
+        Poll a watched channel's newest page
+        
+        Args:
+            channel_url: Channel URL as watched
+            channel_id: Channel ID resolved by an earlier poll, if any
+            fetcher: Newest-page extraction
+            catalogs: Loaded catalogs by channel ID (filled on first use)
+            known: Video IDs of each loaded catalog
+        
+        Returns:
+            Channel ID, the videos to queue (new uploads and page entries
+            not downloaded yet), the number of new uploads, and the catalog
+            to merge them into - None after a full enumeration, which
+            builds the catalog from scratch
+        """
+        if channel_id is None:
+            channel_id = self._extract_channel_id(channel_url)
+        if channel_id not in catalogs:
+            # Without a catalog the newest page is no use: enumerate straight away
+            catalog = self._load_watch_catalog(channel_id) if channel_id else None
+            if catalog is None:
+                self.logger.info(f"Watch: no catalog for {channel_id or channel_url} yet, "
+                                 f"enumerating the whole channel")
+                channel_id, videos = self.resolve_channel(channel_url)
+                return channel_id, videos, 0, None
+            catalogs[channel_id] = catalog
+            known[channel_id] = {video_id.decode('ascii') for video_id in catalog.ids}
+        catalog, ids = catalogs[channel_id], known[channel_id]
+        
+        page = []
+        overflowed = False
+        for tab in self.tabs or [None]:
+            info = fetcher.fetch(channel_tab_url(channel_url, tab) if tab else channel_url)
+            tab_videos = self._flat_videos(info)
+            # A tab whose whole page is new may have more uploads beyond it
+            tab_new = sum(video['id'] not in ids for video in tab_videos)
+            overflowed = overflowed or (len(tab_videos) >= fetcher.page_size and tab_new == len(tab_videos))
+            page += tab_videos
+        
+        new = [video for video in page if video['id'] not in ids]
+        if overflowed:
+            # More uploads than one page since the last poll: enumerate everything once
+            self.logger.info(f"Watch: whole newest page of a tab of {channel_id} is new, "
+                             f"enumerating the whole channel")
+            channel_id, videos = self.resolve_channel(channel_url)
+            new = [video for video in videos if video['id'] not in ids]
+        
+        queued, seen = [], set()
+        for video in new + page:
+            if video['id'] in seen:
+                continue
+            seen.add(video['id'])
+            if video['id'] in ids and self._is_watch_video_settled(channel_id, video['id']):
+                continue
+            queued.append(video)
+        return channel_id, queued, len(new), catalog
+    
+    def _is_watch_video_settled(self, channel_id: str, video_id: str) -> bool:
+        """Nothing to do for a known video: every kind is done or waits for its retry policy"""
+        kinds = []
+        if self.download_videos:
+            kinds.append('video')
+        if self.download_audio:
+            kinds += [f'audio_{fmt}' for fmt in self.audio_formats]
+        for kind in kinds:
+            if self.progress.is_completed(channel_id, video_id, kind):
+                continue
+            record = self.progress.get_failure(channel_id, video_id, kind)
+            if record and not self.retry_failed and not retry_status(record)[0]:
+                continue
+            return False
+        return True
+    
+    def _volume_set(self, output_dir: Optional[Union[Path, List[Path]]],
+                    volume_policy: Optional[str]) -> VolumeSet:
+        """Output volumes for a run (default: config.DOWNLOADS_DIR)"""
+        if output_dir is None:
+            output_dir = config.DOWNLOADS_DIR
+        
+        output_dirs = output_dir if isinstance(output_dir, (list, tuple)) else [output_dir]
+        return VolumeSet(output_dirs, policy=volume_policy)
+    
+    def _download_resolved(self, channel_url: str, channel_id: str, videos: List[Dict],
+                           volumes: VolumeSet, catalog: Optional[ChannelCatalog] = None):
+        """
+        Catalog, filter and download the enumerated videos of one channel.
+        With `catalog` (watch mode) the videos are merged into that stored
+        catalog instead of replacing it.
+        """
+        self._migrate_legacy_channel_key(channel_url, channel_id, volumes)
+        self._notify('channel', url=channel_url, channel_id=channel_id, videos=len(videos))
+        
+        if not videos:
+            self.logger.warning("No videos found to download")
+            return
+        
+        self.stats['total_videos'] += len(videos)
+        
+        # Keep the enumeration on disk for offline queries (stats, planning)
+        with self._stage('catalog'):
+            selection = ChannelCatalog.from_videos(
+                channel_id, videos, self.progress.get_channel_progress(channel_id),
+                audio_formats=self.audio_formats
+            )
+            if catalog is None:
+                catalog = selection
+                self._save_catalog(catalog)
+            elif catalog.prepend(selection):
+                self._save_catalog(catalog)
+        
+        # The catalog keeps every entry; only the filtered ones are downloaded
+        active_filters = {k: v for k, v in self.filters.items() if v is not None}
+        if active_filters:
+            keep = selection.select(**active_filters)
+            filtered = len(videos) - int(keep.sum())
+            videos = [video for video, kept in zip(videos, keep) if kept]
+            self.stats['filtered'] += filtered
+            self.logger.info(f"Filters skip {filtered} videos, {len(videos)} remain")
+            if not videos:
+                self.logger.warning("No videos match the filters")
+                return
+        
+        if len(volumes) > 1:
+            self.logger.info(
+                f"Striping output across {len(volumes)} volumes ({volumes.policy}): "
+                f"{', '.join(str(root) for root in volumes.roots)}"
+            )
+        
+        # Side artifacts run in their own lane, alongside the media batches
+        if self.side_kinds:
+            queued = self._get_side_lane().submit(
+                channel_id, videos,
+                lambda video_id, media_done: self._side_output_path(channel_id, video_id, volumes, media_done)
+            )
+            if queued:
+                self.logger.info(f"Fetching {', '.join(self.side_kinds)} for {queued} videos in the side lane")
+        
+        # Download videos
+        if self.download_videos:
+            self.logger.info(f"Starting video downloads for {len(videos)} videos...")
+            with self._stage('video downloads'):
+                self._download_batch(videos, channel_id, volumes, is_audio=False)
+        
+        # Download audio
+        if self.download_audio:
+            self.logger.info(
+                f"Starting audio downloads for {len(videos)} videos "
+                f"({', '.join(fmt.upper() for fmt in self.audio_formats)})..."
+            )
+            with self._stage('audio downloads'):
+                self._download_batch(videos, channel_id, volumes, is_audio=True)
+        
+        if self.side_lane:
+            with self._stage('side artifacts'):
+                self.side_lane.wait()
+        
+        self._save_catalog(catalog, flags_only=True)
+    
+    def _get_side_lane(self) -> SideArtifactLane:
+        """Side artifact pool (created on first use)"""
+        if self.side_lane is None:
+            self.side_lane = SideArtifactLane(self.side_kinds, self.progress, retry_failed=self.retry_failed,
+                                              breaker=self.breaker, egresses=self.egresses, logger=self.logger)
+        return self.side_lane
+    
+    def _close_side_lane(self):
+        if self.side_lane:
+            self.side_lane.close()
+            self.side_lane = None
+    
+    def _side_output_path(self, channel_id: str, video_id: str, volumes: VolumeSet,
+                          media_done: bool) -> Optional[Path]:
+        """
+        Side artifacts go next to the video (or audio) files of the same video.
+        None while the media batches still run and the video has no volume yet.
+        """
+        media = 'video' if self.download_videos or not self.download_audio else 'audio'
+        volume = volumes.find(self.progress.get_location(channel_id, video_id, media))
+        if volume is None:
+            if len(volumes) > 1 and not media_done:
+                return None
+            # One volume, or media that was never placed (skipped, failed, older archive)
+            volume = volumes.volumes[0]
+        return volume.root / f"{channel_id}_{'videos' if media == 'video' else 'audio'}"
+    
+    def _save_catalog(self, catalog: ChannelCatalog, flags_only: bool = False):
+        """Write the channel catalog; failures are logged, never fatal"""
+        try:
+            if flags_only:
+                catalog.update_flags(self.progress.get_channel_progress(catalog.channel_id),
+                                     self.audio_formats)
+            else:
+                catalog.save()
         except Exception as e:
-            self.logger.error(f"Error downloading channel: {e}")
-            raise
+            self.logger.warning(f"Failed to write channel catalog: {e}")
+    
+    def _on_verify_failed(self, record: Dict):
+        """Undo the completion of a file that failed verification so it is downloaded again"""
+        channel_id, video_id, kind = record['channel_id'], record['video_id'], record['kind']
+        self.logger.warning(f"{record['error']}: {record['path']}")
+        Path(record['path']).unlink(missing_ok=True)
+        self.progress.unmark_completed(channel_id, video_id, kind)
+        self.progress.mark_video_failed(channel_id, video_id, kind, error=VerificationError(record['error']))
+        self.stats['verify_failed'] += 1
     
     def _download_batch(self, videos: List[Dict], channel_id: str, 
-                       output_path: Path, is_audio: bool = False):
+                       volumes: VolumeSet, is_audio: bool = False):
+        """Download a batch of videos, re-queueing files that fail verification"""
+        self._run_batch(videos, channel_id, volumes, is_audio)
+        if not self.verifier:
+            return
+        
+        kind = 'audio' if is_audio else 'video'
+        for _ in range(config.VERIFY_MAX_REQUEUES):
+            with self._stage('verification'):
+                self.verifier.wait()
+            requeued = self.verifier.take_failed(channel_id, kind)
+            if not requeued:
+                break
+            self.logger.warning(f"Re-downloading {len(requeued)} {kind} files that failed verification")
+            self._run_batch([video for video in videos if video['id'] in requeued],
+                            channel_id, volumes, is_audio)
+        with self._stage('verification'):
+            self.verifier.wait()
+    
+    def _run_batch(self, videos: List[Dict], channel_id: str, 
+                   volumes: VolumeSet, is_audio: bool = False):
         """Download a batch of videos using thread pool"""
-        with ThreadPoolExecutor(max_workers=config.CONCURRENT_DOWNLOADS) as executor:
-            futures = {
-                executor.submit(
-                    self._download_video_with_retry, 
-                    video, 
-                    channel_id, 
-                    output_path, 
-                    is_audio
-                ): video for video in videos
-            }
-            
-            for future in as_completed(futures):
-                video = futures[future]
-                try:
-                    future.result()
-                except Exception as e:
-                    self.logger.error(f"Unexpected error downloading {video['title']}: {e}")
+        kind = 'audio' if is_audio else 'video'
+        pending = [video for video in videos if not self._is_job_done(channel_id, video['id'], is_audio)]
+        estimator = RunEstimator(self.model, channel_id, kind, self.audio_formats,
+                                 config.CONCURRENT_DOWNLOADS)
+        estimator.start(pending)
+        pending_ids = {video['id'] for video in pending}
+        if self.renderer:
+            self.renderer.track(kind, estimator)
+        with self._in_flight_lock:
+            pool = self._attempt_pool
+        if pool and not self._cancel.is_set():
+            # The worker processes share one cancel event; a cancel left over
+            # from an earlier batch must not abort this one
+            pool.reset()
+        
+        queue = deque(videos)
+        in_flight = {}
+        # Sized for the largest pool runtime control may ask for; threads are
+        # only started as jobs are admitted, so admission sets the real size
+        max_workers = max(config.CONCURRENT_DOWNLOADS, config.MAX_CONCURRENT_DOWNLOADS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while (queue and not self._draining.is_set()) or in_flight:
+                if self._draining.is_set() and time.monotonic() >= self._drain_deadline:
+                    self._cancel_attempts()
+                
+                # Admit jobs up to the current limit; only in-flight jobs hold a future
+                while queue and len(in_flight) < self._admission_limit():
+                    video = queue[0]
+                    # Finished videos are skipped by the worker and never touch staging
+                    if self.staging and video['id'] in pending_ids:
+                        estimate = self._staging_estimate(channel_id, video, is_audio)
+                        if not self.staging.has_room(estimate):
+                            break  # wait for running jobs to free staging space
+                        self.staging.reserve(StagingArea.job_name(channel_id, video['id'], kind), estimate)
+                    queue.popleft()
+                    future = executor.submit(
+                        self._download_video_with_retry, 
+                        video, 
+                        channel_id, 
+                        volumes, 
+                        is_audio
+                    )
+                    in_flight[future] = video
+                
+                if not in_flight:
+                    # Admission is paused and nothing is running
+                    time.sleep(config.ADMISSION_POLL_INTERVAL)
+                    continue
+                done, _ = wait(in_flight, timeout=config.ADMISSION_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    video = in_flight.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.logger.error(f"Unexpected error downloading {video['title']}: {e}")
+                    if self.staging and video['id'] in pending_ids:
+                        # Partial files of an unfinished transfer stay for the next attempt
+                        partial = self.progress.get_partial(channel_id, video['id'], kind)
+                        keep = bool(partial and partial.get('format_id'))
+                        self.staging.release(StagingArea.job_name(channel_id, video['id'], kind),
+                                             remove=not keep)
+                    
+                    if video['id'] in pending_ids:
+                        estimator.job_done(video)
+                        # The live display reports progress itself
+                        if not self.renderer and estimator.should_log():
+                            self._log_eta(kind, estimator.snapshot())
+        
+        if queue and self._draining.is_set():
+            self.stats['interrupted'] += sum(1 for video in queue if video['id'] in pending_ids)
+    
+    def _start_memory_monitor(self):
+        """Start RSS sampling when a memory report or budget is configured"""
+        if self.memory is None and (config.MEMORY_REPORT or config.MEMORY_BUDGET_MB):
+            budget = config.MEMORY_BUDGET_MB * 2**20 if config.MEMORY_BUDGET_MB else None
+            self.memory = MemoryMonitor(budget_bytes=budget, report=config.MEMORY_REPORT, logger=self.logger)
+    
+    def _stop_memory_monitor(self):
+        if self.memory:
+            self.memory.stop()
+            self.memory = None
+    
+    @property
+    def stopped_early(self) -> bool:
+        """True if the run was cut short by a shutdown request"""
+        return self._draining.is_set()
+    
+    def request_shutdown(self, reason: str = "Shutdown requested"):
+        """
+        Stop admitting jobs and let running transfers finish within
+        DRAIN_TIMEOUT seconds; a second request aborts them at once.
+        Partial state is kept, so the next run resumes where this one stopped.
+        """
+        if self._draining.is_set():
+            self._cancel_attempts()
+            return
+        self._drain_deadline = time.monotonic() + config.DRAIN_TIMEOUT
+        self._draining.set()
+        if self.side_lane:
+            self.side_lane.stop()
+        with self._in_flight_lock:
+            running = len(self._in_flight)
+        self.logger.warning(
+            f"{reason}: no new downloads; waiting up to {config.DRAIN_TIMEOUT}s for "
+            f"{running} running ones (repeat to stop them now)"
+        )
+    
+    def _cancel_attempts(self):
+        """Abort running transfers; their .part files and checkpoints are kept"""
+        if self._cancel.is_set():
+            return
+        self.logger.warning("Aborting running downloads; partial files are kept for the next run")
+        self._cancel.set()
+        with self._in_flight_lock:
+            pool = self._attempt_pool
+        if pool:
+            pool.cancel()
+    
+    def _install_signal_handlers(self):
+        """Drain on SIGTERM / SIGINT instead of dying mid-write (main thread only)"""
+        if threading.current_thread() is not threading.main_thread() or self._previous_signal_handlers:
+            return
+        
+        def handle(signum, frame):
+            if self._cancel.is_set() or self._draining.is_set():
+                # Third signal: back to the default behaviour (KeyboardInterrupt / exit)
+                self._restore_signal_handlers()
+            self.request_shutdown(f"Received {signal.Signals(signum).name}")
+        
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self._previous_signal_handlers[signum] = signal.signal(signum, handle)
+    
+    def _restore_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum, handler in self._previous_signal_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_signal_handlers = {}
+    
+    def _start_control(self):
+        """Watch the control file for runtime setting changes"""
+        if self.control is None and config.CONTROL_FILE:
+            self.control = RunControl(config.CONTROL_FILE, logger=self.logger)
+    
+    def _stop_control(self):
+        if self.control:
+            self.control.stop()
+            self.control = None
+    
+    def _start_renderer(self):
+        """Start the live progress display unless PROGRESS_DISPLAY is 'off'"""
+        if self.renderer is None:
+            self.renderer = create_renderer(config.PROGRESS_DISPLAY, logger=self.logger)
+    
+    def _stop_renderer(self):
+        if self.renderer:
+            self.renderer.close()
+            self.renderer = None
+    
+    def _stage(self, name: str):
+        """Context manager attributing memory samples to a run stage"""
+        return self.memory.stage(name) if self.memory else nullcontext()
     
-    def _extract_channel_id(self, channel_url: str) -> str:
-        """Extract channel ID from URL"""
-        # Simple extraction - you can make this more robust
+    def _staging_estimate(self, channel_id: str, video: Dict, is_audio: bool) -> int:
+        """Bytes a job is expected to occupy in staging at its peak"""
+        duration = video.get('duration') or config.DEFAULT_VIDEO_DURATION
+        if is_audio:
+            return int(self.model.bytes_per_second('download:audio', channel_id) * duration)
+        # The separate streams and the merged file exist side by side until the merge ends
+        return int(2 * self.model.bytes_per_second('download:video', channel_id) * duration)
+    
+    def _admission_limit(self) -> int:
+        """Jobs the scheduler may run at once (lowered while over the memory budget, 0 while paused)"""
+        if self._draining.is_set() or (self.control and self.control.is_paused()):
+            return 0
+        limit = config.CONCURRENT_DOWNLOADS
+        if self.memory:
+            limit = self.memory.limit(limit)
+        return limit
+    
+    def _is_job_done(self, channel_id: str, video_id: str, is_audio: bool) -> bool:
+        """Check whether a job has nothing left to download"""
+        if not is_audio:
+            return self.progress.is_completed(channel_id, video_id, 'video')
+        return all(
+            self.progress.is_completed(channel_id, video_id, f'audio_{fmt}')
+            for fmt in self.audio_formats
+        )
+    
+    def _log_eta(self, kind: str, snapshot: Dict):
+        """Log progress, remaining bytes and ETA for the current batch"""
+        eta = format_duration(int(snapshot['eta'])) if snapshot['eta'] is not None else 'unknown'
+        self.logger.info(
+            f"Progress ({kind}): {snapshot['done']}/{snapshot['total']} jobs, "
+            f"~{format_bytes(snapshot['remaining_bytes'])} remaining, ETA {eta}"
+        )
+    
+    def _extract_channel_id(self, channel_url: str) -> Optional[str]:
+        """Get the channel ID from the URL or the channel cache, without network access"""
         if '/channel/' in channel_url:
             return channel_url.split('/channel/')[-1].split('/')[0].split('?')[0]
-        elif '/@' in channel_url:
-            return channel_url.split('/@')[-1].split('/')[0].split('?')[0]
-        else:
-            # Use yt-dlp to get channel ID
-            ydl_opts = {'quiet': True, 'extract_flat': True, 'skip_download': True}
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(channel_url, download=False)
-                return info.get('channel_id', 'unknown_channel')
+        return self.channel_cache.get(channel_url)
+    
+    def _migrate_legacy_channel_key(self, channel_url: str, channel_id: str, volumes: VolumeSet):
+        """
+        Move progress and output directories recorded under an @handle
+        (older versions) to the channel ID
+        """
+        if '/@' not in channel_url:
+            return
+        handle = channel_url.split('/@')[-1].split('/')[0].split('?')[0]
+        if not handle or handle == channel_id:
+            return
+        if self.progress.rename_channel(handle, channel_id):
+            self.logger.info(f"Moved progress for @{handle} to channel ID {channel_id}")
+        
+        # The completed lists now point at {channel_id}_videos / _audio
+        for root in volumes.roots:
+            for suffix in ('videos', 'audio'):
+                legacy = root / f"{handle}_{suffix}"
+                if legacy.is_dir():
+                    self._move_legacy_dir(legacy, root / f"{channel_id}_{suffix}")
+    
+    def _move_legacy_dir(self, legacy: Path, target: Path):
+        """Rename a legacy output directory, merging into the target if it exists already"""
+        try:
+            if not target.exists():
+                legacy.rename(target)
+                self.logger.info(f"Renamed {legacy} to {target}")
+                return
+            
+            conflicts = 0
+            for entry in list(legacy.iterdir()):
+                if (target / entry.name).exists():
+                    conflicts += 1
+                else:
+                    entry.rename(target / entry.name)
+            if conflicts:
+                self.logger.warning(f"Moved {legacy} into {target} except {conflicts} files that exist in both")
+            else:
+                legacy.rmdir()
+                self.logger.info(f"Merged {legacy} into {target}")
+        except OSError as e:
+            self.logger.error(f"Could not move {legacy} to {target}: {e}")
+    
+    def run_summary(self) -> Dict:
+        """
+        The figures _print_summary logs, as one JSON-serializable dict. The
+        counters in 'stats', 'enumeration' and 'side_artifacts' cover the
+        current run (reset_stats); the others cover the process lifetime.
+        """
+        summary = {
+            'stats': dict(self.stats),
+            'enumeration': list(self.enumeration),
+            'breaker': self.breaker.summary(),
+            'egresses': self.egresses.summary(),
+        }
+        if self.verifier:
+            summary['verified'] = self.verifier.stats['verified']
+        if self.side_lane:
+            summary['side_artifacts'] = dict(self.side_lane.stats)
+        if self.staging:
+            summary['staging'] = self.staging.summary()
+        if self.memory:
+            summary['memory'] = self.memory.summary()
+        return summary
     
     def _print_summary(self):
         """Print download summary"""
@@ -375,6 +1273,90 @@ class YouTubeChannelDownloader:
         if self.download_audio:
             self.logger.info(f"Audio files downloaded: {self.stats['downloaded_audio']}")
             self.logger.info(f"Audio files failed: {self.stats['failed_audio']}")
+            if self.stats['audio_disk_bytes']:
+                self.logger.info(
+                    f"Audio disk writes: {format_bytes(self.stats['audio_disk_bytes'])} "
+                    f"({self.stats['audio_streamed']} tracks streamed without a source file)"
+                )
         
         self.logger.info(f"Skipped (already downloaded): {self.stats['skipped']}")
+        if self.stats['skipped_failed']:
+            self.logger.info(f"Skipped (earlier failure not retryable yet): {self.stats['skipped_failed']}")
+        if self.stats['filtered']:
+            self.logger.info(f"Skipped (filtered): {self.stats['filtered']}")
+        
+        if self.verifier:
+            self.logger.info(
+                f"Verified files: {self.verifier.stats['verified']} ok, "
+                f"{self.stats['verify_failed']} failed verification"
+            )
+        
+        if self.side_lane:
+            side = self.side_lane.stats
+            self.logger.info(
+                "Side artifacts: " + ', '.join(f"{side[kind]} {kind}" for kind in self.side_kinds)
+                + f", {side['failed']} failed"
+            )
+        
+        if self.stats['interrupted']:
+            self.logger.info(f"Left for the next run (shutdown): {self.stats['interrupted']}")
+        
+        if self.staging:
+            staging = self.staging.summary()
+            cap = f" of {format_bytes(staging['max_bytes'])}" if staging['max_bytes'] else ''
+            self.logger.info(
+                f"Staging: peak {format_bytes(staging['peak_bytes'])}{cap}, "
+                f"{self.stats['staging_renamed']} videos renamed and "
+                f"{self.stats['staging_copied']} copied to the output"
+            )
+        
+        if self.stats['info_cache_hits']:
+            self.logger.info(f"Extractions saved by the info cache: {self.stats['info_cache_hits']}")
+        
+        if self.enumeration:
+            resolved = [record for record in self.enumeration if record['seconds'] is not None]
+            failed = len(self.enumeration) - len(resolved)
+            self.logger.info(
+                f"Enumeration: {len(resolved)} channels resolved"
+                + (f", {failed} failed" if failed else '')
+                + " (slowest first):"
+            )
+            for record in sorted(resolved, key=lambda r: r['seconds'], reverse=True)[:config.ENUMERATION_REPORT_TOP]:
+                self.logger.info(f"  {record['seconds']:>7.1f}s  {record['videos']:>7} videos  {record['channel_id']}")
+            for record in self.enumeration:
+                if record['error']:
+                    self.logger.info(f"   failed  {record['url']}: {record['error']}")
+        
+        if self.memory:
+            memory = self.memory.summary()
+            self.logger.info("Peak memory (RSS) by stage:")
+            for stage, peak in memory['stage_peaks'].items():
+                self.logger.info(f"  {stage:<16} {format_bytes(peak)}")
+            if memory['throttled_samples']:
+                self.logger.info(
+                    f"Memory budget exceeded in {memory['throttled_samples']} samples; admission was reduced"
+                )
+            if memory['subsystems']:
+                self.logger.info(
+                    "Traced memory by subsystem: "
+                    + ', '.join(f"{name} {format_bytes(size)}" for name, size in memory['subsystems'])
+                )
+            if 'traced_peak' in memory:
+                self.logger.info(f"Traced allocation peak: {format_bytes(memory['traced_peak'])}")
+        
+        breaker = self.breaker.summary()
+        if breaker['trips']:
+            self.logger.info(
+                f"Throttling: circuit breaker tripped {breaker['trips']} times, "
+                f"paused {breaker['paused_seconds']:.0f}s, {breaker['recoveries']} recoveries"
+            )
+        
+        if len(self.egresses) > 1:
+            self.logger.info("Egresses:")
+            for egress in self.egresses.summary():
+                self.logger.info(
+                    f"  {egress['name']}: {egress['succeeded']}/{egress['jobs']} attempts ok, "
+                    f"{egress['throttled']} throttled, {egress['ejections']} ejections"
+                    + (" (ejected)" if egress['ejected'] else "")
+                )
         self.logger.info("="*60 + "\n")
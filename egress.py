@@ -0,0 +1,231 @@
+"""
+Egress Pool
+
+Spreads download attempts across several network paths - HTTP/SOCKS
+proxies and/or local source addresses - so throttling that YouTube applies
+per IP no longer caps the whole run. Every egress has its own concurrency
+cap, an optional bandwidth cap shared by its running jobs, and health
+tracking: after EGRESS_EJECT_AFTER consecutive throttling errors it is
+ejected for a cool-down (doubling on repeated ejections until it has
+EGRESS_HEALTHY_RUN successes in a row) and jobs go to the remaining
+egresses. Only when no healthy egress is left does throttling
+reach the shared circuit breaker.
+
+An egress is configured as a dict (EGRESSES in config.py) or on the command
+line (--egress) as:
+
+    http://127.0.0.1:8080            proxy (http, https, socks4, socks5)
+    bind:192.0.2.10                  local source address
+    socks5://10.0.0.2:1080,jobs=2,rate=2048
+                                     with at most 2 jobs and 2048 KB/s
+"""
+import logging
+import time
+from contextlib import contextmanager
+from threading import Condition
+from typing import Dict, List, Optional
+
+import config
+
+
+PROXY_SCHEMES = ['http', 'https', 'socks4', 'socks4a', 'socks5', 'socks5h']
+
+
+def parse_egress(value: str) -> Dict:
+    """
+    Parse an --egress argument
+
+    Args:
+        value: Proxy URL or bind:ADDRESS, optionally followed by ,jobs=N and ,rate=KBPS
+
+    Returns:
+        Egress dict (proxy / source_address, max_jobs, rate_limit)
+
+    Raises:
+        ValueError: If the value cannot be parsed
+    """
+    target, *options = [part.strip() for part in value.split(',')]
+    egress: Dict = {}
+    if target.startswith('bind:'):
+        egress['source_address'] = target[len('bind:'):]
+        if not egress['source_address']:
+            raise ValueError(f"Missing address in '{value}'")
+    elif target.split('://', 1)[0].lower() in PROXY_SCHEMES and '://' in target:
+        egress['proxy'] = target
+    else:
+        raise ValueError(f"Expected a proxy URL ({', '.join(PROXY_SCHEMES)}) or bind:ADDRESS, got '{target}'")
+
+    for option in options:
+        key, _, number = option.partition('=')
+        try:
+            if key == 'jobs':
+                egress['max_jobs'] = int(number)
+            elif key == 'rate':
+                egress['rate_limit'] = float(number)
+            else:
+                raise ValueError(f"Unknown egress option '{key}' (use jobs=N or rate=KBPS)")
+        except ValueError as e:
+            raise ValueError(f"Invalid egress option '{option}': {e}")
+    return egress
+
+
+def default_egresses() -> List[Dict]:
+    """Egresses from config: EGRESSES, else the single PROXY / FORCE_IPV path"""
+    if config.EGRESSES:
+        return list(config.EGRESSES)
+    egress: Dict = {}
+    if config.PROXY:
+        egress['proxy'] = config.PROXY
+    if config.FORCE_IPV == 4:
+        egress['source_address'] = '0.0.0.0'
+    elif config.FORCE_IPV == 6:
+        egress['source_address'] = '::'
+    return [egress]
+
+
+class Egress:
+    """One network path with a concurrency cap, bandwidth cap and health state"""
+
+    def __init__(self, proxy: Optional[str] = None, source_address: Optional[str] = None,
+                 max_jobs: Optional[int] = None, rate_limit: Optional[float] = None,
+                 name: Optional[str] = None):
+        self.proxy = proxy
+        self.source_address = source_address
+        self.max_jobs = max_jobs
+        self.rate_limit = rate_limit  # KB/s shared by the egress's running jobs
+        self.name = name or proxy or (f"bind:{source_address}" if source_address else 'direct')
+        self.active = 0
+        self.consecutive_throttles = 0
+        self.consecutive_successes = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.stats = {'jobs': 0, 'succeeded': 0, 'failed': 0, 'throttled': 0, 'ejections': 0}
+
+    def is_full(self) -> bool:
+        """Check whether the egress is at its concurrent job cap"""
+        return self.max_jobs is not None and self.active >= self.max_jobs
+
+    def is_ejected(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.monotonic()) < self.ejected_until
+
+    def job_options(self) -> Dict:
+        """Job spec fields routing an attempt through this egress"""
+        options = {'proxy': self.proxy, 'source_address': self.source_address}
+        if self.rate_limit:
+            # yt-dlp's limit is fixed per download, so every job gets the share
+            # it would have with the egress full; together they stay under the cap
+            slots = self.max_jobs or config.CONCURRENT_DOWNLOADS
+            options['rate_limit'] = self.rate_limit / max(1, slots)
+        return options
+
+    def __repr__(self) -> str:
+        return f"Egress({self.name}, {self.active}/{self.max_jobs})"
+
+
+class EgressPool:
+    """Assignment of download attempts to egresses"""
+
+    def __init__(self, egresses: Optional[List[Dict]] = None,
+                 logger: Optional[logging.Logger] = None):
+        egresses = egresses if egresses is not None else default_egresses()
+        if not egresses:
+            egresses = [{}]
+        self.egresses = [Egress(**egress) for egress in egresses]
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        self.cond = Condition()
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.egresses)
+
+    def _choose(self) -> Optional[Egress]:
+        """Healthy egress with a free slot and the fewest running jobs. Caller must hold the condition."""
+        now = time.monotonic()
+        candidates = [egress for egress in self.egresses if not egress.is_full()]
+        healthy = [egress for egress in candidates if not egress.is_ejected(now)]
+        if not healthy:
+            if any(not egress.is_ejected(now) for egress in self.egresses):
+                return None  # healthy ones exist but are busy: wait for a slot
+            # Everything is ejected: the circuit breaker paces attempts now, so
+            # use the egress that comes back first rather than stalling
+            healthy = candidates
+            if not healthy:
+                return None
+            return min(healthy, key=lambda egress: egress.ejected_until)
+
+        # Least loaded first; rotate among equals so idle egresses share the work
+        self._next += 1
+        order = healthy[self._next % len(healthy):] + healthy[:self._next % len(healthy)]
+        return min(order, key=lambda egress: egress.active)
+
+    @contextmanager
+    def slot(self):
+        """
+        Reserve a slot on an egress, blocking while every usable egress is at capacity
+
+        Yields:
+            The Egress the attempt should use
+        """
+        with self.cond:
+            egress = self._choose()
+            while egress is None:
+                # Also re-check when an ejection ends
+                self.cond.wait(timeout=1.0)
+                egress = self._choose()
+            egress.active += 1
+            egress.stats['jobs'] += 1
+        try:
+            yield egress
+        finally:
+            with self.cond:
+                egress.active -= 1
+                self.cond.notify_all()
+
+    def record_success(self, egress: Egress):
+        with self.cond:
+            egress.stats['succeeded'] += 1
+            egress.consecutive_throttles = 0
+            egress.consecutive_successes += 1
+            # Only a sustained healthy run resets the ejection back-off
+            if egress.consecutive_successes >= config.EGRESS_HEALTHY_RUN:
+                egress.ejections = 0
+
+    def record_failure(self, egress: Egress, throttled: bool) -> bool:
+        """
+        Record a failed attempt on an egress
+
+        Args:
+            egress: Egress the attempt used
+            throttled: Whether the error was throttling (HTTP 429, bot check)
+
+        Returns:
+            True if the throttling should reach the circuit breaker (no
+            healthy egress left); False if it was absorbed by the pool
+        """
+        with self.cond:
+            egress.stats['failed'] += 1
+            if not throttled:
+                return False
+            egress.stats['throttled'] += 1
+            egress.consecutive_throttles += 1
+            egress.consecutive_successes = 0
+
+            if len(self.egresses) > 1 and egress.consecutive_throttles >= config.EGRESS_EJECT_AFTER:
+                cooldown = min(config.EGRESS_EJECT_SECONDS * 2 ** egress.ejections,
+                               config.EGRESS_MAX_EJECT_SECONDS)
+                egress.ejections += 1
+                egress.stats['ejections'] += 1
+                egress.consecutive_throttles = 0
+                egress.ejected_until = time.monotonic() + cooldown
+                self.logger.warning(f"Egress {egress.name} ejected for {cooldown:.0f}s after repeated throttling")
+                self.cond.notify_all()
+
+            now = time.monotonic()
+            return all(other.is_ejected(now) for other in self.egresses) or len(self.egresses) == 1
+
+    def summary(self) -> List[Dict]:
+        """Per-egress counters for the run summary"""
+        with self.cond:
+            now = time.monotonic()
+            return [dict(egress.stats, name=egress.name, ejected=egress.is_ejected(now))
+                    for egress in self.egresses]
@@ -0,0 +1,90 @@
+"""
+Failure Taxonomy
+
+Classifies download errors by cause so permanently dead videos (deleted,
+private, members-only, ...) are not retried on every run, while transient
+failures are retried once their cool-down has passed.
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import config
+
+
+# Error classes, checked in order; the first matching pattern wins. The
+# patterns follow the phrases yt-dlp and YouTube actually use. Transient
+# classes come first, so a connection error whose text happens to contain a
+# permanent-sounding phrase is still retried.
+ERROR_PATTERNS = [
+    ('throttled', r"http error 429|too many requests|confirm you.re not a bot|rate[- ]?limit"),
+    ('network', r"timed out|\btimeout\b|connection (?:reset|refused|aborted)|"
+                r"temporary failure in name resolution|name or service not known|"
+                r"http error 5\d\d|incompleteread|remote end closed|\bssl|eof occurred in violation"),
+    ('private', r"private video|this video is private"),
+    ('members_only', r"members[- ]only content|join this channel to get access|"
+                     r"available to this channel.s members"),
+    ('age_restricted', r"sign in to confirm your age|age[- ]restricted|inappropriate for some users"),
+    ('geo_blocked', r"not (?:made this video )?available in your country|blocked it in your country|"
+                    r"geo[- ]?restrict"),
+    ('copyright', r"on copyright grounds|copyright claim"),
+    ('upcoming', r"premieres in|premiere will begin|this live event will begin|video is upcoming"),
+    ('unavailable', r"video unavailable|this video has been removed|this video (?:is no longer available|"
+                    r"does not exist|isn.t available any ?more)|account associated with this video has been terminated"),
+    ('corrupt', r"verification failed:"),
+    ('postprocess', r"ffmpeg|postprocess"),
+]
+
+ERROR_CLASSES = [name for name, _ in ERROR_PATTERNS] + ['unknown']
+
+_COMPILED_PATTERNS = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in ERROR_PATTERNS]
+
+
+def classify_error(error) -> str:
+    """
+    Classify an exception or error message
+
+    Args:
+        error: Exception or message string
+
+    Returns:
+        One of ERROR_CLASSES
+    """
+    message = str(error)
+    for name, pattern in _COMPILED_PATTERNS:
+        if pattern.search(message):
+            return name
+    return 'unknown'
+
+
+def is_permanent(error_class: str) -> bool:
+    """Check whether an error class should never be retried"""
+    return config.FAILURE_RETRY_POLICY.get(error_class, 0) is None
+
+
+def retry_status(record: Dict, now: Optional[datetime] = None) -> Tuple[bool, str]:
+    """
+    Decide whether a recorded failure may be retried
+
+    Args:
+        record: Failure record from the progress store
+        now: Current time (defaults to datetime.now())
+
+    Returns:
+        (retry allowed, human-readable reason)
+    """
+    error_class = record.get('class', 'unknown')
+    cooldown = config.FAILURE_RETRY_POLICY.get(error_class, 0)
+
+    if cooldown is None:
+        return False, f"permanent failure ({error_class})"
+
+    last_attempt = record.get('last_attempt')
+    if not last_attempt or not cooldown:
+        return True, ''
+
+    retry_at = datetime.fromisoformat(last_attempt) + timedelta(seconds=cooldown)
+    now = now or datetime.now()
+    if now < retry_at:
+        return False, f"{error_class} cool-down until {retry_at.strftime('%Y-%m-%d %H:%M')}"
+    return True, ''
@@ -0,0 +1,243 @@
+"""
+Download History and Throughput Model
+
+Every finished job appends a record (bytes, content duration, wall time and
+per-stage times) to a JSON-lines history file. ThroughputModel fits, per
+channel and per format profile:
+
+    bytes per second of content   - how big the output will be
+    content seconds per wall second per worker - how long it will take
+
+These drive the live ETA during a run (RunEstimator) and the `plan` command.
+Without enough history the defaults in config.py are used.
+"""
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+import config
+
+
+class DownloadHistory:
+    """Append-only JSON-lines store of finished jobs"""
+
+    def __init__(self, history_file: Path = config.HISTORY_FILE):
+        self.history_file = history_file
+        self.lock = Lock()
+
+    def record(self, record: Dict):
+        """Append one job record"""
+        record = dict(record, time=datetime.now().isoformat())
+        with self.lock:
+            try:
+                with open(self.history_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            except Exception as e:
+                logging.error(f"Failed to write download history: {e}")
+
+    def load(self, limit: int = config.HISTORY_MAX_RECORDS) -> List[Dict]:
+        """Read the most recent records"""
+        if not self.history_file.exists():
+            return []
+        records = []
+        with self.lock:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Torn last line after a crash
+        return records[-limit:]
+
+
+class ThroughputModel:
+    """Per-channel and per-profile size and speed estimates fitted from history"""
+
+    def __init__(self, records: Iterable[Dict] = ()):
+        # (channel_id or None, key) -> [numerator, denominator, samples]
+        self.sums: Dict = {}
+        for record in records:
+            self.add(record)
+
+    @classmethod
+    def from_history(cls, history: Optional[DownloadHistory] = None) -> 'ThroughputModel':
+        """Fit a model from the history file"""
+        return cls((history or DownloadHistory()).load())
+
+    def _accumulate(self, channel_id: str, key: str, numerator: float, denominator: float):
+        for scope in (channel_id, None):
+            entry = self.sums.setdefault((scope, key), [0.0, 0.0, 0])
+            entry[0] += numerator
+            entry[1] += denominator
+            entry[2] += 1
+
+    def add(self, record: Dict):
+        """Add one job record to the model"""
+        duration = record.get('duration') or 0
+        elapsed = record.get('elapsed') or 0
+        kind = record.get('kind')
+        channel_id = record.get('channel_id')
+        if duration <= 0 or not kind:
+            return
+
+        if record.get('downloaded_bytes'):
+            self._accumulate(channel_id, f"download:{kind}", record['downloaded_bytes'], duration)
+        for fmt, size in (record.get('outputs') or {}).items():
+            if size:
+                self._accumulate(channel_id, f"output:{fmt}", size, duration)
+        if elapsed > 0:
+            self._accumulate(channel_id, f"rate:{kind}", duration, elapsed)
+
+    def _ratio(self, key: str, channel_id: Optional[str], default: float) -> float:
+        """Channel-specific ratio if there are enough samples, else global, else default"""
+        for scope in (channel_id, None):
+            entry = self.sums.get((scope, key))
+            if entry and entry[2] >= config.HISTORY_MIN_SAMPLES and entry[1] > 0:
+                return entry[0] / entry[1]
+        return default
+
+    def bytes_per_second(self, profile: str, channel_id: Optional[str] = None) -> float:
+        """
+        Bytes per second of content for a profile
+
+        Args:
+            profile: 'download:video', 'download:audio' or 'output:<ext>'
+            channel_id: Prefer this channel's own history
+
+        Returns:
+            Estimated bytes per content second
+        """
+        return self._ratio(profile, channel_id, config.DEFAULT_BYTES_PER_SECOND.get(profile, 0))
+
+    def content_rate(self, kind: str, channel_id: Optional[str] = None) -> float:
+        """Content seconds processed per wall-clock second by one worker"""
+        return self._ratio(f"rate:{kind}", channel_id, config.DEFAULT_CONTENT_RATE[kind])
+
+    def output_profiles(self, kind: str, audio_formats: List[str]) -> List[str]:
+        """Output profiles a job of this kind writes to disk"""
+        if kind == 'video':
+            return ['output:mp4']
+        return [f"output:{fmt}" for fmt in audio_formats]
+
+
+def average_duration(durations: List[Optional[int]]) -> float:
+    """Mean of the known durations, used for entries without one"""
+    known = [d for d in durations if d and d > 0]
+    return sum(known) / len(known) if known else config.DEFAULT_VIDEO_DURATION
+
+
+class RunEstimator:
+    """Live remaining-bytes and ETA estimate for one batch of jobs"""
+
+    def __init__(self, model: ThroughputModel, channel_id: str, kind: str,
+                 audio_formats: List[str], concurrency: int):
+        self.model = model
+        self.channel_id = channel_id
+        self.kind = kind
+        self.concurrency = max(1, concurrency)
+        self.profiles = model.output_profiles(kind, audio_formats)
+        self.lock = Lock()
+
+        self.total_jobs = 0
+        self.done_jobs = 0
+        self.remaining_content = 0.0
+        self.done_content = 0.0
+        self.started = time.monotonic()
+        self._default_duration = config.DEFAULT_VIDEO_DURATION
+        self._last_log = 0.0
+
+    def _duration(self, video: Dict) -> float:
+        return video.get('duration') or self._default_duration
+
+    def start(self, videos: List[Dict]):
+        """Register the jobs that still have work to do"""
+        with self.lock:
+            self._default_duration = average_duration([video.get('duration') for video in videos])
+            self.total_jobs = len(videos)
+            self.remaining_content = sum(self._duration(video) for video in videos)
+            self.started = time.monotonic()
+
+    def job_done(self, video: Dict):
+        """Account for a finished (or failed) job"""
+        with self.lock:
+            duration = self._duration(video)
+            self.done_jobs += 1
+            self.done_content += duration
+            self.remaining_content = max(0.0, self.remaining_content - duration)
+
+    def snapshot(self) -> Dict:
+        """Current progress, remaining bytes and ETA in seconds"""
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            # Trust this run's observed speed once a few jobs have finished
+            if self.done_jobs >= config.HISTORY_MIN_SAMPLES and elapsed > 0:
+                rate = self.done_content / elapsed
+            else:
+                rate = self.model.content_rate(self.kind, self.channel_id) * self.concurrency
+
+            remaining_bytes = sum(
+                self.model.bytes_per_second(profile, self.channel_id) for profile in self.profiles
+            ) * self.remaining_content
+
+            return {
+                'done': self.done_jobs,
+                'total': self.total_jobs,
+                'remaining_bytes': int(remaining_bytes),
+                'eta': self.remaining_content / rate if rate > 0 else None,
+            }
+
+    def should_log(self) -> bool:
+        """Rate-limit ETA log lines to ETA_LOG_INTERVAL"""
+        now = time.monotonic()
+        if now - self._last_log >= config.ETA_LOG_INTERVAL:
+            self._last_log = now
+            return True
+        return False
+
+
+def plan_channel(model: ThroughputModel, channel_id: str, pending: Dict[str, List[Optional[int]]],
+                 audio_formats: List[str], concurrency: int) -> Dict:
+    """
+    Predict wall-clock time, network and disk use for the pending jobs of a channel
+
+    Args:
+        model: Fitted throughput model
+        channel_id: Channel being planned
+        pending: Kind ('video'/'audio') -> durations of jobs still to do
+        audio_formats: Requested audio formats
+        concurrency: Number of download workers
+
+    Returns:
+        Dict with per-kind and total predictions
+    """
+    plan = {'channel_id': channel_id, 'kinds': {}, 'seconds': 0.0,
+            'download_bytes': 0, 'disk_bytes': 0}
+
+    for kind, durations in pending.items():
+        fallback = average_duration(durations)
+        content = sum(d if d and d > 0 else fallback for d in durations)
+        rate = model.content_rate(kind, channel_id) * max(1, concurrency)
+        disk = {
+            profile.split(':', 1)[1]: int(model.bytes_per_second(profile, channel_id) * content)
+            for profile in model.output_profiles(kind, audio_formats)
+        }
+        download = int(model.bytes_per_second(f"download:{kind}", channel_id) * content)
+        seconds = content / rate if rate > 0 else 0.0
+
+        plan['kinds'][kind] = {
+            'jobs': len(durations),
+            'content_seconds': int(content),
+            'seconds': seconds,
+            'download_bytes': download,
+            'disk_bytes': disk,
+        }
+        # Video and audio passes run one after the other
+        plan['seconds'] += seconds
+        plan['download_bytes'] += download
+        plan['disk_bytes'] += sum(disk.values())
+
+    return plan
@@ -0,0 +1,142 @@
+"""
+Per-Video Extracted Info Cache
+
+Extraction (watch page, player JS, signature decoding) is the expensive
+part of starting a download. The raw, unprocessed info dict of every video
+is cached on disk so retries, and the audio pass after the video pass, go
+straight to yt-dlp's process_ie_result() instead of extracting again.
+
+Entries are zlib-compressed JSON in data/info_cache/{video_id}.json.z. An
+entry lives until shortly before its earliest format URL expires (the
+'expire' parameter of googlevideo URLs), or INFO_CACHE_TTL when no URL
+carries one. Being files, entries are shared with process-pool workers.
+
+Format URLs only work from the IP address that extracted them, so info
+extracted through a proxy or source address (see egress.py) is kept per
+egress, in {video_id}.{egress_key}.json.z; an attempt on another egress
+extracts again instead of collecting a 403.
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+import config
+from utils import atomic_write
+
+
+# Errors after which cached format URLs are no longer usable
+EXPIRED_URL_PATTERN = re.compile(r"http error 40[13]|http error 410|forbidden|gone", re.IGNORECASE)
+
+
+def url_expiry(info: Dict) -> Optional[float]:
+    """
+    Earliest expiry time of the format URLs in an info dict
+
+    Args:
+        info: Raw extracted info
+
+    Returns:
+        Unix time, or None if no URL carries an expiry
+    """
+    expiries = []
+    for fmt in info.get('formats') or []:
+        url = fmt.get('url') or fmt.get('manifest_url')
+        if not url or 'expire' not in url:
+            continue
+        query = parse_qs(urlparse(url).query)
+        value = query.get('expire', [None])[0]
+        if value is None:
+            # DASH / HLS manifests put parameters in the path: .../expire/1700000000/...
+            match = re.search(r'/expire/(\d+)', url)
+            value = match.group(1) if match else None
+        if value and value.isdigit():
+            expiries.append(float(value))
+    return min(expiries) if expiries else None
+
+
+def egress_key(proxy: Optional[str] = None, source_address: Optional[str] = None) -> Optional[str]:
+    """
+    Cache key of the network path an extraction ran over
+
+    Args:
+        proxy: Proxy URL of the attempt
+        source_address: Local source address of the attempt
+
+    Returns:
+        Short hash, or None for the direct path
+    """
+    if not proxy and not source_address:
+        return None
+    return hashlib.sha1(f"{proxy or ''}|{source_address or ''}".encode('utf-8')).hexdigest()[:12]
+
+
+class InfoCache:
+    """Disk cache of raw extracted info, valid until the format URLs expire"""
+
+    def __init__(self, cache_dir: Path = config.INFO_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, video_id: str, egress: Optional[str] = None) -> Path:
+        if egress:
+            return self.cache_dir / f"{video_id}.{egress}.json.z"
+        return self.cache_dir / f"{video_id}.json.z"
+
+    def get(self, video_id: str, egress: Optional[str] = None) -> Optional[Dict]:
+        """Cached info for a video extracted over an egress (egress_key), or None if missing or expired"""
+        path = self._path(video_id, egress)
+        try:
+            with open(path, 'rb') as f:
+                entry = json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"Dropping unreadable info cache entry {path.name}: {e}")
+            self.invalidate(video_id, egress)
+            return None
+
+        if entry['expires'] <= time.time():
+            self.invalidate(video_id, egress)
+            return None
+        return entry['info']
+
+    def put(self, video_id: str, info: Dict, egress: Optional[str] = None):
+        """Store sanitized (JSON-serializable) info for a video, extracted over an egress (egress_key)"""
+        now = time.time()
+        expires = now + config.INFO_CACHE_TTL
+        expiry = url_expiry(info)
+        if expiry is not None:
+            expires = min(expires, expiry - config.INFO_CACHE_MARGIN)
+        if expires <= now:
+            return
+
+        data = zlib.compress(json.dumps({'expires': expires, 'info': info}).encode('utf-8'), 6)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            atomic_write(self._path(video_id, egress), lambda f: f.write(data))
+        except Exception as e:
+            logging.error(f"Failed to write info cache entry for {video_id}: {e}")
+
+    def invalidate(self, video_id: str, egress: Optional[str] = None):
+        """Drop a video's entry for an egress (e.g. after its URLs were rejected)"""
+        try:
+            self._path(video_id, egress).unlink()
+        except FileNotFoundError:
+            pass
+
+    def prune(self) -> int:
+        """Delete expired entries; returns how many were removed"""
+        if not self.cache_dir.exists():
+            return 0
+        removed = 0
+        for path in self.cache_dir.glob('*.json.z'):
+            # Video IDs contain no dots; what follows one is the egress key
+            video_id, _, egress = path.name[:-len('.json.z')].partition('.')
+            if self.get(video_id, egress or None) is None:
+                removed += 1
+        return removed
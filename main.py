@@ -2,13 +2,29 @@
 YouTube Channel Bulk Downloader - Main CLI Interface
 """
 import argparse
+import json
+import shutil
 import sys
 from pathlib import Path
+import numpy as np
 from colorama import init, Fore, Style
 
-from downloader import YouTubeChannelDownloader
+from catalog import list_catalogs, load_catalog
+from control import read_control, write_control
+from egress import parse_egress
+from failures import ERROR_CLASSES, is_permanent, retry_status
+from history import ThroughputModel, plan_channel
+from planner import download_jobs, dry_run, export_jobs
+from progress import ChannelCache, DownloadProgress
+from utils import SUPPORTED_CHANNEL_TABS, format_bytes, format_duration, parse_channel_tabs
+from volumes import VOLUME_POLICIES
+from transcode import SUPPORTED_AUDIO_FORMATS, parse_audio_formats
 import config
 
+# downloader, server, workers, sidecar (all of which load yt-dlp), renderer and
+# verify are imported by the subcommands that use them, so the offline
+# commands (stats, plan, failures, control) start quickly
+
 # Initialize colorama for colored terminal output
 init(autoreset=True)
 
@@ -39,8 +55,494 @@ def validate_url(url: str) -> bool:
     return any(pattern in url for pattern in valid_patterns)
 
 
+def audio_formats_arg(value: str):
+    """argparse type for --audio-format (comma-separated list)"""
+    try:
+        return parse_audio_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def read_channel_list(path: str) -> list:
+    """Read channel URLs from a file, one per line, skipping blanks and # comments"""
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+
+def egress_arg(value: str):
+    """argparse type for --egress (proxy URL or bind:ADDRESS with options)"""
+    try:
+        return parse_egress(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def side_kinds_arg(value: str):
+    """argparse type for --side-artifacts (comma-separated list)"""
+    from sidecar import parse_side_kinds
+    try:
+        return parse_side_kinds(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def tabs_arg(value: str):
+    """argparse type for --tabs (comma-separated list)"""
+    try:
+        return parse_channel_tabs(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def stats_command(argv):
+    """`stats` subcommand: aggregate queries over cached channel catalogs"""
+    parser = argparse.ArgumentParser(
+        prog='main.py stats',
+        description='Show archive statistics from cached channel catalogs (no network access)'
+    )
+    parser.add_argument('channels', nargs='*', help='Channel IDs (default: every catalogued channel)')
+    parser.add_argument('--after', help='Only videos uploaded on/after this date (YYYYMMDD)')
+    parser.add_argument('--before', help='Only videos uploaded on/before this date (YYYYMMDD)')
+    parser.add_argument('--min-duration', type=int, help='Only videos at least this long (seconds)')
+    parser.add_argument('--max-duration', type=int, help='Only videos at most this long (seconds)')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    channel_ids = args.channels or list_catalogs()
+    rows = []
+    for channel_id in channel_ids:
+        catalog = load_catalog(channel_id)
+        if catalog is None:
+            print(f"{Fore.YELLOW}No catalog for channel {channel_id}; download it once to build one.{Style.RESET_ALL}")
+            continue
+        mask = catalog.select(
+            min_duration=args.min_duration, max_duration=args.max_duration,
+            date_after=args.after, date_before=args.before
+        )
+        rows.append(catalog.stats(mask))
+    
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    
+    if not rows:
+        print(f"{Fore.YELLOW}No channel catalogs found in {config.CATALOG_DIR}{Style.RESET_ALL}")
+        return
+    
+    def hours(seconds):
+        return f"{seconds / 3600:.1f}h"
+    
+    header = f"{'Channel':<26} {'Videos':>8} {'Hours':>9} {'No video':>14} {'No audio':>14} {'Failed':>7}"
+    print(f"{Fore.CYAN}{header}{Style.RESET_ALL}")
+    for row in rows:
+        print(
+            f"{row['channel_id']:<26} {row['videos']:>8} {hours(row['duration']):>9} "
+            f"{row['missing_video']:>6} {hours(row['missing_video_duration']):>7} "
+            f"{row['missing_audio']:>6} {hours(row['missing_audio_duration']):>7} "
+            f"{row['failed_video'] + row['failed_audio']:>7}"
+        )
+    
+    if len(rows) > 1:
+        total = {key: sum(row[key] for row in rows) for key in (
+            'videos', 'duration', 'missing_video', 'missing_video_duration',
+            'missing_audio', 'missing_audio_duration', 'failed_video', 'failed_audio'
+        )}
+        print(
+            f"{Fore.GREEN}{'TOTAL':<26} {total['videos']:>8} {hours(total['duration']):>9} "
+            f"{total['missing_video']:>6} {hours(total['missing_video_duration']):>7} "
+            f"{total['missing_audio']:>6} {hours(total['missing_audio_duration']):>7} "
+            f"{total['failed_video'] + total['failed_audio']:>7}{Style.RESET_ALL}"
+        )
+
+
+def failures_command(argv):
+    """`failures` subcommand: report recorded failures grouped by cause"""
+    parser = argparse.ArgumentParser(
+        prog='main.py failures',
+        description='Report failed downloads grouped by failure class'
+    )
+    parser.add_argument('channels', nargs='*', help='Channel IDs (default: all channels)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='List every failed video')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    records = DownloadProgress().get_failures(args.channels or None)
+    
+    groups = {}
+    for record in records:
+        record['retry_allowed'], record['retry_reason'] = retry_status(record)
+        groups.setdefault(record.get('class', 'unknown'), []).append(record)
+    
+    if args.json:
+        print(json.dumps(groups, indent=2, ensure_ascii=False))
+        return
+    
+    if not records:
+        print(f"{Fore.GREEN}No recorded failures.{Style.RESET_ALL}")
+        return
+    
+    print(f"{Fore.CYAN}{len(records)} failed downloads{Style.RESET_ALL}\n")
+    for error_class in sorted(groups, key=lambda c: (-len(groups[c]), ERROR_CLASSES.index(c) if c in ERROR_CLASSES else 99)):
+        group = groups[error_class]
+        retryable = sum(1 for record in group if record['retry_allowed'])
+        policy = 'permanent' if is_permanent(error_class) else f"{retryable} retryable now"
+        print(f"{Fore.YELLOW}{error_class:<16}{Style.RESET_ALL} {len(group):>6}  ({policy})")
+        
+        # A few distinct messages give an idea of what went wrong
+        messages = []
+        for record in group:
+            message = (record.get('message') or '').splitlines()[0:1]
+            if message and message[0] not in messages:
+                messages.append(message[0])
+            if len(messages) == 3:
+                break
+        for message in messages:
+            print(f"    {message[:110]}")
+        
+        if args.verbose:
+            for record in group:
+                print(
+                    f"    {record['channel_id']} {record['video_type']:<10} {record['video_id']}  "
+                    f"attempts={record.get('attempts')} last={record.get('last_attempt', '')[:16]}"
+                )
+        print()
+
+
+def channel_id_from_arg(value: str):
+    """Turn a channel ID or URL into a channel ID without network access"""
+    if 'youtube.com' not in value:
+        return value
+    if '/channel/' in value:
+        return value.split('/channel/')[-1].split('/')[0].split('?')[0]
+    return ChannelCache().get(value)
+
+
+def run_dry_run(channels, download_videos: bool, download_audio: bool, audio_formats,
+                filters, retry_failed: bool = False, output_file=None):
+    """--dry-run: list the jobs a download would perform, from local state only"""
+    progress = DownloadProgress()
+    model = ThroughputModel.from_history()
+    plans = []
+    
+    for channel in channels:
+        channel_id = channel_id_from_arg(channel)
+        catalog = load_catalog(channel_id) if channel_id else None
+        if catalog is None:
+            print(f"{Fore.RED}No catalog for {channel}; download it once (or run without --dry-run) "
+                  f"to build one.{Style.RESET_ALL}")
+            continue
+        
+        plan = dry_run(
+            catalog,
+            progress.get_channel_progress(channel_id),
+            model,
+            download_videos=download_videos,
+            download_audio=download_audio,
+            audio_formats=audio_formats,
+            filters=filters,
+            retry_failed=retry_failed,
+        )
+        plan['catalog_size'] = len(catalog)
+        plans.append(plan)
+    
+    if not plans:
+        sys.exit(1)
+    
+    if output_file:
+        written = export_jobs(plans, Path(output_file))
+        print(f"Wrote {written} jobs to {output_file}")
+    else:
+        for plan in plans:
+            for job in download_jobs(plan):
+                print(f"  {job['kind']:<6} {job['video_id']}  {','.join(job['formats']):<10} "
+                      f"~{format_bytes(job['bytes']):>10}  {job['title']}")
+    
+    total_bytes = 0
+    for plan in plans:
+        print(f"\n{Fore.CYAN}Dry run for {plan['channel_id']} "
+              f"({plan['catalog_size']} videos in catalog){Style.RESET_ALL}")
+        for kind, totals in plan['totals'].items():
+            skipped = ', '.join(f"{reason} {count}" for reason, count in sorted(totals['skipped'].items()))
+            print(
+                f"  {kind:<6} {totals['download']:>6} to download  ~{format_bytes(totals['bytes'])} disk  "
+                f"~{format_bytes(totals['download_bytes'])} network  "
+                f"{totals['content_seconds'] / 3600:.1f}h content"
+                + (f"  | skipped: {skipped}" if skipped else '')
+            )
+            total_bytes += totals['bytes']
+    print(f"{Fore.GREEN}Total: ~{format_bytes(total_bytes)} disk{Style.RESET_ALL}")
+
+
+def plan_command(argv):
+    """`plan` subcommand: predict time and disk use from the cached catalog"""
+    parser = argparse.ArgumentParser(
+        prog='main.py plan',
+        description='Predict wall-clock time and disk use for a channel from its cached '
+                    'catalog and download history (no network access)'
+    )
+    parser.add_argument('channels', nargs='+', help='Channel IDs or URLs')
+    parser.add_argument('--no-video', action='store_true', help='Plan audio only')
+    parser.add_argument('--no-audio', action='store_true', help='Plan video only')
+    parser.add_argument('--audio-format', type=audio_formats_arg, default=['wav'], metavar='FORMATS',
+                        help='Audio format(s), comma-separated (default: wav)')
+    parser.add_argument('--concurrent', type=int, default=config.CONCURRENT_DOWNLOADS,
+                        help=f'Number of concurrent downloads (default: {config.CONCURRENT_DOWNLOADS})')
+    parser.add_argument('-o', '--output', action='append', default=None, metavar='DIR',
+                        help=f'Output directory to check free space on; repeat for several (default: {config.DOWNLOADS_DIR})')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    model = ThroughputModel.from_history()
+    progress = DownloadProgress()
+    plans = []
+    
+    for value in args.channels:
+        channel_id = channel_id_from_arg(value)
+        catalog = load_catalog(channel_id) if channel_id else None
+        if catalog is None:
+            print(f"{Fore.YELLOW}No catalog for {value}; download it once to build one.{Style.RESET_ALL}")
+            continue
+        
+        channel_progress = progress.get_channel_progress(channel_id)
+        pending = {}
+        if not args.no_video:
+            mask = ~catalog.completed_mask(channel_progress.get('completed_videos', []))
+            pending['video'] = catalog.durations[mask].tolist()
+        if not args.no_audio:
+            mask = np.zeros(len(catalog), dtype=bool)
+            for fmt in args.audio_format:
+                mask |= ~catalog.completed_mask(channel_progress.get(f'completed_audio_{fmt}', []))
+            pending['audio'] = catalog.durations[mask].tolist()
+        
+        plans.append(plan_channel(model, channel_id, pending, args.audio_format, args.concurrent))
+    
+    if args.json:
+        print(json.dumps(plans, indent=2))
+        return
+    
+    for plan in plans:
+        print(f"{Fore.CYAN}{plan['channel_id']}{Style.RESET_ALL}")
+        for kind, kind_plan in plan['kinds'].items():
+            disk = ', '.join(f"{fmt} {format_bytes(size)}" for fmt, size in kind_plan['disk_bytes'].items())
+            print(
+                f"  {kind:<6} {kind_plan['jobs']:>6} jobs  {kind_plan['content_seconds'] / 3600:>8.1f}h content  "
+                f"~{format_duration(int(kind_plan['seconds']))}  download {format_bytes(kind_plan['download_bytes'])}  "
+                f"disk {disk}"
+            )
+    
+    if plans:
+        seconds = sum(plan['seconds'] for plan in plans)
+        disk_bytes = sum(plan['disk_bytes'] for plan in plans)
+        print(
+            f"\n{Fore.GREEN}Total: ~{format_duration(int(seconds))} wall-clock at "
+            f"{args.concurrent} workers, {format_bytes(disk_bytes)} disk{Style.RESET_ALL}"
+        )
+        output_dirs = [Path(d) for d in args.output] if args.output else [config.DOWNLOADS_DIR]
+        free_bytes = sum(shutil.disk_usage(d).free for d in output_dirs if d.exists())
+        if free_bytes < disk_bytes:
+            print(
+                f"{Fore.RED}Warning: only {format_bytes(free_bytes)} free in "
+                f"{', '.join(str(d) for d in output_dirs)}{Style.RESET_ALL}"
+            )
+
+
+def verify_command(argv):
+    """`verify` subcommand: re-check downloaded files against their manifests"""
+    parser = argparse.ArgumentParser(
+        prog='main.py verify',
+        description='Re-verify downloaded files (ffprobe + SHA-256) in parallel'
+    )
+    parser.add_argument('channels', nargs='*', help='Channel IDs (default: every channel with a manifest)')
+    parser.add_argument('--scan', nargs='+', metavar='DIR',
+                        help='Also check files in these output directories that are not in a manifest yet')
+    parser.add_argument('--workers', type=int, default=config.VERIFY_WORKERS,
+                        help=f'Parallel verifications (default: {config.VERIFY_WORKERS})')
+    parser.add_argument('--no-hash', action='store_true', help='Skip checksums (ffprobe only)')
+    parser.add_argument('--requeue', action='store_true',
+                        help='Delete broken files and mark them as not downloaded so the next run fetches them again')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable JSON')
+    args = parser.parse_args(argv)
+    
+    from verify import Manifest, scan_archive, verify_records
+    
+    channel_ids = args.channels
+    if not channel_ids and config.MANIFEST_DIR.exists():
+        channel_ids = sorted(path.stem for path in config.MANIFEST_DIR.glob('*.jsonl'))
+    manifests = {channel_id: Manifest(channel_id) for channel_id in channel_ids}
+    records = [record for manifest in manifests.values() for record in manifest.records()]
+    
+    if args.scan:
+        def titles(channel_id):
+            catalog = load_catalog(channel_id)
+            if catalog is None:
+                return {}
+            return {
+                video['title']: (video['id'], video['duration'])
+                for video in catalog.entries()
+            }
+        known = {record['path'] for record in records}
+        for record in scan_archive([Path(d) for d in args.scan], args.channels or None, titles):
+            if record['path'] not in known:
+                records.append(record)
+                manifests.setdefault(record['channel_id'], Manifest(record['channel_id']))
+    
+    print(f"{Fore.CYAN}Verifying {len(records)} files with {args.workers} workers...{Style.RESET_ALL}")
+    results = verify_records(records, workers=args.workers, compute_hash=not args.no_hash)
+    
+    progress = DownloadProgress() if args.requeue else None
+    for result in results:
+        manifest = manifests.get(result.get('channel_id'))
+        if manifest:
+            manifest.entries[result['path']] = result
+        if progress and not result['ok'] and result.get('video_id'):
+            Path(result['path']).unlink(missing_ok=True)
+            progress.unmark_completed(result['channel_id'], result['video_id'], result['kind'])
+    for manifest in manifests.values():
+        manifest.compact()
+    
+    failed = [result for result in results if not result['ok']]
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    
+    for result in failed:
+        print(f"{Fore.RED}✗ {result['path']}: {result['error']}{Style.RESET_ALL}")
+    print(
+        f"\n{Fore.GREEN}{len(results) - len(failed)} ok{Style.RESET_ALL}, "
+        f"{Fore.RED if failed else Fore.GREEN}{len(failed)} failed{Style.RESET_ALL}"
+    )
+    if failed and args.requeue:
+        print(f"{Fore.CYAN}Broken files will be downloaded again on the next run.{Style.RESET_ALL}")
+
+
+def control_command(argv):
+    """`control` subcommand: change the settings of a running download"""
+    parser = argparse.ArgumentParser(
+        prog='main.py control',
+        description=f'Change settings of a running download via its control file ({config.CONTROL_FILE}). '
+                    f'The run picks changes up within {config.CONTROL_POLL_INTERVAL:g}s, or at once on SIGHUP; '
+                    f'they apply from the next job on.'
+    )
+    admission = parser.add_mutually_exclusive_group()
+    admission.add_argument('--pause', action='store_true', help='Stop admitting new jobs (running ones finish)')
+    admission.add_argument('--resume', action='store_true', help='Admit jobs again')
+    parser.add_argument('--concurrent', type=int, metavar='N',
+                        help=f'Concurrent downloads (at most {config.MAX_CONCURRENT_DOWNLOADS})')
+    parser.add_argument('--rate-limit', type=float, metavar='KBPS', help='Per-download speed limit in KB/s')
+    parser.add_argument('--no-rate-limit', action='store_true', help='Remove the speed limit')
+    parser.add_argument('--retry-delay', type=float, metavar='SECONDS', help='Base delay between retries')
+    parser.add_argument('--video-format', help='yt-dlp format selector for videos')
+    parser.add_argument('--audio-format', help='yt-dlp format selector for audio sources')
+    args = parser.parse_args(argv)
+    
+    updates = {}
+    if args.pause or args.resume:
+        updates['paused'] = args.pause
+    if args.concurrent is not None:
+        updates['concurrent_downloads'] = args.concurrent
+    if args.rate_limit is not None or args.no_rate_limit:
+        updates['rate_limit'] = None if args.no_rate_limit else args.rate_limit
+    if args.retry_delay is not None:
+        updates['retry_delay'] = args.retry_delay
+    if args.video_format:
+        updates['video_format'] = args.video_format
+    if args.audio_format:
+        updates['audio_format'] = args.audio_format
+    
+    try:
+        settings = write_control(updates) if updates else read_control()
+    except ValueError as e:
+        print(f"{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    if not settings:
+        print(f"{Fore.YELLOW}No runtime settings in {config.CONTROL_FILE}.{Style.RESET_ALL}")
+        return
+    print(f"{Fore.CYAN}Runtime settings ({config.CONTROL_FILE}):{Style.RESET_ALL}")
+    for key, value in settings.items():
+        print(f"  {key:<22} {json.dumps(value)}")
+
+
+def server_command(argv):
+    """`server` subcommand: take download jobs over a local HTTP/JSON API"""
+    from renderer import PROGRESS_MODES
+    from workers import EXECUTORS
+    
+    parser = argparse.ArgumentParser(
+        prog='main.py server',
+        description='Run one long-lived downloader that takes channel jobs over a local HTTP/JSON API '
+                    '(see server.py for the endpoints). Jobs share the worker pool and run one after another.'
+    )
+    parser.add_argument('--host', default=config.SERVER_HOST,
+                        help=f'Address to listen on (default: {config.SERVER_HOST}; the API has no authentication)')
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT,
+                        help=f'Port to listen on (default: {config.SERVER_PORT})')
+    parser.add_argument('-o', '--output', action='append', default=None, metavar='DIR',
+                        help=f'Default output directory of jobs; repeat for several (default: {config.DOWNLOADS_DIR})')
+    parser.add_argument('--volume-policy', choices=VOLUME_POLICIES, default=config.VOLUME_POLICY,
+                        help=f'Default job placement across output directories (default: {config.VOLUME_POLICY})')
+    parser.add_argument('--concurrent', type=int, default=config.CONCURRENT_DOWNLOADS,
+                        help=f'Number of concurrent downloads (default: {config.CONCURRENT_DOWNLOADS})')
+    parser.add_argument('--executor', choices=EXECUTORS, default=config.EXECUTOR,
+                        help=f'Run download attempts on threads or in a process pool (default: {config.EXECUTOR})')
+    parser.add_argument('--egress', type=egress_arg, action='append', metavar='SPEC',
+                        help='Spread downloads over proxies / source addresses, as for a download run')
+    parser.add_argument('--staging-dir', default=config.STAGING_DIR, metavar='DIR',
+                        help='Fast scratch directory for partial files and merges')
+    parser.add_argument('--staging-max', type=int, default=config.STAGING_MAX_MB, metavar='MB',
+                        help='Size cap of the staging directory')
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='plain',
+                        help='Progress display in the server log (default: plain)')
+    args = parser.parse_args(argv)
+    
+    from downloader import YouTubeChannelDownloader
+    from server import JobServer
+    
+    config.CONCURRENT_DOWNLOADS = args.concurrent
+    config.PROGRESS_DISPLAY = args.progress
+    config.STAGING_DIR = args.staging_dir
+    config.STAGING_MAX_MB = args.staging_max
+    
+    downloader = YouTubeChannelDownloader(executor=args.executor, egresses=args.egress)
+    try:
+        server = JobServer(downloader, args.host, args.port, output_dir=args.output,
+                           volume_policy=args.volume_policy, logger=downloader.logger)
+    except OSError as e:
+        print(f"{Fore.RED}Error: cannot listen on {args.host}:{args.port}: {e}{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    print(f"{Fore.CYAN}Job server on {server.address} (SIGTERM, Ctrl-C or POST /shutdown to stop){Style.RESET_ALL}")
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    print(f"\n{Fore.YELLOW}Server stopped.{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}Progress has been saved; resubmit unfinished jobs to resume them.{Style.RESET_ALL}")
+
+
+# Subcommands that run instead of a download: python main.py <command> ...
+COMMANDS = {
+    'stats': stats_command,
+    'failures': failures_command,
+    'plan': plan_command,
+    'verify': verify_command,
+    'control': control_command,
+    'server': server_command,
+}
+
+
 def main():
     """Main entry point"""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+    
+    from downloader import YouTubeChannelDownloader
+    from renderer import PROGRESS_MODES
+    from sidecar import SIDE_KINDS
+    from workers import EXECUTORS
+    
     print_banner()
     
     parser = argparse.ArgumentParser(
@@ -57,25 +559,150 @@ Examples:
   # Download only audio (WAV format)
   python main.py https://www.youtube.com/@channelname --no-video
   
+  # Audio in several formats from a single download (e.g. WAV + MP3)
+  python main.py https://www.youtube.com/@channelname --no-video --audio-format wav,mp3
+  
   # Specify custom output directory
   python main.py https://www.youtube.com/@channelname -o /path/to/output
   
+  # Stripe downloads across several disks
+  python main.py https://www.youtube.com/@channelname -o /mnt/disk1 -o /mnt/disk2 --volume-policy free-space
+  
   # Resume interrupted download
   python main.py https://www.youtube.com/@channelname --resume
+  
+  # Uploads, shorts and past live streams in one catalog
+  python main.py https://www.youtube.com/@channelname --tabs videos,shorts,streams
+  
+  # Many workers on a many-core machine: extraction in a process pool
+  python main.py https://www.youtube.com/@channelname --concurrent 16 --executor process
+  
+  # Partial files and merges on a local SSD, only finished videos written to the NAS
+  python main.py https://www.youtube.com/@channelname -o /mnt/nas --staging-dir /mnt/nvme/staging --staging-max 20480
+  
+  # Two proxies and a second local address, at most 2 downloads each
+  python main.py https://www.youtube.com/@channelname --concurrent 6 \\
+      --egress socks5://10.0.0.2:1080,jobs=2 --egress http://10.0.0.3:3128,jobs=2 --egress bind:192.0.2.10,jobs=2
+  
+  # Audio only, piped into ffmpeg without a source file on disk
+  python main.py https://www.youtube.com/@channelname --no-video --stream-audio
+  
+  # Subtitles and thumbnails alongside the videos, or only them for the whole archive
+  python main.py https://www.youtube.com/@channelname --side-artifacts subtitles,thumbnail
+  python main.py --channel-list channels.txt --metadata-only
+  
+  # Cron job: a progress summary line every 30s instead of live bars
+  python main.py --channel-list channels.txt --progress plain
+  
+  # Structured log for a log shipper
+  python main.py https://www.youtube.com/@channelname --log-json logs/downloader.jsonl
+  
+  # Long archive run with a memory report and a 2 GB soft budget
+  python main.py --channel-list channels.txt --memory-report --memory-budget 2048
+  
+  # Many channels: enumerated in parallel, each downloaded as soon as it is resolved
+  python main.py --channel-list channels.txt --no-video
+  
+  # Stay running and download new uploads as they appear (stop with Ctrl-C / SIGTERM)
+  python main.py --channel-list channels.txt --watch
+  
+  # Only uploads from 2023, at most one hour long
+  python main.py https://www.youtube.com/@channelname --after 20230101 --before 20231231 --max-duration 3600
+  
+  # Show what a run would download, with skip reasons and sizes (no network)
+  python main.py https://www.youtube.com/@channelname --dry-run --dry-run-output jobs.jsonl
+  
+  # Archive statistics from cached catalogs (no network)
+  python main.py stats [channel_id ...]
+  
+  # Predict time and disk use before downloading
+  python main.py plan <channel_id or url> --audio-format wav,mp3
+  
+  # Re-verify an existing archive (ffprobe + SHA-256)
+  python main.py verify --scan downloads --requeue
+  
+  # Failed downloads grouped by cause
+  python main.py failures [channel_id ...]
+  
+  # Tune a running download: fewer workers and a speed cap, or pause admission
+  python main.py control --concurrent 2 --rate-limit 1024
+  python main.py control --pause
+  
+  # Local job server for an orchestrator: submit channels, follow progress, fetch run stats
+  python main.py server --port 8750 --concurrent 6
+  curl -X POST localhost:8750/jobs -d '{"channels": ["https://www.youtube.com/@channelname"], "options": {"videos": false}}'
+  curl 'localhost:8750/jobs/<id>/events?follow=1'
         """
     )
     
     parser.add_argument(
-        'channel_url',
-        nargs='?',
-        help='YouTube channel URL'
+        'channel_urls',
+        nargs='*',
+        metavar='channel_url',
+        help='YouTube channel URL(s)'
+    )
+    
+    parser.add_argument(
+        '--channel-list',
+        metavar='FILE',
+        help='File with one channel URL per line (# starts a comment); channels are '
+             'enumerated in parallel and downloaded as each one is resolved'
     )
     
     parser.add_argument(
         '-o', '--output',
         type=str,
+        action='append',
         default=None,
-        help=f'Output directory (default: {config.DOWNLOADS_DIR})'
+        metavar='DIR',
+        help=f'Output directory; repeat to stripe downloads across several disks (default: {config.DOWNLOADS_DIR})'
+    )
+    
+    parser.add_argument(
+        '--volume-policy',
+        choices=VOLUME_POLICIES,
+        default=config.VOLUME_POLICY,
+        help=f'How jobs are placed when several output directories are given (default: {config.VOLUME_POLICY})'
+    )
+    
+    parser.add_argument(
+        '--volume-max-writes',
+        type=int,
+        default=config.VOLUME_MAX_WRITES,
+        help='Concurrent jobs writing to one output directory (default: no cap)'
+    )
+    
+    parser.add_argument(
+        '--staging-dir',
+        default=config.STAGING_DIR,
+        metavar='DIR',
+        help='Fast scratch directory for partial files and merges; finished files are moved to the output'
+    )
+    
+    parser.add_argument(
+        '--staging-max',
+        type=int,
+        default=config.STAGING_MAX_MB,
+        metavar='MB',
+        help='Size cap of the staging directory; fewer jobs start while it is reached'
+    )
+    
+    parser.add_argument(
+        '--egress',
+        type=egress_arg,
+        action='append',
+        metavar='SPEC',
+        help='Spread downloads over proxies / source addresses; repeat for each one '
+             '(http://host:port, socks5://host:port or bind:ADDRESS, optionally ,jobs=N,rate=KBPS)'
+    )
+    
+    parser.add_argument(
+        '--tabs',
+        type=tabs_arg,
+        default=config.CHANNEL_TABS,
+        metavar='TABS',
+        help=f'Channel tabs to enumerate concurrently and merge, comma-separated '
+             f'({", ".join(SUPPORTED_CHANNEL_TABS)}; default: the URL as given)'
     )
     
     parser.add_argument(
@@ -90,6 +717,28 @@ Examples:
         help='Skip audio downloads (video only)'
     )
     
+    parser.add_argument(
+        '--side-artifacts',
+        type=side_kinds_arg,
+        default=None,
+        metavar='KINDS',
+        help=f'Also fetch small side artifacts in their own lane, comma-separated '
+             f'({", ".join(SIDE_KINDS)}; default: DOWNLOAD_SUBTITLES etc. in config)'
+    )
+    
+    parser.add_argument(
+        '--metadata-only',
+        action='store_true',
+        help='Fetch only side artifacts (all kinds unless --side-artifacts is given), no video or audio'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running: poll each channel\'s newest uploads on an adaptive interval and '
+             'download new videos until stopped'
+    )
+    
     parser.add_argument(
         '--resume',
         action='store_true',
@@ -103,6 +752,92 @@ Examples:
         help=f'Number of concurrent downloads (default: {config.CONCURRENT_DOWNLOADS})'
     )
     
+    parser.add_argument(
+        '--executor',
+        choices=EXECUTORS,
+        default=config.EXECUTOR,
+        help=f'Run download attempts on threads or in a process pool (default: {config.EXECUTOR})'
+    )
+    
+    parser.add_argument(
+        '--progress',
+        choices=PROGRESS_MODES,
+        default=config.PROGRESS_DISPLAY,
+        help=f'Live progress display: bars, periodic plain summaries, or yt-dlp output (off); '
+             f'auto picks bars on a terminal (default: {config.PROGRESS_DISPLAY})'
+    )
+    
+    parser.add_argument(
+        '--log-json',
+        type=Path,
+        default=config.LOG_JSON_FILE,
+        metavar='FILE',
+        help='Also write the log as JSON lines with structured fields (channel_id, video_id, ...)'
+    )
+    
+    parser.add_argument(
+        '--memory-report',
+        action='store_true',
+        default=config.MEMORY_REPORT,
+        help='Log tracemalloc snapshots by subsystem and peak memory per stage (slower)'
+    )
+    
+    parser.add_argument(
+        '--memory-budget',
+        type=int,
+        default=config.MEMORY_BUDGET_MB,
+        metavar='MB',
+        help='Soft memory limit: fewer downloads run at once while RSS is above it'
+    )
+    
+    parser.add_argument(
+        '--retry-failed',
+        action='store_true',
+        help='Retry earlier failures regardless of their retry policy'
+    )
+    
+    parser.add_argument(
+        '--after',
+        default=config.DATE_AFTER,
+        metavar='YYYYMMDD',
+        help='Only videos uploaded on/after this date'
+    )
+    
+    parser.add_argument(
+        '--before',
+        default=config.DATE_BEFORE,
+        metavar='YYYYMMDD',
+        help='Only videos uploaded on/before this date'
+    )
+    
+    parser.add_argument(
+        '--min-duration',
+        type=int,
+        default=config.MIN_DURATION,
+        metavar='SECONDS',
+        help='Skip videos shorter than this'
+    )
+    
+    parser.add_argument(
+        '--max-duration',
+        type=int,
+        default=config.MAX_DURATION,
+        metavar='SECONDS',
+        help='Skip videos longer than this'
+    )
+    
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='List the jobs that would run, with skip reasons and size estimates (no network access)'
+    )
+    
+    parser.add_argument(
+        '--dry-run-output',
+        metavar='FILE',
+        help='With --dry-run, write every job as JSON lines to FILE instead of printing the list'
+    )
+    
     parser.add_argument(
         '--interactive',
         action='store_true',
@@ -111,16 +846,29 @@ Examples:
     
     parser.add_argument(
         '--audio-format',
-        type=str,
-        default='wav',
-        choices=['wav', 'mp3', 'm4a', 'flac', 'opus'],
-        help='Audio format for conversion (default: wav)'
+        type=audio_formats_arg,
+        default=['wav'],
+        metavar='FORMATS',
+        help=f'Audio format(s) for conversion, comma-separated '
+             f'({", ".join(SUPPORTED_AUDIO_FORMATS)}; default: wav)'
+    )
+    
+    parser.add_argument(
+        '--stream-audio',
+        action='store_true',
+        default=config.AUDIO_STREAMING,
+        help='Pipe audio downloads straight into ffmpeg so only the final files are written '
+             '(falls back to a source file when a format cannot be streamed)'
     )
     
     args = parser.parse_args()
     
+    channel_urls = list(args.channel_urls)
+    if args.channel_list:
+        channel_urls += read_channel_list(args.channel_list)
+    
     # Interactive mode
-    if args.interactive or not args.channel_url:
+    if args.interactive or not channel_urls:
         print(f"{Fore.YELLOW}Running in interactive mode...{Style.RESET_ALL}\n")
         
         while True:
@@ -145,7 +893,7 @@ Examples:
             download_audio = choice in ['1', '3']
             
             # Ask for audio format if downloading audio
-            audio_format = 'wav'
+            audio_formats = ['wav']
             if download_audio:
                 print(f"\n{Fore.YELLOW}Audio format options:{Style.RESET_ALL}")
                 print("1. WAV (High quality, large file size)")
@@ -154,7 +902,7 @@ Examples:
                 print("4. FLAC (Lossless, very large)")
                 print("5. OPUS (Modern codec, efficient)")
                 
-                format_choice = input(f"\n{Fore.GREEN}Select audio format (1-5, default: 1): {Style.RESET_ALL}").strip() or "1"
+                format_choice = input(f"\n{Fore.GREEN}Select audio format(s) (1-5, comma-separated, default: 1): {Style.RESET_ALL}").strip() or "1"
                 
                 format_map = {
                     '1': 'wav',
@@ -163,7 +911,12 @@ Examples:
                     '4': 'flac',
                     '5': 'opus'
                 }
-                audio_format = format_map.get(format_choice, 'wav')
+                audio_formats = []
+                for choice_key in format_choice.split(','):
+                    fmt = format_map.get(choice_key.strip())
+                    if fmt and fmt not in audio_formats:
+                        audio_formats.append(fmt)
+                audio_formats = audio_formats or ['wav']
             
             output_dir = input(f"{Fore.GREEN}Output directory (press Enter for default): {Style.RESET_ALL}").strip()
             if not output_dir:
@@ -175,7 +928,7 @@ Examples:
             print(f"  Download Videos: {download_videos}")
             print(f"  Download Audio: {download_audio}")
             if download_audio:
-                print(f"  Audio Format: {audio_format.upper()}")
+                print(f"  Audio Format: {', '.join(fmt.upper() for fmt in audio_formats)}")
             print(f"  Output Directory: {output_dir or config.DOWNLOADS_DIR}")
             print(f"  Concurrent Downloads: {config.CONCURRENT_DOWNLOADS}")
             
@@ -186,10 +939,13 @@ Examples:
                     downloader = YouTubeChannelDownloader(
                         download_videos=download_videos,
                         download_audio=download_audio,
-                        audio_format=audio_format
+                        audio_format=audio_formats
                     )
                     downloader.download_channel(channel_url, output_dir)
                     
+                    if downloader.stopped_early:
+                        print(f"\n{Fore.YELLOW}Download stopped by shutdown request.{Style.RESET_ALL}")
+                        break
                     print(f"\n{Fore.GREEN}✓ Download completed successfully!{Style.RESET_ALL}")
                     
                 except Exception as e:
@@ -202,31 +958,60 @@ Examples:
     
     else:
         # Command-line mode
-        channel_url = args.channel_url
+        filters = {
+            'date_after': args.after,
+            'date_before': args.before,
+            'min_duration': args.min_duration,
+            'max_duration': args.max_duration,
+        }
+        
+        if args.dry_run:
+            run_dry_run(channel_urls, not args.no_video, not args.no_audio, args.audio_format,
+                        filters, args.retry_failed, args.dry_run_output)
+            return
         
-        if not validate_url(channel_url):
-            print(f"{Fore.RED}Error: Invalid YouTube channel URL{Style.RESET_ALL}")
+        invalid = [url for url in channel_urls if not validate_url(url)]
+        if invalid:
+            print(f"{Fore.RED}Error: Invalid YouTube channel URL: {', '.join(invalid)}{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}URL must contain one of: /channel/, /@, /c/, /user/{Style.RESET_ALL}")
             sys.exit(1)
         
-        download_videos = not args.no_video
-        download_audio = not args.no_audio
+        download_videos = not args.no_video and not args.metadata_only
+        download_audio = not args.no_audio and not args.metadata_only
+        side_artifacts = args.side_artifacts
+        if args.metadata_only and not side_artifacts:
+            side_artifacts = list(SIDE_KINDS)
         
-        if not download_videos and not download_audio:
+        if not download_videos and not download_audio and not args.metadata_only:
             print(f"{Fore.RED}Error: Cannot skip both video and audio downloads{Style.RESET_ALL}")
             sys.exit(1)
         
         # Update concurrent downloads if specified
         if args.concurrent != config.CONCURRENT_DOWNLOADS:
             config.CONCURRENT_DOWNLOADS = args.concurrent
+        config.VOLUME_MAX_WRITES = args.volume_max_writes
+        config.MEMORY_REPORT = args.memory_report
+        config.MEMORY_BUDGET_MB = args.memory_budget
+        config.PROGRESS_DISPLAY = args.progress
+        config.LOG_JSON_FILE = args.log_json
+        config.AUDIO_STREAMING = args.stream_audio
+        config.STAGING_DIR = args.staging_dir
+        config.STAGING_MAX_MB = args.staging_max
         
-        print(f"{Fore.CYAN}Starting download...{Style.RESET_ALL}")
-        print(f"  Channel URL: {channel_url}")
+        print(f"{Fore.CYAN}{'Starting watch' if args.watch else 'Starting download'}...{Style.RESET_ALL}")
+        if len(channel_urls) == 1:
+            print(f"  Channel URL: {channel_urls[0]}")
+        else:
+            print(f"  Channels: {len(channel_urls)} ({config.ENUMERATION_WORKERS} enumerated at a time)")
         print(f"  Download Videos: {download_videos}")
         print(f"  Download Audio: {download_audio}")
         if download_audio:
-            print(f"  Audio Format: {args.audio_format.upper()}")
-        print(f"  Output Directory: {args.output or config.DOWNLOADS_DIR}")
+            print(f"  Audio Format: {', '.join(fmt.upper() for fmt in args.audio_format)}")
+        if side_artifacts:
+            print(f"  Side Artifacts: {', '.join(side_artifacts)}")
+        print(f"  Output Directory: {', '.join(args.output) if args.output else config.DOWNLOADS_DIR}")
+        if args.staging_dir:
+            print(f"  Staging Directory: {args.staging_dir}")
         print(f"  Resume Enabled: Yes (automatic)")
         print()
         
@@ -234,11 +1019,29 @@ Examples:
             downloader = YouTubeChannelDownloader(
                 download_videos=download_videos,
                 download_audio=download_audio,
-                audio_format=args.audio_format
+                audio_format=args.audio_format,
+                retry_failed=args.retry_failed,
+                filters=filters,
+                tabs=args.tabs,
+                executor=args.executor,
+                egresses=args.egress,
+                side_artifacts=side_artifacts
             )
-            downloader.download_channel(channel_url, args.output)
+            if args.watch:
+                downloader.watch_channels(channel_urls, args.output, volume_policy=args.volume_policy)
+            elif len(channel_urls) == 1:
+                downloader.download_channel(channel_urls[0], args.output, volume_policy=args.volume_policy)
+            else:
+                downloader.download_channels(channel_urls, args.output, volume_policy=args.volume_policy)
             
-            print(f"\n{Fore.GREEN}✓ Download completed successfully!{Style.RESET_ALL}")
+            if args.watch:
+                print(f"\n{Fore.YELLOW}Watch stopped.{Style.RESET_ALL}")
+                print(f"{Fore.CYAN}Poll intervals have been saved. Run the same command to continue.{Style.RESET_ALL}")
+            elif downloader.stopped_early:
+                print(f"\n{Fore.YELLOW}Download stopped by shutdown request.{Style.RESET_ALL}")
+                print(f"{Fore.CYAN}Progress has been saved. Run the same command to resume.{Style.RESET_ALL}")
+            else:
+                print(f"\n{Fore.GREEN}✓ Download completed successfully!{Style.RESET_ALL}")
             
         except KeyboardInterrupt:
             print(f"\n\n{Fore.YELLOW}Download interrupted by user.{Style.RESET_ALL}")
@@ -0,0 +1,236 @@
+"""
+Memory Instrumentation and Budget
+
+A background sampler that tracks resident memory (RSS) during a run:
+
+    - peak RSS per stage (enumeration, catalog, video / audio downloads,
+      verification), printed in the run summary
+    - with --memory-report, periodic tracemalloc snapshots grouped by
+      subsystem (yt-dlp, numpy, json, and this project's modules)
+    - an optional soft budget (--memory-budget): while RSS is above it the
+      scheduler admits fewer jobs at once, and it admits more again once
+      memory has come down
+
+RSS of --executor process workers is counted with the parent.
+"""
+import gc
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import config
+
+
+PROJECT_DIR = Path(__file__).resolve().parent
+
+# (path fragment, subsystem) checked in order against allocation tracebacks
+LIBRARY_SUBSYSTEMS = [
+    (f'{os.sep}yt_dlp{os.sep}', 'yt-dlp'),
+    (f'{os.sep}numpy{os.sep}', 'numpy'),
+    (f'{os.sep}json{os.sep}', 'json'),
+]
+
+
+def _proc_rss(pid) -> Optional[int]:
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _windows_rss() -> Optional[int]:
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ('cb', wintypes.DWORD),
+            ('PageFaultCount', wintypes.DWORD),
+            ('PeakWorkingSetSize', ctypes.c_size_t),
+            ('WorkingSetSize', ctypes.c_size_t),
+            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+            ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+            ('PagefileUsage', ctypes.c_size_t),
+            ('PeakPagefileUsage', ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return counters.WorkingSetSize
+
+
+def rss_bytes(include_children: bool = True) -> Optional[int]:
+    """
+    Current resident memory of this process
+
+    Args:
+        include_children: Add worker processes (Linux only)
+
+    Returns:
+        Bytes, or None if it cannot be measured on this platform
+    """
+    if sys.platform.startswith('linux'):
+        rss = _proc_rss('self')
+        if rss is not None and include_children:
+            rss += sum(_proc_rss(child.pid) or 0 for child in multiprocessing.active_children())
+        return rss
+    if sys.platform == 'win32':
+        try:
+            return _windows_rss()
+        except Exception:
+            return None
+    try:
+        # macOS and other Unixes only expose the peak (bytes on macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+
+def subsystem_of(traceback) -> str:
+    """Attribute an allocation traceback to a library or project module"""
+    filenames = [frame.filename for frame in traceback]
+    for fragment, name in LIBRARY_SUBSYSTEMS:
+        if any(fragment in filename for filename in filenames):
+            return name
+    # Innermost frame that belongs to this project
+    for filename in reversed(filenames):
+        path = Path(filename)
+        if path.parent == PROJECT_DIR:
+            return path.stem
+    return 'other'
+
+
+def snapshot_by_subsystem(limit: int = 8) -> List[Tuple[str, int]]:
+    """Traced memory grouped by subsystem, largest first"""
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ])
+    totals: Dict[str, int] = {}
+    for stat in snapshot.statistics('traceback'):
+        name = subsystem_of(stat.traceback)
+        totals[name] = totals.get(name, 0) + stat.size
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class MemoryMonitor:
+    """Samples RSS per stage, optionally traces allocations and enforces a soft budget"""
+
+    def __init__(self, budget_bytes: Optional[int] = None, report: bool = False,
+                 logger: Optional[logging.Logger] = None):
+        self.budget = budget_bytes
+        self.report = report
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        self.lock = threading.Lock()
+        self.current_stage = 'startup'
+        self.stage_peaks: Dict[str, int] = {}
+        self.subsystems: List[Tuple[str, int]] = []
+        self.allowed: Optional[int] = None  # admission cap while over budget
+        self.throttled_samples = 0
+        self._stop = threading.Event()
+        self._last_report = 0.0
+
+        if self.budget and rss_bytes() is None:
+            self.logger.warning("Cannot measure memory on this platform; the memory budget is ignored")
+            self.budget = None
+        if self.report:
+            tracemalloc.start(config.MEMORY_TRACE_FRAMES)
+
+        self.thread = threading.Thread(target=self._run, name='memory-monitor', daemon=True)
+        self.thread.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Attribute samples taken inside the block to a stage"""
+        with self.lock:
+            previous, self.current_stage = self.current_stage, name
+        self.sample()
+        try:
+            yield
+        finally:
+            self.sample()
+            with self.lock:
+                self.current_stage = previous
+
+    def sample(self):
+        """Record one RSS sample and update the admission cap"""
+        rss = rss_bytes()
+        if rss is None:
+            return
+        with self.lock:
+            stage = self.current_stage
+            self.stage_peaks[stage] = max(self.stage_peaks.get(stage, 0), rss)
+            if not self.budget:
+                return
+
+            if rss > self.budget:
+                self.throttled_samples += 1
+                if self.allowed is None:
+                    self.allowed = config.CONCURRENT_DOWNLOADS
+                if self.allowed > 1:
+                    self.allowed = max(1, self.allowed // 2)
+                    self.logger.warning(
+                        f"Memory {rss / 2**20:.0f} MB over budget {self.budget / 2**20:.0f} MB: "
+                        f"admitting at most {self.allowed} jobs at once"
+                    )
+                gc.collect()
+            elif self.allowed is not None and rss < self.budget * config.MEMORY_RECOVER_RATIO:
+                self.allowed += 1
+                if self.allowed >= config.CONCURRENT_DOWNLOADS:
+                    self.allowed = None
+                    self.logger.info("Memory back under budget: full concurrency restored")
+
+    def limit(self, normal: int) -> int:
+        """Number of jobs the scheduler may run at once"""
+        with self.lock:
+            return normal if self.allowed is None else max(1, min(normal, self.allowed))
+
+    def _run(self):
+        while not self._stop.wait(config.MEMORY_SAMPLE_INTERVAL):
+            self.sample()
+            if self.report and time.monotonic() - self._last_report >= config.MEMORY_REPORT_INTERVAL:
+                self._last_report = time.monotonic()
+                self._log_subsystems()
+
+    def _log_subsystems(self):
+        subsystems = snapshot_by_subsystem()
+        with self.lock:
+            self.subsystems = subsystems
+        self.logger.info(
+            "Traced memory by subsystem: "
+            + ', '.join(f"{name} {size / 2**20:.1f} MB" for name, size in subsystems)
+        )
+
+    def stop(self):
+        """Stop sampling; takes a last snapshot in report mode"""
+        self._stop.set()
+        self.thread.join(timeout=5)
+        self.sample()
+        if self.report:
+            self._log_subsystems()
+
+    def summary(self) -> Dict:
+        with self.lock:
+            summary = {
+                'stage_peaks': dict(self.stage_peaks),
+                'subsystems': list(self.subsystems),
+                'throttled_samples': self.throttled_samples,
+            }
+        if self.report and tracemalloc.is_tracing():
+            summary['traced_peak'] = tracemalloc.get_traced_memory()[1]
+        return summary
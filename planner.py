@@ -0,0 +1,212 @@
+"""
+Offline Dry-Run Planner
+
+Works out exactly which jobs a download run would perform, using only local
+state: the cached channel catalog, the progress store, failure retry
+policies and the throughput model. Nothing touches the network or the output
+directories. Filters and completion checks run as vectorized catalog masks,
+and the plan keeps its per-kind results as columns: job dicts are only built
+for the rows that are listed, and the JSON-lines export is written straight
+from the columns, so a 50k-video channel is planned in well under a second.
+"""
+import json
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+import config
+from catalog import ChannelCatalog
+from failures import retry_status
+from history import ThroughputModel
+
+
+def _blocked_rows(catalog: ChannelCatalog, channel_progress: Dict, kind: str) -> Dict[int, str]:
+    """Rows whose earlier failure is not retryable yet, with the reason"""
+    blocked = {}
+    prefix = f"{kind}:"
+    for key, record in channel_progress.get('failures', {}).items():
+        if key.startswith(prefix):
+            allowed, reason = retry_status(record)
+            if not allowed:
+                blocked[key[len(prefix):]] = reason
+    if not blocked:
+        return {}
+
+    rows = np.flatnonzero(catalog.completed_mask(list(blocked)))
+    return {int(row): blocked[catalog.ids[row].decode('ascii')] for row in rows}
+
+
+def dry_run(catalog: ChannelCatalog, channel_progress: Dict, model: ThroughputModel,
+            download_videos: bool = True, download_audio: bool = True,
+            audio_formats: Optional[List[str]] = None, filters: Optional[Dict] = None,
+            retry_failed: bool = False) -> Dict:
+    """
+    Plan the jobs a download run would perform for one channel
+
+    Args:
+        catalog: Loaded channel catalog
+        channel_progress: The channel's entry from the progress store
+        model: Throughput model for byte estimates
+        download_videos: Plan video jobs
+        download_audio: Plan audio jobs
+        audio_formats: Requested audio formats
+        filters: catalog.select() filters (date_after, min_duration, ...)
+        retry_failed: Ignore failure retry policies
+
+    Returns:
+        Dict with 'totals' per kind and the per-kind job columns ('kinds':
+        pending part bits, bytes and skip reasons per catalog row) that
+        iter_jobs() and export_jobs() read
+    """
+    audio_formats = audio_formats or ['wav']
+    channel_id = catalog.channel_id
+    keep = catalog.select(**{k: v for k, v in (filters or {}).items() if v is not None})
+
+    durations = np.asarray(catalog.durations)
+    known = durations[durations > 0]
+    fallback = float(known.mean()) if known.size else float(config.DEFAULT_VIDEO_DURATION)
+    effective = np.where(durations > 0, durations, fallback).astype(np.float64)
+
+    # kind -> [(progress kind, format, output profile)]
+    kinds = {}
+    if download_videos:
+        kinds['video'] = [('video', 'mp4', 'output:mp4')]
+    if download_audio:
+        kinds['audio'] = [(f'audio_{fmt}', fmt, f'output:{fmt}') for fmt in audio_formats]
+
+    columns = {}
+    totals = {}
+    for kind, parts in kinds.items():
+        # Bit i of `pending` set: part i still has to be produced for that row
+        pending = np.zeros(len(catalog), dtype=np.int64)
+        disk_rate = np.zeros(len(catalog), dtype=np.float64)
+        reasons: Dict[int, str] = {}
+        for bit, (progress_kind, _, profile) in enumerate(parts):
+            completed_key = 'completed_videos' if progress_kind == 'video' else f'completed_{progress_kind}'
+            todo = keep & ~catalog.completed_mask(channel_progress.get(completed_key, []))
+            if not retry_failed:
+                for row, reason in _blocked_rows(catalog, channel_progress, progress_kind).items():
+                    if todo[row]:
+                        todo[row] = False
+                        reasons.setdefault(row, reason)
+            pending |= todo.astype(np.int64) << bit
+            disk_rate += todo * model.bytes_per_second(profile, channel_id)
+
+        downloading = pending != 0
+        job_bytes = (disk_rate * effective).astype(np.int64)
+        download_bytes = (downloading * effective
+                          * model.bytes_per_second(f"download:{kind}", channel_id)).astype(np.int64)
+
+        skipped = {}
+        filtered = int(np.count_nonzero(~keep))
+        if filtered:
+            skipped['filtered'] = filtered
+        for row, reason in reasons.items():
+            if not downloading[row]:
+                # Collapse "cool-down until <time>" into one bucket for the totals
+                bucket = reason.split(' until ')[0]
+                skipped[bucket] = skipped.get(bucket, 0) + 1
+        completed = int(np.count_nonzero(keep & ~downloading)) - sum(
+            count for bucket, count in skipped.items() if bucket != 'filtered'
+        )
+        if completed:
+            skipped['completed'] = completed
+
+        totals[kind] = {
+            'download': int(np.count_nonzero(downloading)),
+            'bytes': int(job_bytes.sum()),
+            'download_bytes': int(download_bytes.sum()),
+            'content_seconds': float(effective[downloading].sum()),
+            'skipped': skipped,
+        }
+
+        columns[kind] = {
+            'formats': [fmt for _, fmt, _ in parts],
+            'pending': pending,
+            'bytes': job_bytes,
+            'download_bytes': download_bytes,
+            'reasons': reasons,
+        }
+
+    return {'channel_id': channel_id, 'catalog': catalog, 'keep': keep, 'kinds': columns, 'totals': totals}
+
+
+def _formats(parts: List[str], todo: int) -> List[str]:
+    """Formats whose bit is set in a row's pending mask"""
+    return [fmt for bit, fmt in enumerate(parts) if todo >> bit & 1]
+
+
+def _skip_reasons(plan: Dict, kind: str) -> List[str]:
+    """Skip reason per catalog row ('' for rows that are downloaded)"""
+    column = plan['kinds'][kind]
+    reasons = np.where(plan['keep'], 'completed', 'filtered').astype(object)
+    for row, reason in column['reasons'].items():
+        reasons[row] = reason
+    reasons[column['pending'] != 0] = ''
+    return reasons.tolist()
+
+
+def download_jobs(plan: Dict) -> Iterator[Dict]:
+    """The jobs of a plan that download something, kind by kind in catalog order"""
+    catalog = plan['catalog']
+    for kind, column in plan['kinds'].items():
+        for row in np.flatnonzero(column['pending']).tolist():
+            yield {
+                'channel_id': plan['channel_id'],
+                'video_id': catalog.ids[row].decode('ascii'),
+                'title': catalog.titles[row],
+                'kind': kind,
+                'status': 'download',
+                'formats': _formats(column['formats'], int(column['pending'][row])),
+                'bytes': int(column['bytes'][row]),
+                'download_bytes': int(column['download_bytes'][row]),
+            }
+
+
+def export_jobs(plans: List[Dict], path: Path) -> int:
+    """
+    Write the jobs of one or more plans as JSON lines
+
+    Lines are assembled from the plan columns; only titles and skip reasons
+    go through the JSON encoder.
+
+    Args:
+        plans: Results of dry_run()
+        path: Output file
+
+    Returns:
+        Number of jobs written
+    """
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for plan in plans:
+            catalog = plan['catalog']
+            channel_field = f'{{"channel_id": {encode(plan["channel_id"])}, "video_id": "'
+            # Video IDs are plain ASCII, so they need no escaping
+            heads = [
+                f'{channel_field}{video_id}", "title": {title}'
+                for video_id, title in zip(catalog.ids.astype(str).tolist(), map(encode_basestring, catalog.titles))
+            ]
+            for kind, column in plan['kinds'].items():
+                kind_field = f', "kind": {encode(kind)}, "status": '
+                formats = {}
+                reasons = {}
+                lines = []
+                for head, todo, size, fetched, reason in zip(
+                        heads, column['pending'].tolist(), column['bytes'].tolist(),
+                        column['download_bytes'].tolist(), _skip_reasons(plan, kind)):
+                    if todo:
+                        if todo not in formats:
+                            formats[todo] = encode(_formats(column['formats'], todo))
+                        lines.append(f'{head}{kind_field}"download", "formats": {formats[todo]}, '
+                                     f'"bytes": {size}, "download_bytes": {fetched}}}\n')
+                    else:
+                        if reason not in reasons:
+                            reasons[reason] = encode(reason)
+                        lines.append(f'{head}{kind_field}"skip", "reason": {reasons[reason]}}}\n')
+                f.writelines(lines)
+                written += len(lines)
+    return written
@@ -0,0 +1,350 @@
+"""
+Download Progress Store
+
+The progress file (data/download_progress.json) records per channel which
+videos and audio formats are completed or failed, failure records, the
+volume each artifact landed on and the checkpoints of in-flight transfers.
+ChannelCache maps handle / custom URLs to channel IDs. Both only touch local
+files, so offline commands (plan, stats, failures, --dry-run) use them
+without loading yt-dlp.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import config
+from failures import classify_error
+from utils import atomic_write_text, backup_path
+
+
+class DownloadProgress:
+    """Manages download progress and persistence"""
+    
+    def __init__(self, progress_file: Path = config.PROGRESS_FILE):
+        self.progress_file = progress_file
+        self.lock = Lock()
+        self.data = self._load_progress()
+        self._last_partial_save = 0.0
+        self._migrate_legacy_audio()
+    
+    def _load_progress(self) -> Dict:
+        """Load progress from file, falling back to the backup generation"""
+        for path in (self.progress_file, backup_path(self.progress_file)):
+            if not path.exists():
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception as e:
+                logging.error(f"Failed to load progress file {path.name}: {e}")
+                continue
+            if path != self.progress_file:
+                logging.warning(f"Recovered progress from backup {path.name}")
+            return data
+        
+        if self.progress_file.exists():
+            # Unreadable and no usable backup: keep the file for inspection
+            # instead of overwriting it with empty progress
+            damaged = self.progress_file.with_name(self.progress_file.name + '.damaged')
+            os.replace(self.progress_file, damaged)
+            logging.error(f"Progress file is damaged; moved it to {damaged.name}")
+        return {}
+    
+    def _save_progress(self):
+        """Save progress to file (atomically; the previous version is kept as .bak)"""
+        try:
+            atomic_write_text(self.progress_file,
+                              json.dumps(self.data, indent=2, ensure_ascii=False), backup=True)
+        except Exception as e:
+            logging.error(f"Failed to save progress: {e}")
+    
+    def _migrate_legacy_audio(self):
+        """
+        Move the single-format audio lists of older versions (completed_audio /
+        failed_audio) to the per-format lists of OUTPUT_AUDIO_FORMAT, the
+        format those tracks were converted to, so they are not downloaded again
+        """
+        fmt = config.OUTPUT_AUDIO_FORMAT.lower()
+        changed = False
+        migrated = 0
+        for entry in self.data.values():
+            if not isinstance(entry, dict) or not ('completed_audio' in entry or 'failed_audio' in entry):
+                continue
+            changed = True
+            completed = entry.setdefault(f'completed_audio_{fmt}', [])
+            failed = entry.setdefault(f'failed_audio_{fmt}', [])
+            for video_id in entry.pop('completed_audio', None) or []:
+                if video_id not in completed:
+                    completed.append(video_id)
+                    migrated += 1
+            for video_id in entry.pop('failed_audio', None) or []:
+                if video_id not in failed and video_id not in completed:
+                    failed.append(video_id)
+        if changed:
+            logging.info(f"Migrated {migrated} completed audio tracks of older versions to the {fmt} list")
+            self._save_progress()
+    
+    def _new_channel_entry(self) -> Dict:
+        """Return an empty progress entry for a channel"""
+        return {
+            'completed_videos': [],
+            'failed_videos': [],
+            'partial': {},
+            'failures': {},
+            'locations': {},
+            'last_updated': None
+        }
+    
+    def _channel_entry(self, channel_id: str) -> Dict:
+        """Get (or create) the progress entry for a channel. Caller must hold the lock."""
+        if channel_id not in self.data:
+            self.data[channel_id] = self._new_channel_entry()
+        # Progress files written by older versions lack these keys
+        self.data[channel_id].setdefault('partial', {})
+        self.data[channel_id].setdefault('failures', {})
+        self.data[channel_id].setdefault('locations', {})
+        return self.data[channel_id]
+    
+    def get_channel_progress(self, channel_id: str) -> Dict:
+        """Get progress for a specific channel"""
+        with self.lock:
+            return self.data.get(channel_id, self._new_channel_entry())
+    
+    @staticmethod
+    def _list_keys(video_type: str):
+        """Return the (completed, failed) list keys for a download kind"""
+        if video_type == 'video':
+            return 'completed_videos', 'failed_videos'
+        # Audio is tracked per output format ('audio_mp3' -> completed_audio_mp3);
+        # lists of older versions are migrated on load (_migrate_legacy_audio)
+        return f'completed_{video_type}', f'failed_{video_type}'
+    
+    def _mark_completed(self, entry: Dict, video_id: str, video_type: str):
+        """Move a video to the completed list of a kind. Caller must hold the lock."""
+        completed_key, failed_key = self._list_keys(video_type)
+        completed = entry.setdefault(completed_key, [])
+        failed = entry.setdefault(failed_key, [])
+        
+        if video_id not in completed:
+            completed.append(video_id)
+        # Remove from failed if it was there
+        if video_id in failed:
+            failed.remove(video_id)
+        
+        # The transfer is finished, so there is nothing left to resume
+        entry['partial'].pop(f"{video_type}:{video_id}", None)
+        entry['failures'].pop(f"{video_type}:{video_id}", None)
+        
+        entry['last_updated'] = datetime.now().isoformat()
+    
+    def mark_video_completed(self, channel_id: str, video_id: str, video_type: str = 'video'):
+        """Mark a video as completed"""
+        with self.lock:
+            self._mark_completed(self._channel_entry(channel_id), video_id, video_type)
+            self._save_progress()
+    
+    def mark_kinds_completed(self, channel_id: str, video_id: str, video_types: List[str]):
+        """
+        Mark several small kinds (side artifacts) of a video as completed.
+        Saving is throttled like partial checkpoints; a crash loses at most
+        a few seconds of these, which are cheap to fetch again.
+        """
+        with self.lock:
+            entry = self._channel_entry(channel_id)
+            for video_type in video_types:
+                self._mark_completed(entry, video_id, video_type)
+            self._save_throttled()
+    
+    def _save_throttled(self):
+        """Save at most every PARTIAL_SAVE_INTERVAL seconds. Caller must hold the lock."""
+        now = time.monotonic()
+        if now - self._last_partial_save >= config.PARTIAL_SAVE_INTERVAL:
+            self._last_partial_save = now
+            self._save_progress()
+    
+    def mark_video_failed(self, channel_id: str, video_id: str, video_type: str = 'video',
+                          error: Optional[BaseException] = None, attempts: int = 1):
+        """Mark a video as failed, recording the error class, message and attempt count"""
+        with self.lock:
+            entry = self._channel_entry(channel_id)
+            _, failed_key = self._list_keys(video_type)
+            failed = entry.setdefault(failed_key, [])
+            
+            if video_id not in failed:
+                failed.append(video_id)
+            
+            key = f"{video_type}:{video_id}"
+            now = datetime.now().isoformat()
+            previous = entry['failures'].get(key, {})
+            entry['failures'][key] = {
+                'class': classify_error(error) if error is not None else 'unknown',
+                'message': str(error)[:500] if error is not None else None,
+                'attempts': previous.get('attempts', 0) + attempts,
+                'first_failed': previous.get('first_failed', now),
+                'last_attempt': now,
+            }
+            
+            entry['last_updated'] = datetime.now().isoformat()
+            self._save_progress()
+    
+    def is_completed(self, channel_id: str, video_id: str, video_type: str = 'video') -> bool:
+        """Check if a video is already completed"""
+        with self.lock:
+            if channel_id not in self.data:
+                return False
+            completed_key, _ = self._list_keys(video_type)
+            return video_id in self.data[channel_id].get(completed_key, [])
+    
+    def get_failure(self, channel_id: str, video_id: str, video_type: str = 'video') -> Optional[Dict]:
+        """Get the failure record for a video, if it failed before"""
+        with self.lock:
+            if channel_id not in self.data:
+                return None
+            return self.data[channel_id].get('failures', {}).get(f"{video_type}:{video_id}")
+    
+    def get_failures(self, channel_ids: Optional[List[str]] = None) -> List[Dict]:
+        """List failure records (optionally for some channels) with their keys"""
+        with self.lock:
+            records = []
+            for channel_id, entry in self.data.items():
+                if channel_ids and channel_id not in channel_ids:
+                    continue
+                for key, record in entry.get('failures', {}).items():
+                    video_type, _, video_id = key.partition(':')
+                    records.append(dict(record, channel_id=channel_id,
+                                        video_id=video_id, video_type=video_type))
+            return records
+    
+    def get_location(self, channel_id: str, video_id: str, video_type: str = 'video') -> Optional[str]:
+        """Get the output volume a video's files were written to"""
+        with self.lock:
+            if channel_id not in self.data:
+                return None
+            return self.data[channel_id].get('locations', {}).get(f"{video_type}:{video_id}")
+    
+    def set_location(self, channel_id: str, video_id: str, video_type: str, root: str):
+        """Record the output volume a video is written to"""
+        with self.lock:
+            locations = self._channel_entry(channel_id)['locations']
+            key = f"{video_type}:{video_id}"
+            if locations.get(key) != root:
+                locations[key] = root
+                self._save_progress()
+    
+    def get_partial(self, channel_id: str, video_id: str, video_type: str = 'video') -> Optional[Dict]:
+        """Get the saved state of an interrupted transfer, if any"""
+        with self.lock:
+            if channel_id not in self.data:
+                return None
+            return self.data[channel_id].get('partial', {}).get(f"{video_type}:{video_id}")
+    
+    def update_partial(self, channel_id: str, video_id: str, video_type: str, state: Dict):
+        """
+        Record the state of an in-flight transfer (bytes received, format ID,
+        fragment index). Writes are throttled to PARTIAL_SAVE_INTERVAL because
+        this is called from yt-dlp progress hooks many times per second.
+        """
+        with self.lock:
+            entry = self._channel_entry(channel_id)
+            state = dict(state, updated=datetime.now().isoformat())
+            entry['partial'][f"{video_type}:{video_id}"] = state
+            self._save_throttled()
+    
+    def unmark_completed(self, channel_id: str, video_id: str, video_type: str = 'video'):
+        """Remove a video from the completed list (e.g. its file turned out to be broken)"""
+        with self.lock:
+            entry = self._channel_entry(channel_id)
+            completed_key, _ = self._list_keys(video_type)
+            if video_id in entry.get(completed_key, []):
+                entry[completed_key].remove(video_id)
+                entry['last_updated'] = datetime.now().isoformat()
+                self._save_progress()
+    
+    def rename_channel(self, old_id: str, new_id: str) -> bool:
+        """Move a channel's progress to a new key unless the new key already exists"""
+        with self.lock:
+            if old_id not in self.data or new_id in self.data:
+                return False
+            self.data[new_id] = self.data.pop(old_id)
+            self._save_progress()
+            return True
+    
+    def resumable_partials(self) -> List[Tuple[str, str, str]]:
+        """(channel ID, video ID, video type) of every transfer that can be resumed"""
+        with self.lock:
+            jobs = []
+            for channel_id, entry in self.data.items():
+                if not isinstance(entry, dict):
+                    continue
+                for key, state in entry.get('partial', {}).items():
+                    video_type, _, video_id = key.partition(':')
+                    if state.get('format_id'):
+                        jobs.append((channel_id, video_id, video_type))
+            return jobs
+    
+    def clear_partial(self, channel_id: str, video_id: str, video_type: str = 'video'):
+        """Forget the saved state of a transfer that has finished"""
+        with self.lock:
+            if channel_id in self.data:
+                self.data[channel_id].get('partial', {}).pop(f"{video_type}:{video_id}", None)
+    
+    def flush(self):
+        """Write any throttled partial state to disk"""
+        with self.lock:
+            self._save_progress()
+
+
+class ChannelCache:
+    """Persistent handle / custom URL -> canonical channel ID (UC...) cache"""
+    
+    def __init__(self, cache_file: Path = config.CHANNEL_CACHE_FILE):
+        self.cache_file = cache_file
+        self.lock = Lock()
+        self.data = self._load_cache()
+    
+    def _load_cache(self) -> Dict:
+        """Load cache from file"""
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logging.error(f"Failed to load channel cache: {e}")
+        return {}
+    
+    @staticmethod
+    def cache_key(channel_url: str) -> Optional[str]:
+        """Normalized key for URL styles that do not contain the channel ID"""
+        for marker in ('/@', '/c/', '/user/'):
+            if marker in channel_url:
+                name = channel_url.split(marker)[-1].split('/')[0].split('?')[0]
+                return f"{marker[1:]}{name}".lower()
+        return None
+    
+    def get(self, channel_url: str) -> Optional[str]:
+        """Look up the cached channel ID for a URL"""
+        key = self.cache_key(channel_url)
+        with self.lock:
+            entry = self.data.get(key) if key else None
+            return entry['channel_id'] if entry else None
+    
+    def set(self, channel_url: str, channel_id: str, title: Optional[str] = None):
+        """Remember the channel ID a URL resolved to"""
+        key = self.cache_key(channel_url)
+        if not key:
+            return
+        with self.lock:
+            self.data[key] = {
+                'channel_id': channel_id,
+                'title': title,
+                'resolved': datetime.now().isoformat()
+            }
+            try:
+                atomic_write_text(self.cache_file, json.dumps(self.data, indent=2, ensure_ascii=False))
+            except Exception as e:
+                logging.error(f"Failed to save channel cache: {e}")
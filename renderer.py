@@ -0,0 +1,202 @@
+"""
+Live Progress Renderer
+
+One thread draws the progress of all workers instead of every worker
+printing yt-dlp progress lines and log messages to the console:
+
+    bars   - tqdm view: an overall bar (jobs done / total, throughput, ETA)
+             and one bar per active job (bytes, bytes/sec), redrawn at most
+             every RENDER_INTERVAL seconds
+    plain  - a one-line summary logged every PROGRESS_SUMMARY_INTERVAL
+             seconds, for cron jobs and redirected output
+    auto   - bars on a terminal, plain otherwise
+    off    - the previous behaviour: yt-dlp prints its own progress
+
+Workers only feed events in; nothing is written to the terminal outside
+the renderer thread.
+"""
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from tqdm import tqdm
+
+import config
+from utils import console_log_handler, format_bytes, format_duration
+
+
+PROGRESS_MODES = ['auto', 'bars', 'plain', 'off']
+
+JobKey = Tuple[str, str, str]
+
+
+def resolve_mode(mode: Optional[str] = None) -> str:
+    """Turn 'auto' into 'bars' or 'plain' depending on whether stdout is a terminal"""
+    mode = mode or config.PROGRESS_DISPLAY
+    if mode not in PROGRESS_MODES:
+        raise ValueError(f"Unknown progress mode '{mode}' (choose from: {', '.join(PROGRESS_MODES)})")
+    if mode == 'auto':
+        return 'bars' if sys.stdout.isatty() else 'plain'
+    return mode
+
+
+class _TqdmStream:
+    """Console stream for the log handler that prints above the bars"""
+
+    def write(self, text: str):
+        tqdm.write(text, end='')
+
+    def flush(self):
+        pass
+
+
+class ProgressRenderer:
+    """Collects progress events from all workers and draws them from one thread"""
+
+    def __init__(self, mode: str, logger: Optional[logging.Logger] = None):
+        self.mode = mode
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        self.lock = threading.Lock()
+        self.jobs: Dict[JobKey, Dict] = {}
+        self.kind = None
+        self.estimator = None
+        self._stop = threading.Event()
+        self._console = None
+        self._bars: Dict[JobKey, tqdm] = {}
+        # Screen row of each job bar (row 0 is the overall bar)
+        self._positions: Dict[JobKey, int] = {}
+        self._overall: Optional[tqdm] = None
+        self._last_summary = time.monotonic()
+
+        if self.mode == 'bars':
+            # Log lines go through tqdm.write so they do not tear the bars;
+            # per-attempt INFO lines stay in the log file only
+            handler = console_log_handler()
+            if handler:
+                self._console = (handler, handler.level, handler.setStream(_TqdmStream()))
+                handler.setLevel(logging.WARNING)
+
+        self.thread = threading.Thread(target=self._run, name='progress-renderer', daemon=True)
+        self.thread.start()
+
+    def track(self, kind: str, estimator):
+        """Follow a batch (video or audio pass); its RunEstimator supplies done / total / ETA"""
+        with self.lock:
+            self.kind = kind
+            self.estimator = estimator
+
+    def start_job(self, key: JobKey, title: str):
+        with self.lock:
+            self.jobs[key] = {'title': title, 'downloaded': 0, 'total': None, 'speed': None}
+
+    def update_job(self, key: JobKey, downloaded: Optional[int], total: Optional[int],
+                   speed: Optional[float]):
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is None:
+                return
+            job['downloaded'] = downloaded or 0
+            job['total'] = total
+            job['speed'] = speed
+
+    def finish_job(self, key: JobKey):
+        with self.lock:
+            self.jobs.pop(key, None)
+
+    def _state(self) -> Dict:
+        with self.lock:
+            jobs = {key: dict(job) for key, job in self.jobs.items()}
+            kind, estimator = self.kind, self.estimator
+        snapshot = estimator.snapshot() if estimator else {'done': 0, 'total': 0, 'eta': None}
+        return {
+            'kind': kind,
+            'done': snapshot['done'],
+            'total': snapshot['total'],
+            'eta': snapshot['eta'],
+            'jobs': jobs,
+            'speed': sum(job['speed'] or 0 for job in jobs.values()),
+        }
+
+    def _run(self):
+        interval = config.RENDER_INTERVAL if self.mode == 'bars' else 1.0
+        while not self._stop.wait(interval):
+            try:
+                if self.mode == 'bars':
+                    self._draw_bars(self._state())
+                elif time.monotonic() - self._last_summary >= config.PROGRESS_SUMMARY_INTERVAL:
+                    self._last_summary = time.monotonic()
+                    self._log_summary(self._state())
+            except Exception as e:
+                # Drawing must never take the run down
+                self.logger.debug(f"Progress renderer error: {e}")
+
+    def _draw_bars(self, state: Dict):
+        if self._overall is None:
+            self._overall = tqdm(total=state['total'], position=0, unit='job', dynamic_ncols=True,
+                                 bar_format='{desc} {bar} {n_fmt}/{total_fmt} jobs{postfix}')
+        eta = format_duration(int(state['eta'])) if state['eta'] is not None else '?'
+        self._overall.set_description_str(f"{state['kind'] or ''}".ljust(5), refresh=False)
+        self._overall.total = state['total']
+        self._overall.n = state['done']
+        self._overall.set_postfix_str(f"{format_bytes(int(state['speed']))}/s  ETA {eta}", refresh=False)
+        self._overall.refresh()
+
+        # One bar per active job; finished jobs give their row back
+        for key in list(self._bars):
+            if key not in state['jobs']:
+                self._bars.pop(key).close()
+                self._positions.pop(key, None)
+        for key, job in state['jobs'].items():
+            bar = self._bars.get(key)
+            if bar is None:
+                # Lowest free row, so a new bar never lands on a running one
+                taken = set(self._positions.values())
+                position = next(row for row in range(1, len(taken) + 2) if row not in taken)
+                self._positions[key] = position
+                # Speed comes from yt-dlp; tqdm's own rate would only see the redraws
+                bar = tqdm(total=job['total'] or 0, position=position, unit='B', unit_scale=True,
+                           unit_divisor=1024, leave=False, dynamic_ncols=True,
+                           bar_format='{desc} {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt}{postfix}',
+                           desc=job['title'][:config.RENDER_TITLE_WIDTH].ljust(config.RENDER_TITLE_WIDTH))
+                self._bars[key] = bar
+            bar.total = job['total'] or max(job['downloaded'], 1)
+            bar.n = job['downloaded']
+            bar.set_postfix_str(f"{format_bytes(int(job['speed'] or 0))}/s", refresh=False)
+            bar.refresh()
+
+    def _log_summary(self, state: Dict):
+        if not state['total']:
+            return
+        eta = format_duration(int(state['eta'])) if state['eta'] is not None else 'unknown'
+        self.logger.info(
+            f"Progress ({state['kind']}): {state['done']}/{state['total']} jobs, "
+            f"{len(state['jobs'])} active, {format_bytes(int(state['speed']))}/s, ETA {eta}"
+        )
+
+    def close(self):
+        """Stop drawing and give the console back"""
+        self._stop.set()
+        self.thread.join(timeout=5)
+        for bar in self._bars.values():
+            bar.close()
+        self._bars.clear()
+        self._positions.clear()
+        if self._overall is not None:
+            self._overall.close()
+            self._overall = None
+        if self._console:
+            handler, level, stream = self._console
+            handler.setStream(stream)
+            handler.setLevel(level)
+            self._console = None
+
+
+def create_renderer(mode: Optional[str] = None,
+                    logger: Optional[logging.Logger] = None) -> Optional[ProgressRenderer]:
+    """Renderer for the configured mode, or None for 'off'"""
+    mode = resolve_mode(mode)
+    if mode == 'off':
+        return None
+    return ProgressRenderer(mode, logger)
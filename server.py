@@ -0,0 +1,525 @@
+"""
+Job Server
+
+Server mode (python main.py server) for orchestrators that would otherwise
+start main.py once per channel and scrape its log. One downloader stays up
+with its progress store, worker pool, circuit breaker, egress pool and
+staging directory, and takes jobs over a small HTTP/JSON API on
+SERVER_HOST:SERVER_PORT:
+
+    POST   /jobs               submit {"channels": [...], "options": {...}}
+    GET    /jobs               all jobs (?state=queued|running|...)
+    GET    /jobs/<id>          one job, with its run stats (live while running)
+    DELETE /jobs/<id>          cancel a job that has not started
+    GET    /jobs/<id>/events   the job's events as JSON lines
+    GET    /events             events of all jobs as JSON lines
+    POST   /control            change runtime settings, as `main.py control`
+    POST   /shutdown           drain the running job and stop
+
+Event streams take ?since=SEQ to skip events already seen and ?follow=1 to
+stay open and send new events as they happen (a blank line every
+SERVER_STREAM_TIMEOUT seconds keeps the connection alive). Only the last
+SERVER_EVENT_BUFFER events are kept.
+
+Jobs run one after another in the main thread; the videos of a job are
+downloaded CONCURRENT_DOWNLOADS at a time as in a normal run. The run
+counters are reset per job, so a finished job carries what
+_print_summary logged for it. Jobs still queued when the server stops are
+marked interrupted. There is no authentication: keep the server on a
+loopback address.
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import config
+from control import write_control
+from sidecar import parse_side_kinds
+from transcode import parse_audio_formats
+from utils import parse_channel_tabs
+from volumes import VOLUME_POLICIES
+
+
+JOB_STATES = ['queued', 'running', 'done', 'failed', 'interrupted', 'cancelled']
+FINISHED_STATES = {'done', 'failed', 'interrupted', 'cancelled'}
+
+
+def _bool(value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError("must be true or false")
+    return value
+
+
+def _seconds(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError("must be a number of seconds or null")
+    return value
+
+
+def _date(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if not isinstance(value, str) or len(value) != 8 or not value.isdigit():
+        raise ValueError("must be a YYYYMMDD date or null")
+    return value
+
+
+def _list_of(parse: Callable[[str], List[str]]) -> Callable[[Any], List[str]]:
+    """Validator for a comma-separated string or a list of strings"""
+    def validate(value: Any) -> List[str]:
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            value = ','.join(value)
+        if not isinstance(value, str):
+            raise ValueError("must be a comma-separated string or a list of strings")
+        return parse(value)
+    return validate
+
+
+def _tabs(value: Any) -> List[str]:
+    # null = the URL as given, even when the server was started with --tabs
+    return [] if value is None else _list_of(parse_channel_tabs)(value)
+
+
+def _output(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not value or not all(isinstance(item, str) and item for item in value):
+        raise ValueError("must be a directory or a list of directories")
+    return value
+
+
+def _volume_policy(value: Any) -> str:
+    if value not in VOLUME_POLICIES:
+        raise ValueError(f"must be one of: {', '.join(VOLUME_POLICIES)}")
+    return value
+
+
+# job option -> (setting, validator); filter options go into 'filters'
+JOB_OPTIONS: Dict[str, Tuple[str, Callable[[Any], Any]]] = {
+    'videos': ('download_videos', _bool),
+    'audio': ('download_audio', _bool),
+    'audio_format': ('audio_format', _list_of(parse_audio_formats)),
+    'retry_failed': ('retry_failed', _bool),
+    'side_artifacts': ('side_artifacts', _list_of(parse_side_kinds)),
+    'tabs': ('tabs', _tabs),
+    'after': ('date_after', _date),
+    'before': ('date_before', _date),
+    'min_duration': ('min_duration', _seconds),
+    'max_duration': ('max_duration', _seconds),
+    'output': ('output', _output),
+    'volume_policy': ('volume_policy', _volume_policy),
+}
+FILTER_SETTINGS = ['date_after', 'date_before', 'min_duration', 'max_duration']
+
+
+def parse_job(payload: Any, defaults: Dict) -> Tuple[List[str], Dict]:
+    """
+    Validate a POST /jobs body
+
+    Args:
+        payload: Decoded JSON body: {"channels": [...], "options": {...}}
+            ("channel" may be given instead of a one-element list)
+        defaults: Settings of options the job does not set (JobServer.defaults)
+
+    Returns:
+        Channel URLs and the job's complete settings
+
+    Raises:
+        ValueError: If the body or an option is invalid
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    channels = payload.get('channels', [payload['channel']] if 'channel' in payload else None)
+    if not isinstance(channels, list) or not channels or \
+            not all(isinstance(url, str) and url.strip() for url in channels):
+        raise ValueError("'channels' must be a non-empty list of channel URLs")
+    options = payload.get('options') or {}
+    if not isinstance(options, dict):
+        raise ValueError("'options' must be a JSON object")
+
+    settings = dict(defaults, filters=dict(defaults['filters']))
+    for key, value in options.items():
+        if key not in JOB_OPTIONS:
+            raise ValueError(f"Unknown job option '{key}' (choose from: {', '.join(JOB_OPTIONS)})")
+        setting, validate = JOB_OPTIONS[key]
+        try:
+            value = validate(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid job option '{key}': {e}")
+        if setting in FILTER_SETTINGS:
+            settings['filters'][setting] = value
+        else:
+            settings[setting] = value
+
+    if not settings['download_videos'] and not settings['download_audio'] and not settings['side_artifacts']:
+        raise ValueError("Job downloads nothing: enable videos, audio or side_artifacts")
+    return [url.strip() for url in channels], settings
+
+
+class Job:
+    """One submitted set of channels with its options, state and run stats"""
+
+    def __init__(self, channels: List[str], options: Dict, settings: Dict):
+        self.id = uuid.uuid4().hex[:12]
+        self.channels = channels
+        self.options = options
+        self.settings = settings
+        self.state = 'queued'
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        self.stats: Optional[Dict] = None
+
+    def to_dict(self, stats: bool = False) -> Dict:
+        def timestamp(value: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(value).isoformat() if value else None
+
+        data = {
+            'id': self.id,
+            'channels': self.channels,
+            'options': self.options,
+            'state': self.state,
+            'submitted': timestamp(self.submitted),
+            'started': timestamp(self.started),
+            'finished': timestamp(self.finished),
+            'error': self.error,
+        }
+        if stats:
+            data['stats'] = self.stats
+        return data
+
+
+class JobServer:
+    """Job queue and event buffer in front of one long-lived downloader"""
+
+    def __init__(self, downloader, host: str = config.SERVER_HOST, port: int = config.SERVER_PORT,
+                 output_dir: Optional[List[str]] = None, volume_policy: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None):
+        self.downloader = downloader
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        # Options a job does not set keep the values the server was started with
+        self.defaults = {
+            'download_videos': downloader.download_videos,
+            'download_audio': downloader.download_audio,
+            'audio_format': list(downloader.audio_formats),
+            'retry_failed': downloader.retry_failed,
+            'side_artifacts': list(downloader.side_kinds),
+            'tabs': downloader.tabs or [],
+            'filters': dict(downloader.filters),
+            'output': output_dir,
+            'volume_policy': volume_policy or config.VOLUME_POLICY,
+        }
+        self.cond = threading.Condition()
+        self.jobs: Dict[str, Job] = OrderedDict()
+        self.queue: deque = deque()
+        self.current: Optional[Job] = None
+        self.events: deque = deque(maxlen=config.SERVER_EVENT_BUFFER)
+        self.seq = 0
+        self.stopping = False
+        downloader.add_listener(self._on_event)
+
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.jobs = self
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _publish(self, event: Dict, job: Optional[Job]):
+        """Add an event to the buffer and wake the followers. Caller must hold the condition."""
+        self.seq += 1
+        self.events.append(dict(event, seq=self.seq, job=job.id if job else None))
+        self.cond.notify_all()
+
+    def _on_event(self, event: Dict):
+        """Downloader listener; runs in worker threads"""
+        with self.cond:
+            self._publish(event, self.current)
+
+    def _set_state(self, job: Job, state: str):
+        """Caller must hold the condition"""
+        job.state = state
+        self._publish({'type': 'job', 'state': state, 'time': time.time()}, job)
+
+    def submit(self, payload: Any) -> Job:
+        """
+        Queue a job from a POST /jobs body
+
+        Raises:
+            ValueError: If the body is invalid
+            RuntimeError: If the server is shutting down
+        """
+        channels, settings = parse_job(payload, self.defaults)
+        job = Job(channels, payload.get('options') or {}, settings)
+        with self.cond:
+            if self.stopping or self.downloader.stopped_early:
+                raise RuntimeError("Server is shutting down")
+            self.jobs[job.id] = job
+            self.queue.append(job)
+            self._set_state(job, 'queued')
+        self.logger.info(f"Server: queued job {job.id} ({len(channels)} channels)")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Cancel a queued job
+
+        Raises:
+            KeyError: If there is no such job
+            RuntimeError: If the job has already started
+        """
+        with self.cond:
+            job = self.jobs[job_id]
+            if job.state != 'queued':
+                raise RuntimeError(f"Job {job_id} is {job.state}; only queued jobs can be cancelled")
+            self.queue.remove(job)
+            job.finished = time.time()
+            self._set_state(job, 'cancelled')
+        return job
+
+    def job_info(self, job_id: str) -> Dict:
+        """A job with its stats: final once it finished, live while it runs"""
+        with self.cond:
+            job = self.jobs[job_id]
+            data = job.to_dict(stats=True)
+            running = job is self.current
+        if running:
+            data['stats'] = self.downloader.run_summary()
+        return data
+
+    def list_jobs(self, state: Optional[str] = None) -> List[Dict]:
+        with self.cond:
+            return [job.to_dict() for job in self.jobs.values() if state is None or job.state == state]
+
+    def wait_events(self, since: int, job_id: Optional[str] = None,
+                    timeout: Optional[float] = None) -> Tuple[List[Dict], int, bool]:
+        """
+        Buffered events after a sequence number, optionally waiting for new ones
+
+        Args:
+            since: Last sequence number the caller has seen
+            job_id: Only this job's events
+            timeout: Wait up to this long when there is nothing new (None = do not wait)
+
+        Returns:
+            The events, the newest sequence number, and whether the stream
+            is over (the job finished or the server stopped)
+        """
+        with self.cond:
+            if timeout is not None:
+                self.cond.wait_for(lambda: self.seq > since or self.stopping, timeout)
+            events = [event for event in self.events
+                      if event['seq'] > since and (job_id is None or event['job'] == job_id)]
+            over = self.stopping or (job_id is not None and self.jobs[job_id].state in FINISHED_STATES)
+            return events, self.seq, over
+
+    def _next_job(self) -> Optional[Job]:
+        with self.cond:
+            if not self.queue:
+                self.cond.wait(timeout=1.0)
+            if not self.queue or self.downloader.stopped_early:
+                return None
+            job = self.queue.popleft()
+            job.started = time.time()
+            self.current = job
+            self._set_state(job, 'running')
+            return job
+
+    def _run(self, job: Job):
+        """Run a job with the shared downloader (main thread)"""
+        settings = job.settings
+        self.logger.info(f"Server: starting job {job.id}: {', '.join(job.channels)}")
+        state, error = 'done', None
+        try:
+            self.downloader.configure(
+                download_videos=settings['download_videos'],
+                download_audio=settings['download_audio'],
+                audio_format=settings['audio_format'],
+                retry_failed=settings['retry_failed'],
+                filters=settings['filters'],
+                tabs=settings['tabs'],
+                side_artifacts=settings['side_artifacts'],
+            )
+            self.downloader.reset_stats()
+            output_dir = [Path(path) for path in settings['output']] if settings['output'] else None
+            if len(job.channels) == 1:
+                self.downloader.download_channel(job.channels[0], output_dir,
+                                                 volume_policy=settings['volume_policy'])
+            else:
+                self.downloader.download_channels(job.channels, output_dir,
+                                                  volume_policy=settings['volume_policy'])
+            if self.downloader.stopped_early:
+                state = 'interrupted'
+        except Exception as e:
+            state, error = 'failed', str(e)
+        finally:
+            stats = self.downloader.run_summary()
+            with self.cond:
+                job.stats = stats
+                job.error = error
+                job.finished = time.time()
+                self.current = None
+                self._set_state(job, state)
+        self.logger.info(f"Server: job {job.id} {state}")
+
+    def serve(self):
+        """Serve the API and run queued jobs until a shutdown request (SIGTERM / Ctrl-C / POST /shutdown)"""
+        thread = threading.Thread(target=self.httpd.serve_forever, name='server', daemon=True)
+        thread.start()
+        self.logger.info(f"Job server listening on {self.address}")
+        try:
+            with self.downloader.session():
+                while not self.downloader.stopped_early:
+                    job = self._next_job()
+                    if job:
+                        self._run(job)
+        finally:
+            with self.cond:
+                unstarted = list(self.queue)
+                self.queue.clear()
+                for job in unstarted:
+                    job.finished = time.time()
+                    self._set_state(job, 'interrupted')
+                self.stopping = True
+                self.cond.notify_all()
+            if unstarted:
+                self.logger.warning(f"Server: {len(unstarted)} queued jobs interrupted: "
+                                    f"{', '.join(job.id for job in unstarted)}")
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def shutdown(self):
+        """Drain the running job and stop (POST /shutdown)"""
+        self.downloader.request_shutdown("Shutdown requested over the API")
+        with self.cond:
+            self.cond.notify_all()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes API requests to the JobServer in self.server.jobs"""
+
+    server_version = 'YouTubeDownloader'
+
+    def log_message(self, format, *args):
+        self.server.jobs.logger.debug(f"Server: {self.address_string()} {format % args}")
+
+    def _send_json(self, status: int, body: Any):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str):
+        self._send_json(status, {'error': message})
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length).decode('utf-8'))
+        except ValueError as e:
+            raise ValueError(f"Request body is not valid JSON: {e}")
+
+    def _route(self) -> Tuple[List[str], Dict[str, str]]:
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return parts, query
+
+    def do_GET(self):
+        jobs = self.server.jobs
+        parts, query = self._route()
+        try:
+            if parts == ['jobs']:
+                state = query.get('state')
+                if state is not None and state not in JOB_STATES:
+                    return self._error(400, f"Unknown state '{state}' (choose from: {', '.join(JOB_STATES)})")
+                return self._send_json(200, {'jobs': jobs.list_jobs(state)})
+            if len(parts) == 2 and parts[0] == 'jobs':
+                return self._send_json(200, jobs.job_info(parts[1]))
+            if parts == ['events'] or (len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events'):
+                job_id = parts[1] if len(parts) == 3 else None
+                if job_id is not None and job_id not in jobs.jobs:
+                    raise KeyError(job_id)
+                return self._stream_events(job_id, query)
+        except KeyError:
+            return self._error(404, f"No job {parts[1]}")
+        except ValueError as e:
+            return self._error(400, str(e))
+        self._error(404, f"Unknown path {self.path}")
+
+    def do_POST(self):
+        jobs = self.server.jobs
+        parts, _ = self._route()
+        try:
+            body = self._read_json()
+            if parts == ['jobs']:
+                return self._send_json(201, jobs.submit(body).to_dict())
+            if parts == ['control']:
+                if not isinstance(body, dict):
+                    raise ValueError("Request body must be a JSON object")
+                return self._send_json(200, write_control(body))
+            if parts == ['shutdown']:
+                jobs.shutdown()
+                return self._send_json(202, {'stopping': True})
+        except ValueError as e:
+            return self._error(400, str(e))
+        except RuntimeError as e:
+            return self._error(503, str(e))
+        self._error(404, f"Unknown path {self.path}")
+
+    def do_DELETE(self):
+        jobs = self.server.jobs
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            return self._error(404, f"Unknown path {self.path}")
+        try:
+            self._send_json(200, jobs.cancel(parts[1]).to_dict())
+        except KeyError:
+            self._error(404, f"No job {parts[1]}")
+        except RuntimeError as e:
+            self._error(409, str(e))
+
+    def _stream_events(self, job_id: Optional[str], query: Dict[str, str]):
+        """Write buffered events as JSON lines; with follow, keep writing new ones"""
+        try:
+            since = int(query.get('since', 0))
+        except ValueError:
+            raise ValueError("since must be an event sequence number")
+        follow = query.get('follow') in ('1', 'true', 'yes')
+        jobs = self.server.jobs
+
+        # No Content-Length: the body ends when the connection closes (HTTP/1.0)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        try:
+            events, since, over = jobs.wait_events(since, job_id)
+            while True:
+                for event in events:
+                    self.wfile.write(json.dumps(event, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+                if not follow or over:
+                    break
+                last = since
+                events, since, over = jobs.wait_events(since, job_id, timeout=config.SERVER_STREAM_TIMEOUT)
+                if since == last and not over:
+                    self.wfile.write(b'\n')  # keep-alive after a quiet timeout
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away
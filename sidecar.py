@@ -0,0 +1,272 @@
+"""
+Side-Artifact Lane
+
+Subtitles, thumbnails and descriptions are a few KB each; queued behind
+multi-GB media transfers they would take as long as the media. They are
+fetched in their own lane instead: a separate, wider pool
+(SIDECAR_WORKERS) with a low per-job rate limit that runs alongside the
+video / audio batches.
+
+Every artifact kind is tracked in the progress store like a media kind
+('subtitles', 'thumbnail', 'description'), so a metadata-only run
+(--metadata-only) over an existing archive only fetches what is missing.
+Extracted info comes from the info cache when the media lane (or an
+earlier run) already has it; yt-dlp then only downloads the small files.
+
+Artifacts are written next to the video's media files. With several output
+volumes the media job picks the volume, so a video whose media has not been
+placed yet is put off until the media batches are done (wait()).
+
+Side fetches hit the same servers as the media, so they go through the
+same circuit breaker and egress pool: they pause while the breaker is open,
+take an egress slot (proxy / source address) and report throttling.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import yt_dlp
+
+import config
+from egress import Egress, EgressPool
+from failures import classify_error, retry_status
+from infocache import InfoCache, egress_key
+from throttle import CircuitBreaker
+from workers import EventLogger
+
+
+SIDE_KINDS = ['subtitles', 'thumbnail', 'description']
+
+
+def parse_side_kinds(value: str) -> List[str]:
+    """
+    Parse a comma-separated list of side artifact kinds
+
+    Args:
+        value: e.g. "subtitles,thumbnail"
+
+    Returns:
+        List of kinds without duplicates, in the given order
+
+    Raises:
+        ValueError: If a kind is not supported
+    """
+    kinds = []
+    for kind in value.split(','):
+        kind = kind.strip().lower()
+        if not kind:
+            continue
+        if kind not in SIDE_KINDS:
+            raise ValueError(f"Unsupported side artifact '{kind}' (choose from: {', '.join(SIDE_KINDS)})")
+        if kind not in kinds:
+            kinds.append(kind)
+    return kinds
+
+
+def configured_side_kinds() -> List[str]:
+    """Side artifact kinds enabled by DOWNLOAD_SUBTITLES / _THUMBNAIL / _DESCRIPTION"""
+    flags = {
+        'subtitles': config.DOWNLOAD_SUBTITLES,
+        'thumbnail': config.DOWNLOAD_THUMBNAIL,
+        'description': config.DOWNLOAD_DESCRIPTION,
+    }
+    return [kind for kind in SIDE_KINDS if flags[kind]]
+
+
+def build_side_opts(kinds: List[str], output_path: Path, title: str,
+                    logger: logging.Logger, egress: Optional[Egress] = None) -> Dict:
+    """yt-dlp options that write only the requested side artifacts"""
+    def log(event: Dict):
+        logger.log(event['level'], event['message'])
+
+    ydl_opts = {
+        'skip_download': True,
+        'ignore_no_formats_error': True,
+        'outtmpl': str(output_path / f"{title}.%(ext)s"),
+        'writesubtitles': 'subtitles' in kinds,
+        'subtitleslangs': config.SUBTITLE_LANGUAGES,
+        'writethumbnail': 'thumbnail' in kinds,
+        'writedescription': 'description' in kinds,
+        'quiet': True,
+        'noprogress': True,
+        'logger': EventLogger(log),
+        'socket_timeout': config.DOWNLOAD_TIMEOUT,
+        'retries': 3,
+    }
+    if config.SIDECAR_RATE_LIMIT:
+        ydl_opts['ratelimit'] = int(config.SIDECAR_RATE_LIMIT * 1024)
+    if egress and egress.proxy:
+        ydl_opts['proxy'] = egress.proxy
+    if egress and egress.source_address:
+        ydl_opts['source_address'] = egress.source_address
+    return ydl_opts
+
+
+def fetch_side_artifacts(video: Dict, output_path: Path, kinds: List[str],
+                         logger: logging.Logger, egress: Optional[Egress] = None) -> bool:
+    """
+    Write the requested side artifacts of one video
+
+    Args:
+        video: Video entry (id, title, url)
+        output_path: Directory the artifacts are written to
+        kinds: Kinds to fetch (SIDE_KINDS)
+        logger: Receives yt-dlp warnings and errors
+        egress: Proxy / source address to fetch through (None = direct)
+
+    Returns:
+        True if the extracted info came from the info cache
+
+    Raises:
+        Exception: If extraction or a download fails
+    """
+    output_path.mkdir(parents=True, exist_ok=True)
+    cache = InfoCache() if config.INFO_CACHE else None
+    key = egress_key(egress.proxy, egress.source_address) if egress else None
+    with yt_dlp.YoutubeDL(build_side_opts(kinds, output_path, video['title'], logger, egress)) as ydl:
+        info = cache.get(video['id'], key) if cache else None
+        cached = info is not None
+        if not cached:
+            info = ydl.extract_info(video['url'], download=False, process=False)
+            if cache:
+                info = ydl.sanitize_info(info, remove_private_keys=True)
+                cache.put(video['id'], info, key)
+        # Format selection still runs, but skip_download leaves the media alone
+        ydl.process_ie_result(info, download=True)
+    return cached
+
+
+class SideArtifactLane:
+    """Separate pool that fetches side artifacts alongside the media downloads"""
+
+    def __init__(self, kinds: List[str], progress, retry_failed: bool = False,
+                 workers: int = config.SIDECAR_WORKERS, breaker: Optional[CircuitBreaker] = None,
+                 egresses: Optional[EgressPool] = None, logger: Optional[logging.Logger] = None):
+        self.kinds = kinds
+        self.progress = progress
+        self.retry_failed = retry_failed
+        # Shared with the media downloads
+        self.breaker = breaker if breaker is not None else CircuitBreaker(logger=logger)
+        self.egresses = egresses if egresses is not None else EgressPool(logger=logger)
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sidecar')
+        self.lock = threading.Lock()
+        self.futures = []
+        # Fetches put off until the media of their video has a volume
+        self.deferred = []
+        self.stopped = threading.Event()
+        self.stats = {kind: 0 for kind in kinds}
+        self.stats.update({'failed': 0, 'info_cache_hits': 0})
+
+    def _pending_kinds(self, channel_id: str, video_id: str) -> List[str]:
+        """Kinds not completed yet whose earlier failure (if any) may be retried"""
+        pending = []
+        for kind in self.kinds:
+            if self.progress.is_completed(channel_id, video_id, kind):
+                continue
+            record = self.progress.get_failure(channel_id, video_id, kind)
+            if record and not self.retry_failed and not retry_status(record)[0]:
+                continue
+            pending.append(kind)
+        return pending
+
+    def submit(self, channel_id: str, videos: List[Dict],
+               output_for: Callable[[str, bool], Optional[Path]]) -> int:
+        """
+        Queue the side artifacts of a channel's videos
+
+        Args:
+            channel_id: Channel the videos belong to
+            videos: Video entries
+            output_for: Maps a video ID to the directory its artifacts go to.
+                Called when the fetch starts; its second argument is True once
+                the media batches are done. It may return None before that
+                while the video's media has no volume yet.
+
+        Returns:
+            Number of videos with something to fetch
+        """
+        queued = 0
+        for video in videos:
+            kinds = self._pending_kinds(channel_id, video['id'])
+            if not kinds:
+                continue
+            self._queue(channel_id, video, kinds, output_for, False)
+            queued += 1
+        return queued
+
+    def _queue(self, channel_id: str, video: Dict, kinds: List[str],
+               output_for: Callable[[str, bool], Optional[Path]], media_done: bool):
+        future = self.executor.submit(self._fetch, channel_id, video, kinds, output_for, media_done)
+        with self.lock:
+            self.futures.append(future)
+
+    def _fetch(self, channel_id: str, video: Dict, kinds: List[str],
+               output_for: Callable[[str, bool], Optional[Path]], media_done: bool):
+        if self.stopped.is_set():
+            return
+        output_path = output_for(video['id'], media_done)
+        if output_path is None:
+            with self.lock:
+                self.deferred.append((channel_id, video, kinds, output_for))
+            return
+        # Blocks while the circuit breaker is open after throttling
+        probe = self.breaker.acquire()
+        egress = None
+        try:
+            with self.egresses.slot() as egress:
+                cached = fetch_side_artifacts(video, output_path, kinds, self.logger, egress)
+        except Exception as e:
+            throttled = classify_error(e) == 'throttled'
+            if egress is not None:
+                throttled = self.egresses.record_failure(egress, throttled)
+            self.breaker.record_failure(throttled, probe)
+            self.logger.warning(f"Side artifacts ({', '.join(kinds)}) failed for {video['title']}: {e}")
+            for kind in kinds:
+                self.progress.mark_video_failed(channel_id, video['id'], kind, error=e)
+            with self.lock:
+                self.stats['failed'] += len(kinds)
+            return
+
+        self.egresses.record_success(egress)
+        self.breaker.record_success(probe)
+        self.progress.mark_kinds_completed(channel_id, video['id'], kinds)
+        with self.lock:
+            for kind in kinds:
+                self.stats[kind] += 1
+            if cached:
+                self.stats['info_cache_hits'] += 1
+
+    def reset_stats(self):
+        """Zero the counters for a new run (server jobs share one lane)"""
+        with self.lock:
+            self.stats = {key: 0 for key in self.stats}
+
+    def wait(self):
+        """
+        Wait until everything queued so far is done. Called once the media
+        batches are done, so the fetches put off until then run here too.
+        """
+        while True:
+            with self.lock:
+                futures, self.futures = self.futures, []
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error(f"Unexpected side artifact error: {e}")
+            with self.lock:
+                deferred, self.deferred = self.deferred, []
+            if not deferred:
+                break
+            for channel_id, video, kinds, output_for in deferred:
+                self._queue(channel_id, video, kinds, output_for, True)
+
+    def stop(self):
+        """Skip queued work that has not started yet (shutdown)"""
+        self.stopped.set()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,205 @@
+"""
+Staging Directory
+
+Downloads work in a fast scratch directory (STAGING_DIR, e.g. a local NVMe
+disk or tmpfs) instead of the output volume: .part files, fragments, the
+separate video / audio streams and their merge, and the audio source
+before the transcode. Every job has its own subdirectory there; only the
+finished artifact is moved into the output directory - renamed when both
+are on the same file system, copied as a stream otherwise.
+
+The staging directory has a size cap (STAGING_MAX_MB). Each admitted job
+reserves its estimated size; the scheduler admits no further jobs while
+the reservations (or the bytes actually on disk, whichever is larger)
+would exceed the cap. One job is always admitted so an oversized video
+cannot stall the run. The bytes on disk are sampled at most once per
+sample interval; reservations are counted as they change.
+
+A job's directory is kept after it ends only while its partial transfer
+can still be resumed; at startup the directories of jobs without a
+resumable partial entry in the progress file are removed (prune()).
+"""
+import errno
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from utils import format_bytes
+
+
+# Buffer of the streamed copy across file systems
+COPY_BUFFER_SIZE = 8 * 2**20
+
+
+def move_artifact(source: Path, destination: Path) -> str:
+    """
+    Move a finished file out of staging
+
+    Args:
+        source: File in the staging directory
+        destination: Final path in the output directory
+
+    Returns:
+        'rename' if it was renamed, 'copy' if it had to be copied across file systems
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(source, destination)
+        return 'rename'
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    # Copy under a temporary name so a crash never leaves a truncated artifact
+    tmp = destination.with_name(destination.name + '.moving')
+    try:
+        with open(source, 'rb') as src, open(tmp, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+            dst.flush()
+            os.fsync(dst.fileno())
+        shutil.copystat(source, tmp)
+        os.replace(tmp, destination)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    source.unlink()
+    return 'copy'
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass  # finished and moved while walking
+    return total
+
+
+class StagingArea:
+    """Per-job scratch directories with a size cap enforced at admission"""
+
+    def __init__(self, root: Union[str, Path], max_bytes: Optional[int] = None,
+                 sample_interval: float = 1.0, logger: Optional[logging.Logger] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.sample_interval = sample_interval
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        self.lock = threading.Lock()
+        self.reservations: Dict[str, int] = {}
+        # Bytes on disk per job directory, from the last walk of the tree
+        self._actual: Dict[str, int] = {}
+        self._sampled_at: Optional[float] = None
+        self.stats = {'peak_bytes': 0}
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        leftover = _tree_size(self.root)
+        if leftover:
+            self.logger.info(f"Staging directory {self.root} holds {format_bytes(leftover)} from earlier runs")
+
+    @staticmethod
+    def job_name(channel_id: str, video_id: str, kind: str) -> str:
+        return f"{channel_id}_{video_id}_{kind}"
+
+    def job_dir(self, channel_id: str, video_id: str, kind: str) -> Path:
+        """Scratch directory of one job; stable across runs so partial files are resumed"""
+        return self.root / self.job_name(channel_id, video_id, kind)
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """
+        Remove job directories left by earlier runs that nothing will resume
+
+        Args:
+            keep: Job names (job_name) whose partial files are still resumable
+
+        Returns:
+            Number of directories removed
+        """
+        keep = set(keep)
+        removed = 0
+        freed = 0
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False) or entry.name in keep:
+                continue
+            with self.lock:
+                if entry.name in self.reservations:
+                    continue
+            freed += _tree_size(Path(entry.path))
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+        if removed:
+            self.logger.info(f"Removed {removed} stale staging directories ({format_bytes(freed)})")
+        return removed
+
+    def _sample(self) -> Dict[str, int]:
+        """Walk the tree for the bytes on disk per job directory"""
+        actual = {}
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                actual[entry.name] = _tree_size(Path(entry.path))
+            elif entry.is_file(follow_symlinks=False):
+                actual[entry.name] = entry.stat().st_size
+        return actual
+
+    def used_bytes(self) -> int:
+        """Bytes committed to staging: per job the larger of its reservation and its files"""
+        now = time.monotonic()
+        with self.lock:
+            stale = self._sampled_at is None or now - self._sampled_at >= self.sample_interval
+        if stale:
+            actual = self._sample()
+            with self.lock:
+                self._actual = actual
+                self._sampled_at = now
+        with self.lock:
+            names = set(self._actual) | set(self.reservations)
+            used = sum(max(self._actual.get(name, 0), self.reservations.get(name, 0)) for name in names)
+            self.stats['peak_bytes'] = max(self.stats['peak_bytes'], used)
+        return used
+
+    def has_room(self, estimate: int) -> bool:
+        """Check whether a job of this estimated size may be admitted now (also samples the peak)"""
+        used = self.used_bytes()
+        if not self.max_bytes:
+            return True
+        with self.lock:
+            if not self.reservations:
+                return True
+        return used + estimate <= self.max_bytes
+
+    def reserve(self, name: str, estimate: int):
+        with self.lock:
+            self.reservations[name] = estimate
+
+    def release(self, name: str, remove: bool = True):
+        """
+        Drop a job's reservation
+
+        Args:
+            name: Job name (job_name)
+            remove: Also delete its scratch directory; keep it when the job
+                left partial files for a later attempt
+        """
+        with self.lock:
+            self.reservations.pop(name, None)
+            if remove:
+                self._actual.pop(name, None)
+        if remove:
+            shutil.rmtree(self.root / name, ignore_errors=True)
+
+    def summary(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, max_bytes=self.max_bytes)
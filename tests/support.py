@@ -0,0 +1,97 @@
+"""
+Local stand-in for the media servers the downloader talks to: one file
+served over HTTP with Range support, an optional bandwidth throttle and an
+optional schedule of error responses (e.g. HTTP 429).
+"""
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+RANGE_PATTERN = re.compile(r'bytes=(\d+)-(\d*)')
+
+
+class MediaServer:
+    """Serves `payload` at /clip.mp4 on a free localhost port"""
+
+    def __init__(self, payload: bytes, chunk_size: int = 16 * 1024, chunk_delay: float = 0.0,
+                 statuses: Optional[List[int]] = None):
+        self.payload = payload
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        # Status of each GET in turn (200 = serve the file); once used up, every GET is served
+        self.statuses = list(statuses or [])
+        self.lock = threading.Lock()
+        # (start offset, bytes sent) of every GET that served the file
+        self.transfers: List[Tuple[int, int]] = []
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/clip.mp4"
+
+    def __enter__(self) -> 'MediaServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _next_status(self) -> int:
+        with self.lock:
+            return self.statuses.pop(0) if self.statuses else 200
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _headers(self, status: int, start: int, end: int):
+                self.send_response(status)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(end - start))
+                if status == 206:
+                    self.send_header('Content-Range', f'bytes {start}-{end - 1}/{len(server.payload)}')
+                self.end_headers()
+
+            def _range(self) -> Tuple[int, int, int]:
+                match = RANGE_PATTERN.match(self.headers.get('Range', ''))
+                if not match:
+                    return 200, 0, len(server.payload)
+                start = int(match.group(1))
+                end = int(match.group(2)) + 1 if match.group(2) else len(server.payload)
+                return 206, start, min(end, len(server.payload))
+
+            def do_HEAD(self):
+                status, start, end = self._range()
+                self._headers(status, start, end)
+
+            def do_GET(self):
+                status = server._next_status()
+                if status != 200:
+                    self.send_error(status)
+                    return
+                status, start, end = self._range()
+                self._headers(status, start, end)
+                sent = 0
+                try:
+                    for offset in range(start, end, server.chunk_size):
+                        chunk = server.payload[offset:min(offset + server.chunk_size, end)]
+                        self.wfile.write(chunk)
+                        sent += len(chunk)
+                        if server.chunk_delay:
+                            time.sleep(server.chunk_delay)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server.lock:
+                        server.transfers.append((start, sent))
+
+        return Handler
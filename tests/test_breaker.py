@@ -0,0 +1,77 @@
+"""
+CircuitBreaker against a local server that answers HTTP 429 on a schedule:
+consecutive 429s trip it, a throttled probe re-opens it with a longer
+cool-down, and a single successful probe closes it again.
+"""
+import threading
+import time
+import unittest
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from failures import classify_error
+from tests.support import MediaServer
+from throttle import CircuitBreaker
+
+THRESHOLD = 3
+COOLDOWN = 0.3
+
+
+class BreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(threshold=THRESHOLD, cooldown=COOLDOWN, max_cooldown=10 * COOLDOWN)
+        self.lock = threading.Lock()
+        # (was the probe, HTTP status) of every attempt, in the order they finished
+        self.attempts = []
+
+    def _attempt(self, url: str):
+        """One download attempt, gated and reported the way the downloader does it"""
+        probe = self.breaker.acquire(timeout=30)
+        try:
+            with urlopen(url, timeout=10) as response:
+                response.read()
+        except HTTPError as e:
+            with self.lock:
+                self.attempts.append((probe, e.code))
+            self.breaker.record_failure(classify_error(e) == 'throttled', probe)
+            return
+        with self.lock:
+            self.attempts.append((probe, 200))
+        self.breaker.record_success(probe)
+
+    def test_open_half_open_closed(self):
+        # Three 429s trip it, the first probe is throttled, the second succeeds
+        statuses = [429] * THRESHOLD + [429]
+        with MediaServer(b'x' * 1024, statuses=statuses) as server:
+            for _ in range(THRESHOLD):
+                self._attempt(server.url)
+            self.assertEqual(self.breaker.summary()['state'], CircuitBreaker.OPEN)
+            self.assertEqual(self.breaker.summary()['trips'], 1)
+
+            # Every worker waits for the breaker; only one at a time may probe
+            started = time.monotonic()
+            workers = [threading.Thread(target=self._attempt, args=(server.url,)) for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join(timeout=30)
+            elapsed = time.monotonic() - started
+            self.assertFalse(any(worker.is_alive() for worker in workers))
+
+        self.assertEqual(self.attempts[:THRESHOLD], [(False, 429)] * THRESHOLD)
+        # Probe 1 throttled (re-open at twice the cool-down), probe 2 succeeded,
+        # and nothing else reached the server before the breaker closed
+        self.assertEqual(self.attempts[THRESHOLD:THRESHOLD + 2], [(True, 429), (True, 200)])
+        self.assertEqual(self.attempts[THRESHOLD + 2:], [(False, 200)] * (len(workers) - 2))
+        self.assertGreaterEqual(elapsed, 2 * COOLDOWN)
+
+        summary = self.breaker.summary()
+        self.assertEqual(summary['state'], CircuitBreaker.CLOSED)
+        self.assertEqual(summary['trips'], 2)
+        self.assertEqual(summary['probes'], 2)
+        self.assertEqual(summary['recoveries'], 1)
+        self.assertGreaterEqual(summary['paused_seconds'], COOLDOWN + 2 * COOLDOWN)
+
+
+if __name__ == '__main__':
+    unittest.main()
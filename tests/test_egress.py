@@ -0,0 +1,92 @@
+"""
+EgressPool with two local proxy stand-ins, one of which answers HTTP 429:
+the throttled egress is ejected, jobs move to the other one, and it comes
+back after its cool-down. Repeated ejections back off until the egress has
+had a sustained healthy run.
+"""
+import time
+import unittest
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import ProxyHandler, build_opener
+
+import config
+from egress import EgressPool
+from failures import classify_error
+from tests.support import MediaServer
+
+COOLDOWN = 0.5
+# Proxies receive the absolute URL; MediaServer serves its payload for any path
+TARGET = 'http://media.test/clip.mp4'
+
+
+class EgressPoolTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(config, EGRESS_EJECT_AFTER=3, EGRESS_EJECT_SECONDS=COOLDOWN,
+                                      EGRESS_MAX_EJECT_SECONDS=10 * COOLDOWN, EGRESS_HEALTHY_RUN=3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _job(self, pool: EgressPool) -> tuple:
+        """One download attempt through the pool, reported the way the downloader does it"""
+        with pool.slot() as egress:
+            opener = build_opener(ProxyHandler({'http': egress.proxy}))
+            try:
+                with opener.open(TARGET, timeout=10) as response:
+                    response.read()
+            except HTTPError as e:
+                pool.record_failure(egress, classify_error(e) == 'throttled')
+                return egress.name, e.code
+        pool.record_success(egress)
+        return egress.name, 200
+
+    def test_throttled_egress_is_ejected_and_returns(self):
+        payload = b'x' * 1024
+        with MediaServer(payload, statuses=[429] * 3) as bad, MediaServer(payload) as good:
+            proxy_bad = bad.url.rsplit('/', 1)[0]
+            proxy_good = good.url.rsplit('/', 1)[0]
+            pool = EgressPool([{'proxy': proxy_bad, 'name': 'bad'}, {'proxy': proxy_good, 'name': 'good'}])
+            bad_egress = pool.egresses[0]
+
+            jobs = []
+            while not bad_egress.is_ejected() and len(jobs) < 20:
+                jobs.append(self._job(pool))
+            self.assertTrue(bad_egress.is_ejected())
+            self.assertEqual([status for name, status in jobs if name == 'bad'], [429] * 3)
+            self.assertTrue(all(status == 200 for name, status in jobs if name == 'good'))
+
+            # While it is ejected every job goes to the other egress
+            during = [self._job(pool) for _ in range(5)]
+            self.assertEqual(during, [('good', 200)] * 5)
+
+            time.sleep(COOLDOWN + 0.1)
+            after = [self._job(pool) for _ in range(4)]
+            self.assertIn(('bad', 200), after)
+
+        summary = {egress['name']: egress for egress in pool.summary()}
+        self.assertEqual(summary['bad']['ejections'], 1)
+        self.assertEqual(summary['bad']['throttled'], 3)
+        self.assertFalse(summary['bad']['ejected'])
+        self.assertEqual(summary['good']['failed'], 0)
+
+    def test_backoff_survives_a_single_success(self):
+        pool = EgressPool([{'proxy': 'http://127.0.0.1:1', 'name': 'a'}, {'proxy': 'http://127.0.0.1:2', 'name': 'b'}])
+        egress = pool.egresses[0]
+
+        def eject() -> float:
+            for _ in range(config.EGRESS_EJECT_AFTER):
+                pool.record_failure(egress, True)
+            return egress.ejected_until - time.monotonic()
+
+        self.assertAlmostEqual(eject(), COOLDOWN, delta=0.1)
+        # One lucky request between bursts keeps the back-off
+        pool.record_success(egress)
+        self.assertAlmostEqual(eject(), 2 * COOLDOWN, delta=0.1)
+        # A sustained healthy run resets it
+        for _ in range(config.EGRESS_HEALTHY_RUN):
+            pool.record_success(egress)
+        self.assertAlmostEqual(eject(), COOLDOWN, delta=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
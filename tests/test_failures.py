@@ -0,0 +1,108 @@
+"""
+classify_error against the messages yt-dlp and YouTube actually produce,
+one table per error class, plus messages the old, looser patterns
+misfiled.
+"""
+import unittest
+
+from failures import ERROR_CLASSES, classify_error
+
+CASES = {
+    'throttled': [
+        "ERROR: unable to download video data: HTTP Error 429: Too Many Requests",
+        "ERROR: [youtube] dQw4w9WgXcQ: Sign in to confirm you're not a bot. Use --cookies-from-browser "
+        "or --cookies for the authentication.",
+        "ERROR: [youtube] dQw4w9WgXcQ: This content isn't available, try again later. The current session "
+        "has been rate-limited by YouTube for up to an hour.",
+    ],
+    'network': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Unable to download API page: <urlopen error [SSL: "
+        "UNEXPECTED_EOF_WHILE_READING] EOF occurred in violation of protocol (_ssl.c:1006)> "
+        "(caused by TransportError('...'))",
+        "ERROR: unable to download video data: ('Connection aborted.', "
+        "RemoteDisconnected('Remote end closed connection without response'))",
+        "ERROR: [download] Got error: The read operation timed out",
+        "ERROR: unable to download video data: HTTP Error 503: Service Unavailable",
+        "ERROR: [youtube] dQw4w9WgXcQ: Unable to download webpage: <urlopen error [Errno -3] "
+        "Temporary failure in name resolution>",
+        "ERROR: [download] Got error: 524288 bytes read, 1048576 more expected (IncompleteRead)",
+        "ssl.SSLError: [SSL: DECRYPTION_FAILED_OR_BAD_RECORD_MAC] decryption failed or bad record mac",
+        # Transient errors win over permanent-sounding text in the same message
+        "ERROR: [youtube] dQw4w9WgXcQ: Unable to download webpage: <urlopen error [Errno 104] "
+        "Connection reset by peer> while checking whether this video has been removed",
+    ],
+    'private': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Private video. Sign in if you've been granted access to this video. "
+        "Use --cookies-from-browser or --cookies for the authentication.",
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video is private",
+    ],
+    'members_only': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Join this channel to get access to members-only content like this "
+        "video, and other exclusive perks.",
+        "ERROR: [youtube] dQw4w9WgXcQ: This video is available to this channel's members on level: "
+        "Supporter (or any higher level). Join this YouTube channel from your computer or Android app.",
+    ],
+    'age_restricted': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Sign in to confirm your age. This video may be inappropriate for "
+        "some users. Use --cookies-from-browser or --cookies for the authentication.",
+    ],
+    'geo_blocked': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. The uploader has not made this video available "
+        "in your country",
+        "ERROR: [youtube] dQw4w9WgXcQ: This video is not available from your location due to geo restriction",
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video contains content from SME, who has "
+        "blocked it in your country on copyright grounds",
+    ],
+    'copyright': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video contains content from SME, who has "
+        "blocked it on copyright grounds",
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video is no longer available due to a "
+        "copyright claim by Some Label",
+    ],
+    'upcoming': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Premieres in 3 hours",
+        "ERROR: [youtube] dQw4w9WgXcQ: Premiere will begin shortly",
+        "ERROR: [youtube] dQw4w9WgXcQ: This live event will begin in a few moments.",
+    ],
+    'unavailable': [
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable",
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video has been removed by the uploader",
+        "ERROR: [youtube] dQw4w9WgXcQ: Video unavailable. This video is no longer available because the "
+        "YouTube account associated with this video has been terminated.",
+        "ERROR: [youtube] dQw4w9WgXcQ: This video does not exist.",
+    ],
+    'corrupt': [
+        "verification failed: duration 12.0s, catalog says 300s",
+        "verification failed: no audio stream",
+    ],
+    'postprocess': [
+        "ERROR: Postprocessing: audio conversion failed: Error opening output files: Invalid argument",
+        "ERROR: ffmpeg exited with code 1",
+    ],
+    'unknown': [
+        # Matched the old bare "scheduled", "this live event", "does not exist" and "ssl" patterns
+        "ERROR: Scheduled maintenance of the output volume",
+        "ERROR: [youtube] dQw4w9WgXcQ: This live event has ended.",
+        "ERROR: [youtube] dQw4w9WgXcQ: Requested format does not exist",
+        "ERROR: unable to open for writing: [Errno 2] /mnt/tassle/clip.mp4",
+        "ERROR: [youtube] dQw4w9WgXcQ: Requested format is not available",
+    ],
+}
+
+
+class ClassifyErrorTest(unittest.TestCase):
+    def test_every_class_has_cases(self):
+        self.assertEqual(set(CASES), set(ERROR_CLASSES))
+
+    def test_messages(self):
+        for error_class, messages in CASES.items():
+            for message in messages:
+                with self.subTest(error_class=error_class, message=message):
+                    self.assertEqual(classify_error(message), error_class)
+
+    def test_exceptions_are_classified_by_message(self):
+        self.assertEqual(classify_error(TimeoutError("The read operation timed out")), 'network')
+
+
+if __name__ == '__main__':
+    unittest.main()
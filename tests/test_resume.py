@@ -0,0 +1,116 @@
+"""
+Byte-level resume: a run killed mid-transfer leaves a checkpoint (offset
+and format ID) in the progress file; the next run continues the .part file
+from there with the same format instead of starting over.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from tests.support import MediaServer
+
+REPO = Path(__file__).resolve().parent.parent
+CHANNEL_ID = 'UCresumetest0000000000'
+VIDEO_ID = 'resumetest1'
+
+# One download run in a child process, so the test can kill it like a crash
+CHILD = r'''
+import json, sys
+from pathlib import Path
+args = json.loads(sys.argv[1])
+work = Path(args['work'])
+
+import config
+config.PROGRESS_FILE = work / 'progress.json'
+config.CHANNEL_CACHE_FILE = work / 'channel_cache.json'
+config.CATALOG_DIR = work / 'catalog'
+config.HISTORY_FILE = work / 'history.jsonl'
+config.LOG_FILE = work / 'downloader.log'
+config.CONTROL_FILE = None
+config.PROGRESS_DISPLAY = 'off'
+config.VERIFY_DOWNLOADS = False
+config.INFO_CACHE = False
+config.CONCURRENT_DOWNLOADS = 1
+config.PARTIAL_SAVE_INTERVAL = 0
+config.PROGRESS_EVENT_INTERVAL = 0.1
+
+from downloader import YouTubeChannelDownloader
+downloader = YouTubeChannelDownloader(download_videos=True, download_audio=False)
+downloader.resolve_channel = lambda url: (args['channel_id'], [
+    {'id': args['video_id'], 'title': 'clip', 'url': args['url'], 'duration': None},
+])
+downloader.download_channel('https://www.youtube.com/channel/' + args['channel_id'], work / 'out')
+'''
+
+
+class ResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.work = Path(tempfile.mkdtemp(prefix='resume-test-'))
+        self.payload = os.urandom(3 * 2**20)
+
+    def _child(self, url: str) -> subprocess.Popen:
+        args = json.dumps({'work': str(self.work), 'url': url,
+                           'channel_id': CHANNEL_ID, 'video_id': VIDEO_ID})
+        return subprocess.Popen([sys.executable, '-c', CHILD, args], cwd=REPO,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def _checkpoint(self):
+        try:
+            data = json.loads((self.work / 'progress.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None  # not written yet, or caught mid-replace
+        return data.get(CHANNEL_ID, {}).get('partial', {}).get(f'video:{VIDEO_ID}')
+
+    def test_killed_transfer_resumes_from_checkpoint(self):
+        # ~1.5 MB/s, so the first run is killed well before the end
+        with MediaServer(self.payload, chunk_delay=0.01) as server:
+            first = self._child(server.url)
+            deadline = time.monotonic() + 60
+            checkpoint = None
+            try:
+                while time.monotonic() < deadline:
+                    checkpoint = self._checkpoint()
+                    if checkpoint and (checkpoint.get('downloaded_bytes') or 0) >= len(self.payload) // 4:
+                        break
+                    self.assertIsNone(first.poll(), "first run ended before it could be killed")
+                    time.sleep(0.05)
+            finally:
+                first.kill()
+                first.wait()
+
+            self.assertIsNotNone(checkpoint, "no checkpoint was written")
+            offset = checkpoint['downloaded_bytes']
+            self.assertEqual(checkpoint['format_id'], 'mp4')
+            self.assertLess(offset, len(self.payload))
+            part = Path(checkpoint['filename'])
+            self.assertTrue(part.exists())
+            resumed_from = part.stat().st_size
+            self.assertGreaterEqual(resumed_from, offset)
+            served_before = len(server.transfers)
+
+            second = self._child(server.url)
+            self.assertEqual(second.wait(timeout=120), 0)
+
+            # The restarted run asked only for the bytes after the .part file
+            resumed = [start for start, _ in server.transfers[served_before:] if start > 0]
+            self.assertEqual(resumed, [resumed_from])
+            self.assertEqual(server.transfers[-1], (resumed_from, len(self.payload) - resumed_from))
+
+        output = self.work / 'out' / f'{CHANNEL_ID}_videos' / 'clip.mp4'
+        self.assertEqual(output.read_bytes(), self.payload)
+
+        log = (self.work / 'downloader.log').read_text(encoding='utf-8')
+        self.assertIn(f"Resuming video at {offset} bytes (format mp4", log)
+
+        progress = json.loads((self.work / 'progress.json').read_text(encoding='utf-8'))[CHANNEL_ID]
+        self.assertIn(VIDEO_ID, progress['completed_videos'])
+        self.assertNotIn(f'video:{VIDEO_ID}', progress['partial'])
+
+
+if __name__ == '__main__':
+    unittest.main()
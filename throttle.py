@@ -0,0 +1,143 @@
+"""
+Circuit Breaker for Server-Side Throttling
+
+When YouTube starts answering with HTTP 429 or bot checks, every worker
+retrying on its own only makes the block worse. All workers share one
+CircuitBreaker: throttling errors trip it, which pauses every new download
+attempt for a cool-down. After the cool-down a single probe attempt is let
+through (half-open); if it succeeds full concurrency resumes, if it is
+throttled again the breaker re-opens with a longer cool-down.
+"""
+import logging
+import time
+from threading import Condition
+from typing import Dict, Optional
+
+import config
+
+
+class CircuitBreaker:
+    """Shared gate in front of every download attempt"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold: int = config.BREAKER_THRESHOLD,
+                 cooldown: float = config.BREAKER_COOLDOWN,
+                 max_cooldown: float = config.BREAKER_MAX_COOLDOWN,
+                 logger: Optional[logging.Logger] = None):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+
+        self.cond = Condition()
+        self.state = self.CLOSED
+        self.consecutive_throttles = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.stats = {
+            'trips': 0,
+            'probes': 0,
+            'recoveries': 0,
+            'paused_seconds': 0.0,
+        }
+
+    def _transition(self, state: str, reason: str = ''):
+        """Change state and log it. Caller must hold the condition."""
+        if state == self.state:
+            return
+        if self.state == self.OPEN:
+            self.stats['paused_seconds'] += time.monotonic() - self.opened_at
+        self.logger.warning(
+            f"Circuit breaker {self.state} -> {state}" + (f": {reason}" if reason else "")
+        )
+        self.state = state
+        self.cond.notify_all()
+
+    def _trip(self, reason: str):
+        """Open the breaker. Caller must hold the condition."""
+        if self.state == self.HALF_OPEN:
+            # The probe was throttled too: back off harder
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+        else:
+            self.cooldown = self.base_cooldown
+        self.stats['trips'] += 1
+        self.probe_in_flight = False
+        self._transition(self.OPEN, f"{reason}; pausing new attempts for {self.cooldown:.0f}s")
+        self.opened_at = time.monotonic()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a download attempt may start
+
+        Args:
+            timeout: Give up waiting after this many seconds (None = wait forever)
+
+        Returns:
+            True if the caller is the half-open probe, False for a normal attempt
+
+        Raises:
+            TimeoutError: If the timeout expired while the breaker stayed open
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while True:
+                if self.state == self.CLOSED:
+                    return False
+
+                now = time.monotonic()
+                if self.state == self.OPEN and now - self.opened_at >= self.cooldown:
+                    self._transition(self.HALF_OPEN, "cool-down over, sending one probe")
+
+                if self.state == self.HALF_OPEN and not self.probe_in_flight:
+                    self.probe_in_flight = True
+                    self.stats['probes'] += 1
+                    return True
+
+                if self.state == self.OPEN:
+                    wait = self.opened_at + self.cooldown - now
+                else:
+                    wait = None  # Woken when the probe reports back
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise TimeoutError("circuit breaker still open")
+                    wait = remaining if wait is None else min(wait, remaining)
+                self.cond.wait(wait)
+
+    def record_success(self, probe: bool = False):
+        """Report a successful attempt"""
+        with self.cond:
+            self.consecutive_throttles = 0
+            if probe or self.state == self.HALF_OPEN:
+                self.probe_in_flight = False
+                self.stats['recoveries'] += 1
+                self._transition(self.CLOSED, "probe succeeded, resuming full concurrency")
+
+    def record_failure(self, throttled: bool, probe: bool = False):
+        """Report a failed attempt; throttling failures count towards tripping"""
+        with self.cond:
+            if not throttled:
+                if probe:
+                    # Inconclusive probe (e.g. deleted video): let another one through
+                    self.probe_in_flight = False
+                    self.cond.notify_all()
+                return
+
+            self.consecutive_throttles += 1
+            if probe or self.state == self.HALF_OPEN:
+                self._trip("probe was throttled")
+            elif self.state == self.CLOSED and self.consecutive_throttles >= self.threshold:
+                self._trip(f"{self.consecutive_throttles} throttling errors in a row")
+
+    def summary(self) -> Dict:
+        """Counters for the run summary"""
+        with self.cond:
+            stats = dict(self.stats)
+            if self.state == self.OPEN:
+                stats['paused_seconds'] += time.monotonic() - self.opened_at
+            stats['state'] = self.state
+            return stats
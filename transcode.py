@@ -0,0 +1,196 @@
+"""
+Audio transcoding for YouTube Channel Downloader
+
+Decodes a downloaded audio source once and writes every requested output
+format from a single ffmpeg invocation. The resample to AUDIO_SAMPLE_RATE /
+AUDIO_CHANNELS happens once in the filter graph and is split to each output.
+
+With AUDIO_STREAMING the source is never written to disk: the downloaded
+bytes are piped into ffmpeg's stdin (stream_transcode) and only the final
+outputs are written.
+"""
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+import config
+
+
+SUPPORTED_AUDIO_FORMATS = ['wav', 'mp3', 'm4a', 'flac', 'opus']
+
+# Encoder arguments per output format
+AUDIO_CODEC_ARGS = {
+    'wav': ['-c:a', 'pcm_s16le'],
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', config.AUDIO_BITRATE],
+    'm4a': ['-c:a', 'aac', '-b:a', config.AUDIO_BITRATE],
+    'flac': ['-c:a', 'flac'],
+    'opus': ['-c:a', 'libopus', '-b:a', config.AUDIO_BITRATE],
+}
+
+# libopus only encodes at these rates
+OPUS_SAMPLE_RATES = (48000, 24000, 16000, 12000, 8000)
+
+CHANNEL_LAYOUTS = {1: 'mono', 2: 'stereo'}
+
+
+def parse_audio_formats(value: str) -> List[str]:
+    """
+    Parse a comma-separated list of audio formats
+
+    Args:
+        value: Format list, e.g. "wav,mp3"
+
+    Returns:
+        De-duplicated list of formats, in the order given
+
+    Raises:
+        ValueError: If a format is not supported
+    """
+    formats = []
+    for fmt in value.lower().split(','):
+        fmt = fmt.strip()
+        if not fmt:
+            continue
+        if fmt not in SUPPORTED_AUDIO_FORMATS:
+            raise ValueError(
+                f"Unsupported audio format '{fmt}' "
+                f"(choose from: {', '.join(SUPPORTED_AUDIO_FORMATS)})"
+            )
+        if fmt not in formats:
+            formats.append(fmt)
+
+    if not formats:
+        raise ValueError("At least one audio format is required")
+    return formats
+
+
+class TranscodeStreamError(RuntimeError):
+    """ffmpeg stopped reading its input or failed on a streamed source"""
+
+
+def build_transcode_command(source: Union[Path, str], outputs: Dict[str, Path]) -> List[str]:
+    """
+    Build one ffmpeg command that writes every output from a single decode
+
+    Args:
+        source: Downloaded audio source file, or '-' to read the source from stdin
+        outputs: Mapping of format -> output path
+
+    Returns:
+        ffmpeg argument list
+    """
+    layout = CHANNEL_LAYOUTS.get(config.AUDIO_CHANNELS, f"{config.AUDIO_CHANNELS}c")
+    resample = (
+        f"[0:a]aresample={config.AUDIO_SAMPLE_RATE},"
+        f"aformat=sample_rates={config.AUDIO_SAMPLE_RATE}:channel_layouts={layout}"
+    )
+
+    labels = [f"[out{i}]" for i in range(len(outputs))]
+    if len(outputs) == 1:
+        filter_graph = f"{resample}{labels[0]}"
+    else:
+        filter_graph = f"{resample},asplit={len(outputs)}{''.join(labels)}"
+
+    if str(source) == '-':
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-i', 'pipe:0']
+    else:
+        cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-y', '-i', str(source)]
+    cmd += ['-filter_complex', filter_graph]
+
+    for label, (fmt, path) in zip(labels, outputs.items()):
+        cmd += ['-map', label, '-vn'] + AUDIO_CODEC_ARGS[fmt]
+        if fmt == 'opus' and config.AUDIO_SAMPLE_RATE not in OPUS_SAMPLE_RATES:
+            cmd += ['-ar', '48000']
+        cmd.append(str(path))
+
+    return cmd
+
+
+def transcode_audio(source: Path, outputs: Dict[str, Path]):
+    """
+    Transcode a source file to every requested format in one ffmpeg run
+
+    Args:
+        source: Downloaded audio source file
+        outputs: Mapping of format -> output path
+
+    Raises:
+        RuntimeError: If ffmpeg fails
+    """
+    result = subprocess.run(
+        build_transcode_command(source, outputs),
+        capture_output=True,
+        text=True,
+        # Own session: Ctrl-C in the terminal must not kill a transcode that
+        # the graceful shutdown lets finish (see downloader.request_shutdown)
+        start_new_session=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.strip()[-500:]}")
+
+
+def stream_transcode(chunks: Iterable[bytes], outputs: Dict[str, Path]) -> int:
+    """
+    Transcode a source that is still downloading: every chunk is written to
+    ffmpeg's stdin as it arrives, so the source itself never touches the disk
+
+    Args:
+        chunks: Source bytes in download order
+        outputs: Mapping of format -> output path
+
+    Returns:
+        Number of source bytes fed to ffmpeg
+
+    Raises:
+        TranscodeStreamError: If ffmpeg closes the pipe or fails; the
+            outputs are removed and the caller may fall back to a file
+        Exception: Whatever the chunk iterator raises (network errors,
+            cancellation); the outputs are removed as well
+    """
+    process = subprocess.Popen(
+        build_transcode_command('-', outputs),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    # Drain stderr on the side so a chatty ffmpeg cannot block on a full pipe
+    errors: List[bytes] = []
+    reader = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    reader.start()
+
+    fed = 0
+    broken = False
+    try:
+        for chunk in chunks:
+            try:
+                process.stdin.write(chunk)
+            except (BrokenPipeError, ValueError):
+                broken = True
+                break
+            fed += len(chunk)
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            broken = True
+        returncode = process.wait()
+    except BaseException:
+        process.kill()
+        process.wait()
+        reader.join(timeout=5)
+        _remove(outputs)
+        raise
+
+    reader.join(timeout=5)
+    if broken or returncode != 0:
+        _remove(outputs)
+        stderr = b''.join(errors).decode('utf-8', 'replace').strip()
+        reason = 'closed its input' if broken and returncode == 0 else f"exited with {returncode}"
+        raise TranscodeStreamError(f"ffmpeg {reason} after {fed} bytes: {stderr[-500:]}")
+    return fed
+
+
+def _remove(outputs: Dict[str, Path]):
+    for path in outputs.values():
+        Path(path).unlink(missing_ok=True)
@@ -3,9 +3,22 @@ Utility functions for YouTube Channel Downloader
 """
 import re
 import os
+import atexit
+import json
+import queue
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Dict, Optional
 import logging
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Structured fields carried by log records (extra={'fields': {...}}) into the JSON-lines log
+LOG_FIELDS = ['channel_id', 'video_id', 'kind', 'attempt', 'egress', 'bytes', 'elapsed']
+
+# Background writer of the shared logger, set by setup_logging
+_log_listener: Optional[QueueListener] = None
 
 
 def sanitize_filename(filename: str, max_length: int = 200) -> str:
@@ -75,6 +88,51 @@ def format_duration(seconds: int) -> str:
         return f"{minutes:02d}:{secs:02d}"
 
 
+def backup_path(path: Path) -> Path:
+    """Previous generation kept by atomic_write(backup=True)"""
+    return path.with_name(path.name + '.bak')
+
+
+def atomic_write(path: Path, write: Callable[[BinaryIO], None], backup: bool = False):
+    """
+    Replace a file so that a crash leaves either the old or the new version
+    
+    `write` fills a temporary file (opened in binary mode) in the same
+    directory, which is fsynced and renamed over the target; the directory
+    entry is fsynced too. The temporary file is removed if anything fails.
+    
+    Args:
+        path: File to write
+        write: Callback that writes the new contents to the open file
+        backup: Keep the previous version as <name>.bak
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'wb') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if backup and path.exists():
+            os.replace(path, backup_path(path))
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    
+    if hasattr(os, 'O_DIRECTORY'):
+        # Make the rename itself durable (POSIX only)
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str, backup: bool = False):
+    """atomic_write() for UTF-8 text"""
+    atomic_write(path, lambda f: f.write(text.encode('utf-8')), backup)
+
+
 def check_disk_space(path: Path, required_bytes: int = 1_073_741_824) -> bool:
     """
     Check if there's enough disk space available
@@ -94,46 +152,117 @@ def check_disk_space(path: Path, required_bytes: int = 1_073_741_824) -> bool:
         return True  # Assume space is available if check fails
 
 
-def setup_logging(log_file: Path, level: str = "INFO") -> logging.Logger:
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, message and the LOG_FIELDS it carries"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None) or {}
+        entry.update({name: fields[name] for name in LOG_FIELDS if fields.get(name) is not None})
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def log_fields(**fields) -> Dict:
+    """
+    `extra` argument attaching structured fields to a log call
+    
+    Example:
+        logger.info("Downloaded ...", extra=log_fields(channel_id=cid, video_id=vid, bytes=n))
+    """
+    return {'fields': fields}
+
+
+def setup_logging(log_file: Path, level: str = "INFO",
+                  json_file: Optional[Path] = None) -> logging.Logger:
     """
-    Setup logging configuration
+    Setup logging configuration (idempotent)
+    
+    The 'YouTubeDownloader' logger gets a single QueueHandler; a
+    QueueListener thread writes the log file, the console and the optional
+    JSON-lines file, so threads that log never wait on disk. Later calls
+    only update the level and return the configured logger.
     
     Args:
         log_file: Path to log file
         level: Logging level
+        json_file: Optional JSON-lines log with structured fields
     
     Returns:
         Configured logger
     """
+    global _log_listener
     logger = logging.getLogger('YouTubeDownloader')
     logger.setLevel(getattr(logging, level))
+    if _log_listener is not None:
+        return logger
     
     # Create log directory if it doesn't exist
     log_file.parent.mkdir(parents=True, exist_ok=True)
     
+    # Formatter
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    
     # File handler
     fh = logging.FileHandler(log_file, encoding='utf-8')
     fh.setLevel(logging.DEBUG)
+    fh.setFormatter(formatter)
     
     # Console handler
     ch = logging.StreamHandler()
     ch.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    fh.setFormatter(formatter)
     ch.setFormatter(formatter)
     
-    # Add handlers
-    logger.addHandler(fh)
-    logger.addHandler(ch)
+    handlers = [fh, ch]
+    if json_file:
+        json_file.parent.mkdir(parents=True, exist_ok=True)
+        jh = logging.FileHandler(json_file, encoding='utf-8')
+        jh.setLevel(logging.DEBUG)
+        jh.setFormatter(JsonLinesFormatter())
+        handlers.append(jh)
+    
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(shutdown_logging)
+    
+    # Handlers added by older code (or a second setup) would duplicate lines
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
     
     return logger
 
 
+def console_log_handler() -> Optional[logging.StreamHandler]:
+    """Console handler of the logging listener (None before setup_logging)"""
+    if _log_listener is None:
+        return None
+    for handler in _log_listener.handlers:
+        if type(handler) is logging.StreamHandler:
+            return handler
+    return None
+
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread"""
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
 def validate_youtube_url(url: str) -> bool:
     """
     Validate if URL is a valid YouTube URL
@@ -186,6 +315,57 @@ def get_channel_name_from_url(url: str) -> str:
     return 'unknown_channel'
 
 
+# Channel tabs that can be enumerated (URL suffixes understood by yt-dlp)
+SUPPORTED_CHANNEL_TABS = ['videos', 'shorts', 'streams']
+
+# Trailing path segments that select a tab or page of a channel URL
+_CHANNEL_PAGE_SUFFIX = re.compile(
+    r'/(?:videos|shorts|streams|live|featured|playlists|community|podcasts|releases|about)/?$'
+)
+
+
+def parse_channel_tabs(value: str) -> list:
+    """
+    Parse a comma-separated list of channel tabs
+
+    Args:
+        value: e.g. "videos,shorts,streams"
+
+    Returns:
+        List of tab names without duplicates, in the given order
+
+    Raises:
+        ValueError: If a tab is not supported
+    """
+    tabs = []
+    for tab in value.split(','):
+        tab = tab.strip().lower()
+        if not tab:
+            continue
+        if tab not in SUPPORTED_CHANNEL_TABS:
+            raise ValueError(f"Unsupported channel tab '{tab}' (choose from: {', '.join(SUPPORTED_CHANNEL_TABS)})")
+        if tab not in tabs:
+            tabs.append(tab)
+    if not tabs:
+        raise ValueError("No channel tab given")
+    return tabs
+
+
+def channel_tab_url(url: str, tab: str) -> str:
+    """
+    Build the URL of one tab of a channel
+
+    Args:
+        url: Channel URL, with or without a tab suffix
+        tab: Tab name (e.g. 'shorts')
+
+    Returns:
+        URL of the channel's tab
+    """
+    base = _CHANNEL_PAGE_SUFFIX.sub('', url.split('?')[0].rstrip('/'))
+    return f"{base}/{tab}"
+
+
 def create_progress_bar(current: int, total: int, width: int = 50) -> str:
     """
     Create a text-based progress bar
@@ -0,0 +1,335 @@
+"""
+Post-Download Integrity Verification
+
+Checks finished files in a background pool so a truncated merge or a broken
+WAV is caught instead of counting as complete forever:
+
+    - ffprobe: the file parses, has the expected streams and its duration
+      matches the catalog duration
+    - SHA-256, computed over a memory map of the file
+
+Results go to a per-channel JSON-lines manifest
+(data/manifests/{channel_id}.jsonl, last record per path wins) that the
+`verify` command can re-check later.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import config
+from utils import atomic_write_text
+
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class VerificationError(Exception):
+    """A downloaded file failed its integrity check"""
+
+
+def sha256_file(path: Path) -> str:
+    """
+    SHA-256 of a file, read through a memory map
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for offset in range(0, len(view), HASH_CHUNK_SIZE):
+                    digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def ffprobe_available() -> bool:
+    """Check once whether ffprobe is on the PATH"""
+    if shutil.which('ffprobe'):
+        return True
+    logging.getLogger('YouTubeDownloader').warning(
+        "ffprobe not found: verification only checks size and checksum"
+    )
+    return False
+
+
+def probe_media(path: Path) -> Dict:
+    """
+    Read duration and stream types with ffprobe
+
+    Args:
+        path: Media file
+
+    Returns:
+        Dict with 'duration' (seconds or None) and 'streams' (codec types)
+
+    Raises:
+        VerificationError: If ffprobe cannot parse the file
+    """
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration:stream=codec_type',
+         '-of', 'json', str(path)],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise VerificationError(f"verification failed: ffprobe error: {result.stderr.strip()[-300:]}")
+
+    data = json.loads(result.stdout or '{}')
+    duration = (data.get('format') or {}).get('duration')
+    return {
+        'duration': float(duration) if duration not in (None, 'N/A') else None,
+        'streams': sorted({stream.get('codec_type') for stream in data.get('streams', [])}),
+    }
+
+
+def verify_artifact(path: Path, kind: str, expected_duration: Optional[float] = None,
+                    compute_hash: bool = True) -> Dict:
+    """
+    Verify one downloaded file
+
+    Args:
+        path: File to check
+        kind: 'video' or an audio kind ('audio_wav', ...)
+        expected_duration: Duration from the catalog, if known
+        compute_hash: Also compute the SHA-256
+
+    Returns:
+        Manifest record; 'ok' is False and 'error' set on failure
+    """
+    record = {
+        'path': str(path),
+        'kind': kind,
+        'expected_duration': expected_duration,
+        'verified': datetime.now().isoformat(),
+        'ok': False,
+        'error': None,
+    }
+    try:
+        if not path.exists():
+            raise VerificationError("verification failed: file is missing")
+        record['size'] = path.stat().st_size
+        if record['size'] == 0:
+            raise VerificationError("verification failed: file is empty")
+
+        if config.VERIFY_PROBE and ffprobe_available():
+            probe = probe_media(path)
+            record.update(probe)
+            wanted = {'video', 'audio'} if kind == 'video' else {'audio'}
+            missing = wanted - set(probe['streams'])
+            if missing:
+                raise VerificationError(f"verification failed: no {'/'.join(sorted(missing))} stream")
+            if expected_duration and probe['duration'] is not None:
+                tolerance = max(config.VERIFY_DURATION_TOLERANCE, expected_duration * 0.01)
+                if abs(probe['duration'] - expected_duration) > tolerance:
+                    raise VerificationError(
+                        f"verification failed: duration {probe['duration']:.1f}s, "
+                        f"expected {expected_duration:.0f}s"
+                    )
+
+        if compute_hash:
+            record['sha256'] = sha256_file(path)
+        record['ok'] = True
+
+    except VerificationError as e:
+        record['error'] = str(e)
+    except Exception as e:
+        record['error'] = f"verification failed: {e}"
+    return record
+
+
+class Manifest:
+    """Per-channel record of verified artifacts and their checksums"""
+
+    def __init__(self, channel_id: str, manifest_dir: Path = config.MANIFEST_DIR):
+        self.channel_id = channel_id
+        self.path = Path(manifest_dir) / f"{channel_id}.jsonl"
+        self.lock = Lock()
+        self.entries = self._load()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _load(self) -> Dict:
+        entries = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line after a crash
+                    entries[record['path']] = record
+        return entries
+
+    def update(self, record: Dict):
+        """Add or replace the record for a file (appended to the manifest)"""
+        with self.lock:
+            self.entries[record['path']] = record
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def compact(self):
+        """Rewrite the manifest with only the latest record per file"""
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(self.path, ''.join(
+                json.dumps(record, ensure_ascii=False) + '\n' for record in self.entries.values()
+            ))
+
+    def records(self) -> List[Dict]:
+        with self.lock:
+            return list(self.entries.values())
+
+
+class Verifier:
+    """Background pool that verifies artifacts as downloads finish"""
+
+    def __init__(self, workers: int = config.VERIFY_WORKERS,
+                 on_failure: Optional[Callable[[Dict], None]] = None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='verify')
+        self.on_failure = on_failure
+        self.lock = Lock()
+        self.pending = set()
+        self.manifests: Dict[str, Manifest] = {}
+        self.failed: Dict[Tuple[str, str], Set[str]] = {}
+        self.stats = {'verified': 0, 'failed': 0}
+
+    def manifest(self, channel_id: str) -> Manifest:
+        with self.lock:
+            if channel_id not in self.manifests:
+                self.manifests[channel_id] = Manifest(channel_id)
+            return self.manifests[channel_id]
+
+    def submit(self, channel_id: str, video_id: str, kind: str, path: Path,
+               expected_duration: Optional[float] = None):
+        """Queue a finished file for verification"""
+        future = self.executor.submit(self._verify, channel_id, video_id, kind, path, expected_duration)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future):
+        with self.lock:
+            self.pending.discard(future)
+
+    def _verify(self, channel_id: str, video_id: str, kind: str, path: Path,
+                expected_duration: Optional[float]):
+        record = verify_artifact(path, kind, expected_duration)
+        record.update(channel_id=channel_id, video_id=video_id)
+        self.manifest(channel_id).update(record)
+
+        with self.lock:
+            if record['ok']:
+                self.stats['verified'] += 1
+                return
+            self.stats['failed'] += 1
+            batch_kind = 'audio' if kind.startswith('audio') else 'video'
+            self.failed.setdefault((channel_id, batch_kind), set()).add(video_id)
+
+        if self.on_failure:
+            self.on_failure(record)
+
+    def wait(self):
+        """Block until every queued verification has finished"""
+        with self.lock:
+            pending = list(self.pending)
+        wait(pending)
+
+    def take_failed(self, channel_id: str, kind: str) -> Set[str]:
+        """Video IDs of a channel's 'video'/'audio' jobs that failed since the last call"""
+        with self.lock:
+            return self.failed.pop((channel_id, kind), set())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def scan_archive(roots: List[Path], channel_ids: Optional[List[str]] = None,
+                 titles: Optional[Callable[[str], Dict[str, Tuple[str, Optional[int]]]]] = None) -> List[Dict]:
+    """
+    Find downloaded files in output directories that may not be in a manifest yet
+
+    Args:
+        roots: Output directories containing {channel_id}_videos / _audio folders
+        channel_ids: Only these channels (default: all found)
+        titles: Function returning {title: (video_id, duration)} for a channel
+
+    Returns:
+        Records with 'path', 'kind', 'channel_id' and, when known, 'video_id'
+        and 'expected_duration'
+    """
+    skip_suffixes = ('.part', '.ytdl', '.tmp', '.temp')
+    records = []
+    for root in roots:
+        if not Path(root).exists():
+            continue
+        for folder in sorted(Path(root).iterdir()):
+            channel_id, _, suffix = folder.name.rpartition('_')
+            if not folder.is_dir() or suffix not in ('videos', 'audio'):
+                continue
+            if channel_ids and channel_id not in channel_ids:
+                continue
+            lookup = titles(channel_id) if titles else {}
+
+            for path in sorted(folder.iterdir()):
+                if not path.is_file() or path.name.endswith(skip_suffixes) or '.source.' in path.name:
+                    continue
+                kind = 'video' if suffix == 'videos' else f"audio_{path.suffix.lstrip('.')}"
+                video_id, duration = lookup.get(path.stem, (None, None))
+                records.append({
+                    'path': str(path),
+                    'kind': kind,
+                    'channel_id': channel_id,
+                    'video_id': video_id,
+                    'expected_duration': duration,
+                })
+    return records
+
+
+def verify_records(records: List[Dict], workers: int = config.VERIFY_WORKERS,
+                   compute_hash: bool = True) -> List[Dict]:
+    """
+    Re-verify existing manifest records in parallel
+
+    Args:
+        records: Manifest records (need 'path' and 'kind')
+        workers: Parallel verifications
+        compute_hash: Recompute checksums and compare them to the stored ones
+
+    Returns:
+        Fresh records; 'checksum_changed' marks files whose content changed
+    """
+    def check(old: Dict) -> Dict:
+        new = verify_artifact(Path(old['path']), old.get('kind', 'video'),
+                              old.get('expected_duration'), compute_hash)
+        new.update({k: old[k] for k in ('channel_id', 'video_id') if k in old})
+        if compute_hash and new['ok'] and old.get('sha256') and new.get('sha256') != old['sha256']:
+            new['checksum_changed'] = True
+            new['ok'] = False
+            new['error'] = "verification failed: checksum differs from manifest"
+        return new
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(check, records))
@@ -0,0 +1,126 @@
+"""
+Output Volume Striping
+
+Spreads downloads across several output directories (usually on separate
+disks) so a single disk's write bandwidth and capacity no longer cap a run.
+A placement policy picks the volume for each job and every volume limits how
+many jobs write to it at once.
+
+Policies:
+    round-robin  - cycle through the volumes
+    free-space   - the volume with the most free space
+    hash         - stable choice from the video ID
+"""
+import hashlib
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Condition
+from typing import List, Optional, Union
+
+import config
+
+
+VOLUME_POLICIES = ['round-robin', 'free-space', 'hash']
+
+
+class Volume:
+    """One output directory with a cap on concurrent writers"""
+
+    def __init__(self, root: Path, max_writes: Optional[int]):
+        self.root = Path(root)
+        self.max_writes = max_writes
+        self.active = 0
+
+    def is_full(self) -> bool:
+        """Check whether the volume is at its concurrent write cap"""
+        return self.max_writes is not None and self.active >= self.max_writes
+
+    def free_bytes(self) -> int:
+        """Free space on the volume (0 if it cannot be checked)"""
+        try:
+            return shutil.disk_usage(self.root).free
+        except OSError:
+            return 0
+
+    def __repr__(self) -> str:
+        return f"Volume({self.root}, {self.active}/{self.max_writes})"
+
+
+class VolumeSet:
+    """Placement of jobs on a set of output volumes"""
+
+    def __init__(self, roots: List[Union[str, Path]], policy: Optional[str] = None,
+                 max_writes: Optional[int] = None):
+        policy = policy or config.VOLUME_POLICY
+        if max_writes is None:
+            max_writes = config.VOLUME_MAX_WRITES
+        if policy not in VOLUME_POLICIES:
+            raise ValueError(f"Unknown volume policy '{policy}' (choose from: {', '.join(VOLUME_POLICIES)})")
+        if not roots:
+            raise ValueError("At least one output directory is required")
+
+        self.policy = policy
+        self.volumes = [Volume(Path(root), max_writes) for root in roots]
+        for volume in self.volumes:
+            volume.root.mkdir(parents=True, exist_ok=True)
+        self.cond = Condition()
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self.volumes)
+
+    @property
+    def roots(self) -> List[Path]:
+        return [volume.root for volume in self.volumes]
+
+    def find(self, root: Optional[str]) -> Optional[Volume]:
+        """Get the volume with this root, if it is part of the set"""
+        if not root:
+            return None
+        for volume in self.volumes:
+            if volume.root == Path(root):
+                return volume
+        return None
+
+    def _choose(self, video_id: str) -> Volume:
+        """Apply the placement policy. Caller must hold the condition."""
+        if self.policy == 'hash':
+            digest = hashlib.sha1(video_id.encode('utf-8')).digest()
+            return self.volumes[int.from_bytes(digest[:4], 'big') % len(self.volumes)]
+
+        available = [v for v in self.volumes if not v.is_full()] or self.volumes
+        if self.policy == 'free-space':
+            return max(available, key=lambda v: v.free_bytes())
+
+        # round-robin, skipping volumes that are at their write cap
+        for _ in range(len(self.volumes)):
+            volume = self.volumes[self._next % len(self.volumes)]
+            self._next += 1
+            if volume in available:
+                return volume
+        return available[0]
+
+    @contextmanager
+    def slot(self, video_id: str, preferred: Optional[str] = None):
+        """
+        Reserve a write slot for a job, blocking while its volume is at capacity
+
+        Args:
+            video_id: Job's video ID (used by the hash policy)
+            preferred: Root recorded for an earlier attempt; partial files live there
+
+        Yields:
+            The Volume the job should write to
+        """
+        with self.cond:
+            volume = self.find(preferred) or self._choose(video_id)
+            while volume.is_full():
+                self.cond.wait()
+            volume.active += 1
+        try:
+            yield volume
+        finally:
+            with self.cond:
+                volume.active -= 1
+                self.cond.notify_all()
@@ -0,0 +1,147 @@
+"""
+Watch Mode
+
+A long-running sync (--watch) instead of one cold run per cron tick. The
+process stays up with its progress store, channel catalogs and the
+enumeration YoutubeDL instances loaded, and polls every channel on its own
+schedule:
+
+    - a poll fetches only the newest page of the channel (WATCH_PAGE_SIZE
+      entries) and queues the videos on it that are new or not downloaded
+      yet, so a quiet channel costs one small request
+    - the interval adapts per channel: it is divided by WATCH_SPEEDUP when a
+      poll finds new uploads and multiplied by WATCH_BACKOFF when it finds
+      none, between WATCH_MIN_INTERVAL and WATCH_MAX_INTERVAL
+    - a channel without a catalog, or whose whole newest page is new, gets
+      one full enumeration first
+
+The schedule is kept in data/watch_state.json, so a restarted watcher keeps
+the intervals it learned.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import yt_dlp
+
+import config
+from utils import atomic_write_text, format_duration
+
+
+class WatchSchedule:
+    """Adaptive per-channel poll intervals, persisted across restarts"""
+
+    def __init__(self, channel_urls: List[str], state_file=config.WATCH_STATE_FILE,
+                 logger: Optional[logging.Logger] = None):
+        self.state_file = state_file
+        self.logger = logger or logging.getLogger('YouTubeDownloader')
+        self.lock = threading.Lock()
+        self.polling = set()
+        saved = self._load()
+        now = time.time()
+        self.channels: Dict[str, Dict] = {}
+        for url in channel_urls:
+            entry = saved.get(url) or {'channel_id': None, 'interval': config.WATCH_INTERVAL,
+                                       'last_poll': None, 'last_new': None}
+            # Never wait longer than one interval after a restart
+            entry['next_poll'] = min(entry.get('next_poll') or now, now + entry['interval'])
+            self.channels[url] = entry
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring watch state {self.state_file}: {e}")
+            return {}
+
+    def _save(self):
+        try:
+            atomic_write_text(self.state_file, json.dumps(self.channels, indent=2))
+        except OSError as e:
+            self.logger.error(f"Failed to save watch state: {e}")
+
+    def channel_id(self, url: str) -> Optional[str]:
+        with self.lock:
+            return self.channels[url]['channel_id']
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Channels whose next poll time has come and that are not being polled, most overdue first"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            due = [url for url, entry in self.channels.items()
+                   if entry['next_poll'] <= now and url not in self.polling]
+            return sorted(due, key=lambda url: self.channels[url]['next_poll'])
+
+    def start_poll(self, url: str):
+        with self.lock:
+            self.polling.add(url)
+
+    def seconds_until_next(self) -> Optional[float]:
+        """Time until the next channel is due (None while every channel is being polled)"""
+        with self.lock:
+            waiting = [entry['next_poll'] for url, entry in self.channels.items() if url not in self.polling]
+        if not waiting:
+            return None
+        return max(0.0, min(waiting) - time.time())
+
+    def record_poll(self, url: str, channel_id: Optional[str], new_videos: int, failed: bool = False):
+        """
+        Schedule a channel's next poll after a poll
+
+        Args:
+            url: Channel URL as watched
+            channel_id: Resolved channel ID (None if the poll failed before resolving it)
+            new_videos: Videos the poll found that were not known yet
+            failed: The poll failed; the interval is kept as it was
+        """
+        now = time.time()
+        with self.lock:
+            self.polling.discard(url)
+            entry = self.channels[url]
+            entry['channel_id'] = channel_id or entry['channel_id']
+            entry['last_poll'] = now
+            if not failed:
+                if new_videos:
+                    entry['last_new'] = now
+                    entry['interval'] = max(config.WATCH_MIN_INTERVAL, entry['interval'] / config.WATCH_SPEEDUP)
+                else:
+                    entry['interval'] = min(config.WATCH_MAX_INTERVAL, entry['interval'] * config.WATCH_BACKOFF)
+            # Jitter so channels added together do not stay in lockstep
+            interval = entry['interval'] * random.uniform(1 - config.WATCH_JITTER, 1 + config.WATCH_JITTER)
+            entry['next_poll'] = now + interval
+            self._save()
+        self.logger.info(
+            f"Watch: {channel_id or url}: {'poll failed' if failed else f'{new_videos} new videos'}, "
+            f"next poll in {format_duration(int(interval))}"
+        )
+
+
+class NewestPageFetcher:
+    """Flat extraction of the newest page of a channel, with one warm YoutubeDL per thread"""
+
+    def __init__(self, page_size: int = config.WATCH_PAGE_SIZE):
+        self.page_size = page_size
+        self._local = threading.local()
+
+    def _ydl(self) -> yt_dlp.YoutubeDL:
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL({
+                'quiet': True,
+                'extract_flat': True,
+                'skip_download': True,
+                'no_warnings': True,
+                'playlistend': self.page_size,
+            })
+            self._local.ydl = ydl
+        return ydl
+
+    def fetch(self, url: str) -> Dict:
+        """Newest entries of a channel or tab URL (at most page_size)"""
+        return self._ydl().extract_info(url, download=False)
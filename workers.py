@@ -0,0 +1,487 @@
+"""
+Download Attempt Workers
+
+The heavy part of a job - yt-dlp extraction and download, then the audio
+transcode - as a plain function of a picklable job spec. It runs either on
+the downloader's worker threads or, with --executor process, in a process
+pool so CPU-bound extraction (JSON parsing, signature JS interpretation,
+format sorting) is not serialized by the GIL.
+
+Workers never write the progress store or the console. Transfer
+checkpoints (and, with the live progress display, yt-dlp's warnings and
+errors) are sent as events to a callback (thread mode) or over a
+multiprocessing queue (process mode) and applied by the parent.
+
+Audio jobs with AUDIO_STREAMING pipe the selected format straight into
+ffmpeg instead of downloading a source file first; formats that cannot be
+piped (fragmented, merged) and broken pipes use the file-based path.
+"""
+import copy
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+import yt_dlp
+from yt_dlp.networking import Request
+from yt_dlp.utils import DownloadCancelled
+
+import config
+from infocache import EXPIRED_URL_PATTERN, InfoCache, egress_key
+from staging import move_artifact
+from transcode import stream_transcode, transcode_audio
+
+
+EXECUTORS = ['thread', 'process']
+
+# Bytes read from the response per write to ffmpeg's stdin
+STREAM_READ_SIZE = 256 * 1024
+
+# Event queue and cancel flag of the current worker process (set by _init_process)
+_events = None
+_cancel = None
+
+
+class EventLogger:
+    """yt-dlp logger that forwards warnings and errors as 'log' events"""
+
+    def __init__(self, emit: Callable[[Dict], None]):
+        self.emit = emit
+
+    def debug(self, msg: str):
+        pass
+
+    def info(self, msg: str):
+        pass
+
+    def warning(self, msg: str):
+        self.emit({'type': 'log', 'level': logging.WARNING, 'message': msg})
+
+    def error(self, msg: str):
+        self.emit({'type': 'log', 'level': logging.ERROR, 'message': msg})
+
+
+def build_ydl_opts(spec: Dict) -> Dict:
+    """
+    yt-dlp options for an attempt spec (without progress hooks). Formats and
+    the rate limit come from the spec, so settings changed at runtime reach
+    process workers too.
+    """
+    # Partial files and merges go to the job's staging directory if there is one
+    work_path = Path(spec.get('staging_dir') or spec['output_path'])
+    if spec['is_audio']:
+        # Audio source download; conversion to every requested
+        # format happens afterwards in a single ffmpeg pass
+        ydl_opts = {
+            'format': spec.get('audio_format') or config.AUDIO_FORMAT,
+            'outtmpl': str(work_path / f"{spec['title']}.source.%(ext)s"),
+        }
+    else:
+        ydl_opts = {
+            'format': spec.get('video_format') or config.VIDEO_FORMAT,
+            'outtmpl': str(work_path / f"{spec['title']}.%(ext)s"),
+            'merge_output_format': 'mp4',
+        }
+
+    ydl_opts.update({
+        # With the live progress display (renderer.py) yt-dlp stays silent
+        'quiet': bool(spec.get('quiet')),
+        'noprogress': bool(spec.get('quiet')),
+        'no_warnings': False,
+        'socket_timeout': config.DOWNLOAD_TIMEOUT,
+        'retries': 3,
+        'fragment_retries': 3,
+        'ignoreerrors': False,
+        'continuedl': True,
+    })
+    if spec.get('rate_limit'):
+        ydl_opts['ratelimit'] = int(spec['rate_limit'] * 1024)
+    # Egress the attempt was assigned to (see egress.py)
+    if spec.get('proxy'):
+        ydl_opts['proxy'] = spec['proxy']
+    if spec.get('source_address'):
+        ydl_opts['source_address'] = spec['source_address']
+
+    if spec.get('format_id'):
+        # Pin the format chosen last time so the .part file on disk
+        # still matches; extraction only refreshes the expiring URL.
+        ydl_opts['format'] = f"{spec['format_id']}/{ydl_opts['format']}"
+    return ydl_opts
+
+
+def make_progress_hook(spec: Dict, emit: Callable[[Dict], None], job: Dict, cancel=None):
+    """
+    Build a yt-dlp progress hook that reports in-flight transfer state as
+    'partial' events (at most every PROGRESS_EVENT_INTERVAL seconds) and
+    counts the bytes received for the job. Once `cancel` (an Event) is set,
+    the hook aborts the transfer; the .part file stays for the next run.
+    """
+    job.setdefault('last_event', 0.0)
+
+    def hook(d: Dict):
+        if cancel is not None and cancel.is_set():
+            raise DownloadCancelled('Shutting down')
+        if d.get('status') == 'finished':
+            job['downloaded_bytes'] += d.get('total_bytes') or d.get('downloaded_bytes') or 0
+            return
+        if d.get('status') != 'downloading':
+            return
+        now = time.monotonic()
+        if now - job['last_event'] < config.PROGRESS_EVENT_INTERVAL:
+            return
+        job['last_event'] = now
+
+        info = d.get('info_dict') or {}
+        # For merged downloads the hook reports one stream at a time;
+        # record the full selection so the same streams are picked on resume.
+        requested = info.get('requested_formats')
+        if requested:
+            format_id = '+'.join(f['format_id'] for f in requested)
+        else:
+            format_id = info.get('format_id')
+
+        emit({
+            'type': 'partial',
+            'channel_id': spec['channel_id'],
+            'video_id': spec['video_id'],
+            'video_type': spec['video_type'],
+            'fields': {
+                'format_id': format_id,
+                'stream_format_id': info.get('format_id'),
+                'filename': d.get('tmpfilename') or d.get('filename'),
+                'downloaded_bytes': d.get('downloaded_bytes'),
+                'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate'),
+                'fragment_index': d.get('fragment_index'),
+                'fragment_count': d.get('fragment_count'),
+            },
+            'speed': d.get('speed'),
+        })
+
+    return hook
+
+
+def downloaded_path(ydl, info: Dict) -> Path:
+    """Final path of the file yt-dlp just wrote (after any merge)"""
+    downloads = info.get('requested_downloads') or []
+    if downloads and downloads[0].get('filepath'):
+        return Path(downloads[0]['filepath'])
+    return Path(ydl.prepare_filename(info))
+
+
+def streamable_format(ydl, info: Dict) -> Optional[Dict]:
+    """
+    The format yt-dlp selects for an audio job if it can be piped: a single
+    stream over plain HTTP(S). None for fragmented (DASH / HLS) or merged
+    selections, which need the file-based path.
+    """
+    selected = ydl.process_ie_result(copy.deepcopy(info), download=False)
+    if selected.get('requested_formats') or not selected.get('url'):
+        return None
+    if selected.get('protocol') not in ('http', 'https'):
+        return None
+    return selected
+
+
+def _content_total(response) -> Optional[int]:
+    """Full size of the resource from Content-Range (206) or Content-Length (200)"""
+    content_range = response.headers.get('Content-Range') or ''
+    if '/' in content_range and content_range.rsplit('/', 1)[1].isdigit():
+        return int(content_range.rsplit('/', 1)[1])
+    length = response.headers.get('Content-Length')
+    if response.status == 200 and length and length.isdigit():
+        return int(length)
+    return None
+
+
+def _http_chunks(ydl, fmt: Dict, state: Dict) -> Iterator[bytes]:
+    """
+    Body of a format URL. Like yt-dlp's HTTP downloader, it is requested in
+    http_chunk_size ranges when the extractor asks for that (YouTube
+    throttles long single requests).
+    """
+    range_size = (fmt.get('downloader_options') or {}).get('http_chunk_size')
+    position = 0
+    while True:
+        headers = dict(fmt.get('http_headers') or {})
+        if range_size:
+            headers['Range'] = f"bytes={position}-{position + range_size - 1}"
+        received = 0
+        with ydl.urlopen(Request(fmt['url'], headers=headers)) as response:
+            whole = response.status != 206
+            state['total_bytes'] = _content_total(response) or state.get('total_bytes')
+            while True:
+                data = response.read(STREAM_READ_SIZE)
+                if not data:
+                    break
+                received += len(data)
+                position += len(data)
+                yield data
+        total = state.get('total_bytes')
+        if whole or not range_size or received < range_size or (total and position >= total):
+            return
+
+
+def stream_audio(ydl, fmt: Dict, spec: Dict, outputs: Dict[str, Path],
+                 emit: Callable[[Dict], None], job: Dict, cancel=None) -> int:
+    """
+    Download a selected audio format straight into ffmpeg (stream_transcode)
+
+    Args:
+        ydl: YoutubeDL instance (cookies, proxy and source address of the attempt)
+        fmt: Format from streamable_format
+        spec: Attempt spec; 'rate_limit' caps the transfer
+        outputs: Mapping of format -> output path
+        emit: Receives 'partial' progress events
+        job: Per-attempt counters ('downloaded_bytes', 'last_event')
+        cancel: Optional Event that aborts the transfer when set
+
+    Returns:
+        Number of source bytes streamed
+
+    Raises:
+        DownloadCancelled: If `cancel` was set
+        Exception: Network errors and TranscodeStreamError; the outputs are
+            removed and the caller falls back to the file-based path
+    """
+    state = {'total_bytes': fmt.get('filesize') or fmt.get('filesize_approx')}
+    job.setdefault('last_event', 0.0)
+
+    def metered() -> Iterator[bytes]:
+        started = time.monotonic()
+        received = 0
+        for chunk in _http_chunks(ydl, fmt, state):
+            if cancel is not None and cancel.is_set():
+                raise DownloadCancelled('Shutting down')
+            received += len(chunk)
+            job['downloaded_bytes'] += len(chunk)
+            now = time.monotonic()
+            if spec.get('rate_limit'):
+                ahead = received / (spec['rate_limit'] * 1024) - (now - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+            if now - job['last_event'] >= config.PROGRESS_EVENT_INTERVAL:
+                job['last_event'] = now
+                # No format_id: a stream leaves no .part file to resume
+                emit({
+                    'type': 'partial',
+                    'channel_id': spec['channel_id'],
+                    'video_id': spec['video_id'],
+                    'video_type': spec['video_type'],
+                    'fields': {
+                        'streamed': True,
+                        'downloaded_bytes': received,
+                        'total_bytes': state.get('total_bytes'),
+                    },
+                    'speed': received / max(now - started, 1e-3),
+                })
+            yield chunk
+
+    return stream_transcode(metered(), outputs)
+
+
+def _try_streaming(ydl, info: Dict, spec: Dict, outputs: Dict[str, Path],
+                   emit: Callable[[Dict], None], job: Dict, cancel=None) -> Optional[Dict]:
+    """Stream an audio job; returns the selected format, or None to use the file-based path"""
+    try:
+        fmt = streamable_format(ydl, info)
+        if fmt is None:
+            return None
+        stream_audio(ydl, fmt, spec, outputs, emit, job, cancel)
+        return fmt
+    except DownloadCancelled:
+        raise
+    except Exception as e:
+        emit({'type': 'log', 'level': logging.WARNING,
+              'message': f"Streaming transcode of {spec['title']} failed, using a source file: {e}"})
+        return None
+
+
+def run_attempt(spec: Dict, emit: Callable[[Dict], None], cancel=None) -> Dict:
+    """
+    Download (and for audio, transcode) one job
+
+    Args:
+        spec: Picklable job description (built in YouTubeChannelDownloader._download_attempt)
+        emit: Receives progress events
+        cancel: Optional Event that aborts the transfer when set
+
+    Returns:
+        Dict with 'outputs' (format -> path), 'downloaded_bytes', 'duration',
+        the 'download' / 'transcode' stage times, whether the extracted
+        info came from the cache ('info_cached'), for audio the bytes
+        written to disk ('disk_bytes') and whether the source was streamed,
+        and how a staged video was moved to the output ('moved')
+
+    Raises:
+        Exception: If the download or the transcode fails
+    """
+    job = {'downloaded_bytes': 0}
+    ydl_opts = build_ydl_opts(spec)
+    ydl_opts['progress_hooks'] = [make_progress_hook(spec, emit, job, cancel)]
+    if spec.get('quiet'):
+        ydl_opts['logger'] = EventLogger(emit)
+    started = time.monotonic()
+    output_path = Path(spec['output_path'])
+    if spec['is_audio']:
+        outputs = {fmt: output_path / f"{spec['title']}.{fmt}" for fmt in spec['formats']}
+    streamed = None
+
+    cache = InfoCache() if spec.get('info_cache') else None
+    # Format URLs are bound to the IP that extracted them
+    egress = egress_key(spec.get('proxy'), spec.get('source_address'))
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        # Raw (unprocessed) info is shared by retries and the video / audio
+        # passes; format selection and download happen in process_ie_result
+        info = cache.get(spec['video_id'], egress) if cache else None
+        cached = info is not None
+        if not cached:
+            info = ydl.extract_info(spec['url'], download=False, process=False)
+            if cache:
+                info = ydl.sanitize_info(info, remove_private_keys=True)
+                cache.put(spec['video_id'], info, egress)
+
+        # A .part file left by an earlier attempt is resumed rather than re-streamed
+        if spec['is_audio'] and spec.get('stream_audio') and not spec.get('format_id'):
+            streamed = _try_streaming(ydl, info, spec, outputs, emit, job, cancel)
+
+        if streamed is None:
+            try:
+                info = ydl.process_ie_result(info, download=True)
+            except Exception as e:
+                if cached and EXPIRED_URL_PATTERN.search(str(e)):
+                    # The cached URLs were rejected; the next attempt extracts again
+                    cache.invalidate(spec['video_id'], egress)
+                raise
+            source = downloaded_path(ydl, info)
+        else:
+            info = streamed
+    downloaded_at = time.monotonic()
+
+    disk_bytes = None
+    moved = None
+    if spec['is_audio']:
+        disk_bytes = 0
+        if streamed is None:
+            disk_bytes = source.stat().st_size if source.exists() else 0
+            transcode_audio(source, outputs)
+            source.unlink(missing_ok=True)
+        disk_bytes += sum(path.stat().st_size for path in outputs.values() if path.exists())
+    elif spec.get('staging_dir'):
+        # Only the finished, merged file leaves staging
+        destination = output_path / source.name
+        moved = move_artifact(source, destination)
+        outputs = {'mp4': destination}
+    else:
+        outputs = {'mp4': source}
+
+    return {
+        'outputs': {fmt: str(path) for fmt, path in outputs.items()},
+        'downloaded_bytes': job['downloaded_bytes'],
+        'duration': info.get('duration'),
+        # A streamed source is transcoded while it downloads
+        'download': round(downloaded_at - started, 3),
+        'transcode': round(time.monotonic() - downloaded_at, 3),
+        'info_cached': cached,
+        'disk_bytes': disk_bytes,
+        'streamed': streamed is not None,
+        'moved': moved,
+    }
+
+
+def _init_process(events, cancel):
+    global _events, _cancel
+    _events = events
+    _cancel = cancel
+    # Ctrl-C reaches the whole process group; only the parent decides when
+    # running attempts stop (draining, then the cancel event)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _run_attempt_in_process(spec: Dict) -> Dict:
+    try:
+        return run_attempt(spec, _events.put, _cancel)
+    except Exception as e:
+        # yt-dlp errors carry tracebacks that do not pickle; the message is
+        # all the parent needs to classify the failure
+        raise RuntimeError(str(e)) from None
+
+
+class ProcessAttemptPool:
+    """Process pool for download attempts; progress events flow back over a queue"""
+
+    def __init__(self, workers: int, on_event: Callable[[Dict], None]):
+        # spawn: forking a parent that runs many threads is not safe
+        self.context = multiprocessing.get_context('spawn')
+        self.events = self.context.Queue()
+        self.cancelled = self.context.Event()
+        self.on_event = on_event
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.executor = self._create_executor(workers)
+        self.listener = threading.Thread(target=self._listen, name='attempt-events', daemon=True)
+        self.listener.start()
+
+    def _listen(self):
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            try:
+                self.on_event(event)
+            except Exception as e:
+                logging.getLogger('YouTubeDownloader').warning(f"Failed to apply worker event: {e}")
+
+    def _create_executor(self, workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=self.context,
+            initializer=_init_process,
+            initargs=(self.events, self.cancelled),
+        )
+
+    def run(self, spec: Dict) -> Dict:
+        """Run one attempt in a worker process and wait for its result"""
+        with self.lock:
+            future = self.executor.submit(_run_attempt_in_process, spec)
+        return future.result()
+
+    def resize(self, workers: int):
+        """
+        Grow the pool to `workers` processes (e.g. after a runtime concurrency
+        change). Attempts already running finish in the old processes, which
+        then exit. A smaller limit is left to job admission; surplus
+        processes just stay idle.
+        """
+        with self.lock:
+            if workers <= self.workers:
+                return
+            old, self.executor = self.executor, self._create_executor(workers)
+            self.workers = workers
+        old.shutdown(wait=False)
+
+    def cancel(self):
+        """Abort the transfers running in the worker processes"""
+        self.cancelled.set()
+
+    def reset(self):
+        """Clear a cancel left over from an earlier batch"""
+        self.cancelled.clear()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        self.events.put(None)
+        self.listener.join(timeout=5)
+
+
+def create_attempt_pool(executor: str, workers: int,
+                        on_event: Callable[[Dict], None]) -> Optional[ProcessAttemptPool]:
+    """Process pool for --executor process, None for the default thread mode"""
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor '{executor}' (choose from: {', '.join(EXECUTORS)})")
+    if executor == 'process':
+        return ProcessAttemptPool(workers, on_event)
+    return None